@@ -0,0 +1,44 @@
+"""
+Side-by-side diff of two benchmark result files.
+
+    python -m benchmarks.compare before.json after.json
+"""
+import json
+import sys
+
+
+def flatten(results: dict) -> dict:
+    """Numeric leaves keyed by path; list entries are keyed by their identifying fields."""
+    flat = {}
+    for name, value in results.get("http", {}).items():
+        for metric, number in value.items():
+            if metric not in ("requests", "concurrency"):  # Run settings, not results
+                flat[f"http.{name}.{metric}"] = number
+    for row in results.get("sse", []):
+        for metric in ("publish_per_sec", "deliveries_per_sec", "dropped"):
+            flat[f"sse.{row['subscribers']}_subscribers.{metric}"] = row[metric]
+    for row in results.get("parse_yf_history", []):
+        flat[f"parse_yf_history.{row['interval']}.{row['bars']}_bars.median_ms"] = row["median_ms"]
+    return flat
+
+
+def main():
+    if len(sys.argv) != 3:
+        print(__doc__.strip())
+        return 2
+    with open(sys.argv[1]) as f:
+        before = json.load(f)
+    with open(sys.argv[2]) as f:
+        after = json.load(f)
+
+    old, new = flatten(before), flatten(after)
+    print(f"{'metric':<52} {before['meta']['revision']:>12} {after['meta']['revision']:>12} {'change':>9}")
+    for key in sorted(old.keys() | new.keys()):
+        a, b = old.get(key), new.get(key)
+        change = f"{(b - a) / a * 100:+.1f}%" if a and b is not None else ""
+        print(f"{key:<52} {a if a is not None else '-':>12} {b if b is not None else '-':>12} {change:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
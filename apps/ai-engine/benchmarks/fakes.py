@@ -0,0 +1,281 @@
+import asyncio
+import socket
+import threading
+import time
+import zlib
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import uvicorn
+import yfinance as yf
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+# Local stand-ins for everything the engine calls upstream, all producing the
+# same synthetic data for the same inputs so runs are comparable:
+#   - an HTTP server speaking the Binance klines and Yahoo search APIs
+#     (pointed at through BINANCE_API_URL / YAHOO_SEARCH_URL),
+#   - in-process replacements for yfinance's Ticker and download, which talk to
+#     Yahoo through their own session and cannot be redirected by URL,
+#   - a Redis pub/sub stand-in that pushes a prepared trade stream (REDIS_URL).
+
+# Imports nothing from the engine: its modules read their upstream URLs at import,
+# which has to happen after the fake server's port is known.
+
+
+def _seed(*parts) -> int:
+    return zlib.crc32("|".join(str(p) for p in parts).encode())
+
+
+def synthetic_bars(symbol: str, times_ms: np.ndarray) -> np.ndarray:
+    """(n, 6) array: open time ms, open, high, low, close, volume. Prices depend only on the time."""
+    rng = np.random.default_rng(_seed(symbol, "ohlc"))
+    drift = rng.normal(0, 0.01)
+    phase = (times_ms // 60_000).astype(float)
+    close = 100 * np.exp(0.05 * np.sin(phase / 500 + drift) + 0.02 * np.sin(phase / 37))
+    open_ = np.roll(close, 1)
+    open_[:1] = close[:1]
+    spread = np.abs(close - open_) + close * 0.001
+    volume = 1000 + (phase % 97) * 10
+    return np.column_stack([times_ms, open_, np.maximum(open_, close) + spread,
+                            np.minimum(open_, close) - spread, close, volume])
+
+
+# --- Fake Binance / Yahoo search HTTP server ---
+
+BINANCE_INTERVAL_MS = {"1m": 60_000, "5m": 300_000, "15m": 900_000, "30m": 1_800_000, "1h": 3_600_000,
+                       "4h": 14_400_000, "1d": 86_400_000, "1w": 604_800_000, "1M": 2_592_000_000}
+
+UNIVERSE_SIZE = 2000
+PREFIXES = ["AL", "BR", "CH", "DE", "EN", "FI", "GL", "HY", "IN", "JU", "KO", "LU", "MA", "NO", "OP", "PR"]
+
+
+def search_universe(size: int = UNIVERSE_SIZE) -> List[dict]:
+    quotes = []
+    for i in range(size):
+        prefix = PREFIXES[i % len(PREFIXES)]
+        symbol = f"{prefix}{chr(65 + (i // len(PREFIXES)) % 26)}{i}"
+        quotes.append({"symbol": symbol, "shortname": f"{prefix.title()} Holdings {i}",
+                       "exchange": "NMS", "quoteType": "EQUITY"})
+    return quotes
+
+
+def upstream_app(latency_ms: float = 0.0) -> Starlette:
+    universe = search_universe()
+
+    async def klines(request: Request):
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        q = request.query_params
+        step = BINANCE_INTERVAL_MS.get(q.get("interval", "1h"), 3_600_000)
+        limit = min(int(q.get("limit", 500)), 1000)
+        start = int(q.get("startTime", 0))
+        end = int(q.get("endTime", int(time.time() * 1000)))
+        first = -(-start // step) * step
+        times = np.arange(first, min(end + 1, first + limit * step), step, dtype=np.int64)
+        bars = synthetic_bars(q.get("symbol", "BTCUSDT"), times)
+        rows = [[int(b[0]), f"{b[1]:.2f}", f"{b[2]:.2f}", f"{b[3]:.2f}", f"{b[4]:.2f}", f"{b[5]:.1f}",
+                 int(b[0]) + step - 1] for b in bars]
+        return JSONResponse(rows)
+
+    async def search(request: Request):
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        q = request.query_params.get("q", "").lower()
+        count = int(request.query_params.get("quotesCount", 10))
+        quotes = [x for x in universe if x["symbol"].lower().startswith(q) or x["shortname"].lower().startswith(q)]
+        return JSONResponse({"quotes": quotes[:count]})
+
+    return Starlette(routes=[Route("/api/v3/klines", klines), Route("/v1/finance/search", search)])
+
+
+class UpstreamServer:
+    """Runs the fake upstream app with uvicorn on a free local port, in a thread."""
+
+    def __init__(self, latency_ms: float = 0.0):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        config = uvicorn.Config(upstream_app(latency_ms), host="127.0.0.1", port=self.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=5)
+
+
+# --- Fake Redis pub/sub ---
+
+def resp_bulk(value: bytes) -> bytes:
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class RedisPublisher:
+    """
+    Just enough of a Redis server for one pub/sub listener: every command gets
+    +OK, and a PSUBSCRIBE is confirmed and followed by all `messages` (channel,
+    payload) as pmessage pushes, written in one go so the server costs next to
+    no CPU while the listener is measured.
+    """
+
+    def __init__(self, messages: List[Tuple[str, bytes]]):
+        self.messages = messages
+        self.conn = None
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.port = self.listener.getsockname()[1]
+        self.thread = threading.Thread(target=self._serve, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.port}/0"
+
+    def _serve(self):
+        try:
+            conn, _ = self.listener.accept()
+        except OSError:
+            return
+        self.conn = conn
+        with conn:
+            buffer = b""
+            while True:
+                try:
+                    chunk = conn.recv(65536)
+                except OSError:
+                    return
+                if not chunk:
+                    return
+                buffer += chunk
+                while True:
+                    command, buffer = self._take_command(buffer)
+                    if command is None:
+                        break
+                    if command[0].upper() == b"PSUBSCRIBE":
+                        pattern = command[1]
+                        conn.sendall(b"*3\r\n" + resp_bulk(b"psubscribe") + resp_bulk(pattern) + b":1\r\n")
+                        conn.sendall(b"".join(
+                            b"*4\r\n" + resp_bulk(b"pmessage") + resp_bulk(pattern) + resp_bulk(channel.encode()) + resp_bulk(data)
+                            for channel, data in self.messages
+                        ))
+                    else:
+                        conn.sendall(b"+OK\r\n")
+
+    @staticmethod
+    def _take_command(buffer: bytes):
+        """(arguments, rest) for one complete RESP array at the start of `buffer`, or (None, buffer)."""
+        if not buffer.startswith(b"*") or b"\r\n" not in buffer:
+            return None, buffer
+        header, rest = buffer.split(b"\r\n", 1)
+        args = []
+        for _ in range(int(header[1:])):
+            if b"\r\n" not in rest:
+                return None, buffer
+            length, rest = rest.split(b"\r\n", 1)
+            size = int(length[1:])
+            if len(rest) < size + 2:
+                return None, buffer
+            args.append(rest[:size])
+            rest = rest[size + 2:]
+        return args, rest
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.listener.close()
+        if self.conn is not None:
+            try:
+                self.conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self.thread.join(timeout=5)
+
+
+# --- Fake yfinance ---
+
+PERIOD_DAYS = {"1d": 1, "5d": 5, "1mo": 30, "3mo": 90, "6mo": 180, "1y": 365, "2y": 730, "5y": 1825, "max": 3650, "ytd": 180}
+INTERVAL_SECONDS = {"1m": 60, "2m": 120, "5m": 300, "15m": 900, "30m": 1800, "60m": 3600, "90m": 5400,
+                    "1h": 3600, "1d": 86400, "5d": 5 * 86400, "1wk": 7 * 86400, "1mo": 30 * 86400}
+
+
+def yf_frame(symbol: str, index: pd.DatetimeIndex) -> pd.DataFrame:
+    times_ms = index.as_unit("ns").asi8 // 1_000_000
+    bars = synthetic_bars(symbol, times_ms)
+    return pd.DataFrame({"Open": bars[:, 1], "High": bars[:, 2], "Low": bars[:, 3],
+                         "Close": bars[:, 4], "Volume": bars[:, 5]}, index=index)
+
+
+def _utc(t) -> pd.Timestamp:
+    t = pd.Timestamp(t)
+    return t.tz_localize("UTC") if t.tzinfo is None else t.tz_convert("UTC")
+
+
+def yf_index(period: Optional[str], interval: str, start=None, end=None) -> pd.DatetimeIndex:
+    step = INTERVAL_SECONDS.get(interval, 86400)
+    now = pd.Timestamp.now(tz="UTC").floor(f"{step}s")
+    end = _utc(end) if end is not None else now
+    if start is not None:
+        start = _utc(start)
+    else:
+        start = end - pd.Timedelta(days=PERIOD_DAYS.get(period or "1mo", 30))
+    return pd.date_range(start.ceil(f"{step}s"), end, freq=f"{step}s")
+
+
+class FakeTicker:
+    latency_ms = 0.0
+    news_count = 10
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+
+    def history(self, period: Optional[str] = None, interval: str = "1d", start=None, end=None, **kwargs) -> pd.DataFrame:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return yf_frame(self.symbol, yf_index(period, interval, start, end))
+
+    @property
+    def news(self) -> List[dict]:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        words = ["beats estimates", "shares fall", "holds meeting", "stock surges", "faces probe", "expands"]
+        items = []
+        for i in range(self.news_count):
+            # Every other story is market-wide and shared by all tickers (dedup path)
+            shared = i % 2 == 0
+            article_id = f"market-{i}" if shared else f"{self.symbol}-{i}"
+            title = f"{'Markets' if shared else self.symbol} {words[_seed(article_id) % len(words)]}"
+            items.append({"content": {"id": article_id, "title": title, "provider": {"displayName": "Bench Wire"},
+                                      "canonicalUrl": {"url": f"https://example.com/{article_id}"},
+                                      "pubDate": "2024-01-01T00:00:00Z"}})
+        return items
+
+
+def fake_download(tickers, period: Optional[str] = "1mo", interval: str = "1d", start=None, end=None, **kwargs) -> pd.DataFrame:
+    if FakeTicker.latency_ms:
+        time.sleep(FakeTicker.latency_ms / 1000)
+    tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+    index = yf_index(period, interval, start, end)
+    frames = {t: yf_frame(t, index) for t in tickers}
+    return pd.concat(frames, axis=1).swaplevel(0, 1, axis=1).sort_index(axis=1)
+
+
+def install_fake_yfinance(latency_ms: float = 0.0):
+    FakeTicker.latency_ms = latency_ms
+    yf.Ticker = FakeTicker
+    yf.download = fake_download
@@ -0,0 +1,341 @@
+"""
+Offline benchmark for the ai-engine. Nothing leaves the machine: Binance and
+Yahoo search are served by a local fake server, yfinance is replaced in-process
+and the Redis trade stream is replayed through the listener's message handler.
+
+    cd apps/ai-engine
+    python -m benchmarks.run --out bench.json
+    python -m benchmarks.compare before.json bench.json
+
+Results are JSON with one number per metric, so two runs diff cleanly.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from benchmarks.fakes import RedisPublisher, UpstreamServer, install_fake_yfinance, yf_frame
+
+TICKERS = ["AAPL", "MSFT", "NVDA", "RELIANCE.NS", "TCS.NS", "BTC-USD", "ETH-USD", "SOL-USD"]
+SEARCH_QUERIES = ["a", "al", "ala", "b", "br", "bra", "ch", "de", "en", "fi", "gl", "hy", "in", "ju", "ko", "lu",
+                  "ma", "no", "op", "pr", "aapl", "msft", "rel", "btc", "eth"]
+
+
+def percentiles(latencies: list) -> dict:
+    arr = np.asarray(latencies) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "p95_ms": round(float(np.percentile(arr, 95)), 3),
+        "p99_ms": round(float(np.percentile(arr, 99)), 3),
+        "max_ms": round(float(arr.max()), 3),
+    }
+
+
+async def load(client, urls: list, requests: int, concurrency: int) -> dict:
+    """Fire `requests` GETs over `urls` (round robin) from `concurrency` workers."""
+    latencies, errors = [], 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            resp = await client.get(urls[i % len(urls)])
+            latencies.append(time.perf_counter() - started)
+            if resp.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    return {"requests": requests, "concurrency": concurrency, "errors": errors,
+            "rps": round(requests / wall, 1), **percentiles(latencies)}
+
+
+async def bench_http(requests: int, concurrency: int) -> dict:
+    import httpx
+    import main
+    from services.ohlcv_cache import chart_cache
+    from services.history_store import history_store
+
+    scenarios = {
+        "chart": [f"/api/v1/chart/{t}?range=1mo" for t in TICKERS],
+        "chart_intraday": [f"/api/v1/chart/{t}?range=1d&interval=5m" for t in TICKERS],
+        "chart_columns": [f"/api/v1/chart/{t}?range=1y&format=columns" for t in TICKERS],
+        "charts_bulk": [f"/api/v1/charts?tickers={','.join(TICKERS)}&range=1mo"],
+        "signals": [f"/api/v1/signals?market={m}" for m in ("US", "IN", "CRYPTO")],
+        "news": [f"/api/v1/news/{t}" for t in TICKERS],
+        "search": [f"/api/v1/search?q={q}" for q in SEARCH_QUERIES],
+    }
+
+    results = {}
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Cold: every chart from upstream (fake), nothing cached in memory or on disk
+        chart_cache.clear()
+        history_store.root = tempfile.mkdtemp(prefix="bench-history-")
+        results["chart_cold"] = await load(client, scenarios["chart"], len(TICKERS), 1)
+        # Warm start: empty memory cache, history already on disk
+        chart_cache.clear()
+        results["chart_disk"] = await load(client, scenarios["chart"], len(TICKERS), 1)
+
+        for name, urls in scenarios.items():
+            await load(client, urls, len(urls), 1)  # Warm-up: fill caches and snapshots
+            results[name] = await load(client, urls, requests, concurrency)
+    return results
+
+
+def trade_payloads(messages: int) -> list:
+    """(channel, JSON payload) trades over 20 symbols, as the market data service publishes them."""
+    symbols = [f"SYM{i}USDT" for i in range(20)]
+    now = time.time()
+    return [
+        (f"market.trade.{symbols[i % len(symbols)]}",
+         json.dumps({"symbol": symbols[i % len(symbols)], "price": f"{100 + (i % 50) * 0.1:.2f}",
+                     "size": "0.5", "timestamp": datetime.fromtimestamp(now + i * 0.01, timezone.utc).isoformat(),
+                     "exchange": "BENCH"}))
+        for i in range(messages)
+    ]
+
+
+async def bench_sse(subscriber_counts: list, messages: int) -> list:
+    from services.mq_listener import broadcaster, handle_message
+    from services.subscriber_queue import QueuePolicy
+
+    payloads = trade_payloads(messages)
+
+    results = []
+    for count in subscriber_counts:
+        # Queues deep enough to hold the run and no conflation: measure fan-out, not the overflow policy
+        broadcaster.queue_size = messages * 4
+        received = [0] * count
+
+        async def consume(slot: int):
+            async for _ in broadcaster.subscribe(policy=QueuePolicy.DROP_OLDEST):
+                received[slot] += 1
+
+        consumers = [asyncio.create_task(consume(i)) for i in range(count)]
+        await asyncio.sleep(0)
+
+        started = time.perf_counter()
+        publish_time = 0.0
+        for i in range(0, messages, 100):
+            t = time.perf_counter()
+            for channel, data in payloads[i:i + 100]:
+                handle_message(channel, data)
+            publish_time += time.perf_counter() - t
+            await asyncio.sleep(0)  # Like the listener, yield between reads
+        while sum(q.lag for q in broadcaster.all_subscribers()) > 0:
+            await asyncio.sleep(0)
+        wall = time.perf_counter() - started
+
+        stats = broadcaster.stats()
+        for task in consumers:
+            task.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+
+        delivered = sum(received)
+        results.append({
+            "subscribers": count,
+            "messages": messages,
+            "publish_per_sec": round(messages / publish_time, 1),
+            "deliveries_per_sec": round(delivered / wall, 1),
+            "delivered": delivered,
+            "dropped": sum(s["dropped"] + s["conflated"] for s in stats),
+        })
+    return results
+
+
+async def bench_relay(messages: int) -> dict:
+    """
+    The Redis listener end to end: a fake Redis pushes `messages` trades and the
+    real listen_to_market_data reads, parses and relays them (no subscribers,
+    so this is the listener's own cost). CPU is the event loop thread's.
+    """
+    from services import mq_listener
+    from services.metrics import metrics
+
+    payloads = [(channel, data.encode()) for channel, data in trade_payloads(messages)]
+    with RedisPublisher(payloads) as server:
+        mq_listener.REDIS_URL = server.url
+        first = metrics.redis_messages.total
+        started, cpu_started = time.perf_counter(), time.thread_time()
+        listener = asyncio.create_task(mq_listener.listen_to_market_data())
+        while metrics.redis_messages.total - first < messages and not listener.done():
+            await asyncio.sleep(0.005)
+        wall, cpu = time.perf_counter() - started, time.thread_time() - cpu_started
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+
+    relayed = metrics.redis_messages.total - first
+    return {"messages": relayed, "msgs_per_sec": round(relayed / wall, 1),
+            "msgs_per_cpu_sec": round(relayed / cpu, 1)}
+
+
+def bench_parse_yf_history(sizes: list, repeats: int = 5) -> list:
+    import pandas as pd
+    from services.signal_generator import parse_yf_history
+
+    results = []
+    for interval, step in (("1d", "1D"), ("5m", "5min")):
+        for n in sizes:
+            index = pd.date_range(end=pd.Timestamp.now(tz="UTC").floor("D"), periods=n, freq=step)
+            frame = yf_frame("BENCH", index)
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                parse_yf_history(frame, interval)
+                timings.append(time.perf_counter() - started)
+            results.append({"interval": interval, "bars": n,
+                            "median_ms": round(statistics.median(timings) * 1000, 3),
+                            "min_ms": round(min(timings) * 1000, 3)})
+    return results
+
+
+def bench_screener(universes: list, sessions: int = 252, repeats: int = 5) -> list:
+    from services.screener import PriceMatrix, Scan, screen
+
+    results = []
+    for n in universes:
+        rng = np.random.default_rng(n)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, (n, sessions)), axis=1))
+        volume = rng.uniform(1e5, 1e6, (n, sessions))
+        matrix = PriceMatrix([f"SYM{i}" for i in range(n)], np.arange(sessions), close, volume)
+        screen_timings, query_timings = [], []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            fields = screen(matrix)
+            screen_timings.append(time.perf_counter() - started)
+            scan = Scan(np.asarray(matrix.tickers, dtype=object), fields, "", 0.0)
+            started = time.perf_counter()
+            scan.query(rsi_max=50, limit=50)
+            query_timings.append(time.perf_counter() - started)
+        results.append({"symbols": n, "sessions": sessions,
+                        "screen_median_ms": round(statistics.median(screen_timings) * 1000, 3),
+                        "query_median_ms": round(statistics.median(query_timings) * 1000, 3)})
+    return results
+
+
+def reference_lttb(y: list, threshold: int) -> list:
+    """Indices kept by the reference (Steinarsson) LTTB, written as published."""
+    n = len(y)
+    every = (n - 2) / (threshold - 2)
+    a, sampled = 0, [0]
+    for i in range(threshold - 2):
+        avg_start = int(math.floor((i + 1) * every)) + 1
+        avg_end = min(int(math.floor((i + 2) * every)) + 1, n)
+        avg_x = sum(range(avg_start, avg_end)) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+        max_area, next_a = -1.0, None
+        for j in range(int(math.floor(i * every)) + 1, int(math.floor((i + 1) * every)) + 1):
+            area = abs((a - avg_x) * (y[j] - y[a]) - (a - j) * (avg_y - y[a])) * 0.5
+            if area > max_area:
+                max_area, next_a = area, j
+        sampled.append(next_a)
+        a = next_a
+    sampled.append(n - 1)
+    return sampled
+
+
+def bench_downsample(cases: int = 300, repeats: int = 5) -> dict:
+    from services.downsample import lttb_indices
+
+    rng = np.random.default_rng(0)
+    mismatches = 0
+    for _ in range(cases):
+        n = int(rng.integers(10, 5_000))
+        threshold = int(rng.integers(3, n))
+        y = np.cumsum(rng.normal(0, 1, n))
+        if rng.random() < 0.25:
+            y = np.round(y)  # Plateaus exercise tie-breaking
+        if lttb_indices(y, threshold).tolist() != reference_lttb(y.tolist(), threshold):
+            mismatches += 1
+
+    y = np.cumsum(rng.normal(0, 1, 100_000))
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        lttb_indices(y, 1_000)
+        timings.append(time.perf_counter() - started)
+    return {"parity_cases": cases, "parity_mismatches": mismatches,
+            "lttb_100k_to_1k_median_ms": round(statistics.median(timings) * 1000, 3)}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args) -> dict:
+    results = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "upstream_latency_ms": args.upstream_latency_ms,
+        },
+    }
+    if "http" in args.only:
+        results["http"] = await bench_http(args.requests, args.concurrency)
+    if "sse" in args.only:
+        results["sse"] = await bench_sse(args.subscribers, args.messages)
+    if "relay" in args.only:
+        results["relay"] = await bench_relay(args.relay_messages)
+    if "parse" in args.only:
+        results["parse_yf_history"] = bench_parse_yf_history(args.bars)
+    if "screener" in args.only:
+        results["screener"] = bench_screener(args.universe)
+    if "downsample" in args.only:
+        results["downsample"] = bench_downsample()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline ai-engine benchmark")
+    parser.add_argument("--out", help="Write JSON results here (default: stdout)")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per HTTP scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0, help="Added to every fake upstream call")
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--messages", type=int, default=2000, help="Trades replayed per SSE run")
+    parser.add_argument("--relay-messages", type=int, default=100_000, help="Trades pushed through the Redis listener")
+    parser.add_argument("--bars", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--universe", type=int, nargs="+", default=[500, 2000], help="Symbols per screener run")
+    parser.add_argument("--only", nargs="+", default=["http", "sse", "relay", "parse", "screener", "downsample"],
+                        choices=["http", "sse", "relay", "parse", "screener", "downsample"])
+    args = parser.parse_args()
+
+    with UpstreamServer(args.upstream_latency_ms) as upstream:
+        # Must be set before the engine modules read their config at import
+        os.environ["BINANCE_API_URL"] = upstream.url
+        os.environ["YAHOO_SEARCH_URL"] = f"{upstream.url}/v1/finance/search"
+        os.environ["HISTORY_STORE_DIR"] = tempfile.mkdtemp(prefix="bench-history-")
+        install_fake_yfinance(args.upstream_latency_ms)
+        results = asyncio.run(run(args))
+
+    output = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
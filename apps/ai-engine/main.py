@@ -1,19 +1,32 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 from contextlib import asynccontextmanager
 import asyncio
+import os
 from services.mq_listener import listen_to_market_data
-from services.mq_listener import listen_to_market_data
-from routes import stream, admin
+from services.binance_client import binance_client
+from services.optimizer import shutdown_pool
+from services.signal_scheduler import signal_scheduler
+from services.history_store import prune_history
+from services.metrics import metrics, MetricsMiddleware
+from routes import stream, admin, backtest, screener, indicators
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Start Redis Listener
     task = asyncio.create_task(listen_to_market_data())
+    pruner = asyncio.create_task(prune_history())
+    signal_scheduler.start()
     yield
     # Shutdown logic (if any)
     task.cancel()
+    pruner.cancel()
+    await signal_scheduler.stop()
+    await binance_client.aclose()
+    await ticker_search.aclose()
+    shutdown_pool()
 
 app = FastAPI(
     title="Project Yukti AI Engine",
@@ -35,9 +48,13 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(stream.router, prefix="/api/v1")
 app.include_router(admin.router, prefix="/api/v1/admin")
+app.include_router(backtest.router, prefix="/api/v1")
+app.include_router(screener.router, prefix="/api/v1")
+app.include_router(indicators.router, prefix="/api/v1")
 
 @app.get("/")
 async def health_check():
@@ -47,8 +64,10 @@ async def health_check():
         "version": "0.1.0"
     }
 
-from models import MarketRegion, SignalResponse, ChartResponse, NewsResponse
-from services.signal_generator import get_market_signals, get_chart_data, get_ticker_news
+from models import MarketRegion, SignalResponse, ChartResponse, ChartsResponse, ChartFormat, DownsampleMethod, NewsResponse, SearchResponse
+from services.signal_generator import get_chart_data, iter_chart_data, CHART_INTERVALS
+from services.news import news_pipeline
+from services.ticker_search import ticker_search
 
 # ... imports ...
 
@@ -57,73 +76,89 @@ async def ping():
     return {"message": "pong"}
 
 @app.get("/api/v1/signals", response_model=SignalResponse)
-async def get_signals(market: MarketRegion = MarketRegion.IN):
+async def get_signals(request: Request, market: MarketRegion = MarketRegion.IN):
     """
     Fetch AI-generated signals for a specific market.
+    Served from the latest background snapshot; `Age` is its age in seconds and
+    `If-None-Match` with the last `ETag` returns 304 until a refresh changes a signal.
     """
-    return get_market_signals(market)
+    snapshot = signal_scheduler.snapshot(market)
+    metrics.cache("signals", "miss" if snapshot is None else "hit")
+    if snapshot is None:
+        # Cold start: wait for the first refresh (shared with the scheduler)
+        snapshot = await signal_scheduler.refresh(market)
+        if snapshot is None:
+            raise HTTPException(status_code=503, detail=f"Signals for {market.value} are not available yet")
+
+    headers = {"ETag": snapshot.etag, "Age": str(int(snapshot.age_seconds)), "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == snapshot.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+CHARTS_MAX_TICKERS = int(os.getenv("CHARTS_MAX_TICKERS", "32"))
+MIN_MAX_POINTS = 3  # LTTB keeps the first and last bar plus at least one
+
+def check_max_points(max_points):
+    if max_points is not None and max_points < MIN_MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"max_points must be at least {MIN_MAX_POINTS}")
+
+def check_interval(interval):
+    if interval and interval not in CHART_INTERVALS:
+        raise HTTPException(status_code=400, detail=f"Unknown interval: {interval}")
 
 @app.get("/api/v1/chart/{ticker}", response_model=ChartResponse)
-async def get_chart(ticker: str, range: str = "1mo", interval: str = None):
+async def get_chart(ticker: str, range: str = "1mo", interval: str = None, format: ChartFormat = ChartFormat.ROWS,
+                    max_points: int = None, downsample: DownsampleMethod = DownsampleMethod.OHLC):
     """
     Fetch historical chart data for a ticker.
     Range options: 1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max
     Interval options: 2m, 5m, 15m, 30m, 60m, 90m, 1h, 1d, 5d, 1wk, 1mo, 3mo
+    Format: rows (default, list of bars in `data`) or columns (arrays per field in `columns`)
+    max_points: return at most this many bars, reduced on the server by `downsample`:
+    ohlc (default, merges runs of bars into candles) or lttb (keeps the bars that
+    best preserve the close line)
+    """
+    check_interval(interval)
+    check_max_points(max_points)
+    return await get_chart_data(ticker, range, interval, format, max_points, downsample)
+
+@app.get("/api/v1/charts", response_model=ChartsResponse)
+async def get_charts(tickers: str, range: str = "1mo", interval: str = None, format: ChartFormat = ChartFormat.ROWS,
+                     max_points: int = None, downsample: DownsampleMethod = DownsampleMethod.OHLC, stream: bool = False):
+    """
+    Fetch charts for several tickers in one request (`tickers=AAPL,MSFT,BTC-USD`).
+    Uncached equities share one batched download; crypto is fetched concurrently.
+    With `stream=true` the response is NDJSON, one ChartResponse per line in
+    completion order, so each chart can be drawn as soon as it arrives.
+    `max_points` and `downsample` work as on /chart.
     """
-    return get_chart_data(ticker, range, interval)
+    ticker_list = list(dict.fromkeys(t.strip() for t in tickers.split(",") if t.strip()))
+    if not ticker_list:
+        raise HTTPException(status_code=400, detail="No tickers given")
+    if len(ticker_list) > CHARTS_MAX_TICKERS:
+        raise HTTPException(status_code=400, detail=f"At most {CHARTS_MAX_TICKERS} tickers per request")
+    check_interval(interval)
+    check_max_points(max_points)
+
+    charts = iter_chart_data(ticker_list, range, interval, format, max_points, downsample)
+    if stream:
+        return StreamingResponse((chart.model_dump_json() + "\n" async for chart in charts),
+                                 media_type="application/x-ndjson")
+    results = {chart.ticker: chart async for chart in charts}
+    return ChartsResponse(charts=[results[t] for t in ticker_list])
 
 @app.get("/api/v1/news/{ticker}", response_model=NewsResponse)
 async def get_news(ticker: str):
     """
     Fetch real-time news for a ticker.
+    Served from the news cache; sentiment is scored once per article.
     """
-    return get_ticker_news(ticker)
-
-import httpx
-from pydantic import BaseModel
-from typing import List
-
-class SearchResultItem(BaseModel):
-    symbol: str
-    name: str
-    exchange: str
-    type: str
-
-class SearchResponse(BaseModel):
-    results: List[SearchResultItem]
+    return await news_pipeline.get(ticker)
 
 @app.get("/api/v1/search", response_model=SearchResponse)
 async def search_ticker(q: str):
     """
     Search for tickers using Yahoo Finance Autocomplete.
+    Cached per normalized query; common prefixes are answered from a local index.
     """
-    if not q:
-        return {"results": []}
-    
-    url = "https://query1.finance.yahoo.com/v1/finance/search"
-    params = {
-        "q": q,
-        "quotesCount": 10,
-        "newsCount": 0
-    }
-    headers = {'User-Agent': 'Mozilla/5.0'}
-    
-    try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, params=params, headers=headers)
-            data = resp.json()
-        
-        items = []
-        if 'quotes' in data:
-            for quote in data['quotes']:
-                # Filter out non-equity if desired, keeping simple for now
-                items.append({
-                    "symbol": quote.get('symbol'),
-                    "name": quote.get('shortname') or quote.get('longname') or quote.get('symbol'),
-                    "exchange": quote.get('exchange', 'Unknown'),
-                    "type": quote.get('quoteType', 'Unknown')
-                })
-        return {"results": items}
-    except Exception as e:
-        print(f"Search API Error: {e}")
-        return {"results": []}
+    return SearchResponse(results=await ticker_search.search(q))
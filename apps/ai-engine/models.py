@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from enum import Enum
 from datetime import datetime
 
@@ -41,16 +41,49 @@ class ChartDataPoint(BaseModel):
     close: float
     volume: Optional[float] = None
 
+class ChartColumns(BaseModel):
+    """Column-oriented OHLCV series: one array per field instead of one object per bar."""
+    time: List[str | int] = []
+    open: List[float] = []
+    high: List[float] = []
+    low: List[float] = []
+    close: List[float] = []
+    volume: List[Optional[float]] = []
+
+class ChartFormat(str, Enum):
+    ROWS = "rows"
+    COLUMNS = "columns"
+
+class DownsampleMethod(str, Enum):
+    OHLC = "ohlc"  # Merge runs of bars into candles (keeps every high/low)
+    LTTB = "lttb"  # Keep the bars that best preserve the close line's shape
+
 class ChartResponse(BaseModel):
     ticker: str
     region: str
     interval: str
-    data: List[ChartDataPoint]
+    data: List[ChartDataPoint] = []
+    columns: Optional[ChartColumns] = None  # Set instead of data when format=columns
+
+class ChartsResponse(BaseModel):
+    """Several charts from one request, in the order the tickers were asked for."""
+    charts: List[ChartResponse]
 
 class SignalResponse(BaseModel):
     signals: List[Signal]
     market: MarketRegion
     count: int
+    generated_at: Optional[str] = None  # When the served snapshot was computed (ISO, UTC)
+
+# --- Search Models ---
+class SearchResultItem(BaseModel):
+    symbol: str
+    name: str
+    exchange: str
+    type: str
+
+class SearchResponse(BaseModel):
+    results: List[SearchResultItem]
 
 # --- News Models ---
 class NewsItem(BaseModel):
@@ -66,9 +99,194 @@ class NewsResponse(BaseModel):
     ticker: str
     news: List[NewsItem]
 
+class RouteLatency(BaseModel):
+    method: str
+    route: str
+    count: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+class UpstreamStats(BaseModel):
+    service: str
+    calls: int
+    errors: int
+    mean_ms: float
+    p95_ms: float
+
 class SystemStats(BaseModel):
     cpu_usage: float
     memory_usage: float
     active_connections: int
     total_api_calls: int
     uptime_seconds: int
+    rss_bytes: int = 0
+    stream_subscribers: int = 0
+    stream_queue_depth: int = Field(0, description="Events queued across all SSE subscribers")
+    stream_max_queue_depth: int = 0
+    redis_messages_per_second: float = 0
+    cache_hit_ratio: Dict[str, float] = {}
+    routes: List[RouteLatency] = []
+    upstream: List[UpstreamStats] = []
+
+class SubscriberStats(BaseModel):
+    id: int
+    policy: str
+    lag: int = Field(..., description="Events currently queued for this client")
+    max_lag: int
+    delivered: int
+    dropped: int
+    conflated: int
+    closed: bool
+
+class StreamStats(BaseModel):
+    subscriber_count: int
+    subscribers: List[SubscriberStats]
+
+# --- Backtest Models ---
+class BacktestStrategy(str, Enum):
+    SMA_CROSS = "sma_cross"
+    RSI_REVERSION = "rsi_reversion"
+    SIGNALS = "signals"  # Client-supplied signals (e.g. from a script run in the browser)
+
+class BacktestSignal(BaseModel):
+    time: str | int
+    type: SignalAction
+
+class BacktestRequest(BaseModel):
+    ticker: str
+    range: str = "1y"
+    interval: Optional[str] = None
+    strategy: BacktestStrategy = BacktestStrategy.SMA_CROSS
+    params: Dict[str, float] = {}
+    signals: List[BacktestSignal] = []
+    initial_capital: float = Field(100000, gt=0)
+    commission_percent: float = Field(0.1, ge=0, description="Percent of trade value, e.g. 0.1")
+    slippage_percent: float = Field(0.05, ge=0, description="Percent price impact, e.g. 0.05")
+
+class BacktestTrade(BaseModel):
+    id: str
+    entry_time: str | int
+    exit_time: Optional[str | int] = None
+    side: str  # LONG / SHORT
+    entry_price: float
+    exit_price: Optional[float] = None
+    size: float
+    pnl: Optional[float] = None
+    pnl_percent: Optional[float] = None
+    status: str
+
+class BacktestMetrics(BaseModel):
+    total_trades: int
+    win_rate: float
+    net_profit: float
+    net_profit_percent: float
+    max_drawdown: float = Field(..., description="Positive percent drop from peak")
+    profit_factor: float
+    sharpe_ratio: float = Field(..., description="Annualized")
+    daily_sharpe: float
+    annualized_return: float
+    avg_trade: float
+    best_trade: float
+    worst_trade: float
+    buy_and_hold_return: float
+
+class EquityCurve(BaseModel):
+    time: List[str | int]
+    value: List[float]
+
+class BacktestResponse(BaseModel):
+    ticker: str
+    interval: str
+    strategy: BacktestStrategy
+    bars: int
+    trades: List[BacktestTrade]
+    metrics: BacktestMetrics
+    equity_curve: EquityCurve
+
+# --- Optimizer Models ---
+class ParamRange(BaseModel):
+    start: float
+    end: float
+    step: float = 1
+
+class SearchMode(str, Enum):
+    GRID = "grid"
+    RANDOM = "random"
+
+class OptimizeRequest(BaseModel):
+    ticker: str
+    range: str = "1y"
+    interval: Optional[str] = None
+    strategy: BacktestStrategy = BacktestStrategy.SMA_CROSS
+    ranges: Dict[str, ParamRange]
+    search: SearchMode = SearchMode.GRID
+    samples: int = Field(200, gt=0, description="Parameter sets drawn in random search")
+    seed: Optional[int] = None
+    objective: str = Field("net_profit", description="BacktestMetrics field to optimize")
+    minimize: bool = False
+    patience: Optional[int] = Field(None, gt=0, description="Stop after this many results without improvement")
+    initial_capital: float = Field(10000, gt=0)
+    commission_percent: float = Field(0.1, ge=0)
+    slippage_percent: float = Field(0.05, ge=0)
+
+# --- Screener Models ---
+class ScreenerSort(str, Enum):
+    CONFIDENCE = "confidence"
+    RSI = "rsi"
+    CHANGE = "change_pct"
+    MOMENTUM_20D = "momentum_20d"
+    MOMENTUM_60D = "momentum_60d"
+    VOLATILITY = "volatility_20d"
+    VOLUME_RATIO = "volume_ratio"
+
+class ScreenerItem(BaseModel):
+    ticker: str
+    price: float
+    change_pct: Optional[float] = None  # Last close vs the previous one, in %
+    rsi: Optional[float] = None
+    sma_20: Optional[float] = None
+    sma_50: Optional[float] = None
+    momentum_20d: Optional[float] = None  # Return over 20 sessions, in %
+    momentum_60d: Optional[float] = None
+    volatility_20d: Optional[float] = None  # Annualized, in %
+    volume_ratio: Optional[float] = None  # Last volume / 20-session average
+    action: SignalAction
+    confidence: float
+    driver: str
+
+class ScreenerResponse(BaseModel):
+    market: MarketRegion
+    universe: int  # Symbols with data in the scan
+    total: int  # Matches after filtering
+    offset: int
+    limit: int
+    computed_at: str
+    items: List[ScreenerItem]
+
+# --- Indicator Models ---
+class IndicatorConfig(BaseModel):
+    """An indicator as configured on the web chart (IndicatorConfig in apps/web/lib/indicators.ts)."""
+    id: Optional[str] = None
+    type: str  # SMA, EMA, BollingerBands, ParabolicSAR, RSI, MACD, Stochastic, CCI, ATR, WilliamsR, SuperTrend
+    params: Dict[str, Any] = {}  # Missing or zero settings take the indicator's defaults
+
+class IndicatorsRequest(BaseModel):
+    range: str = "1mo"
+    interval: Optional[str] = None
+    indicators: List[IndicatorConfig]
+
+class IndicatorOutput(BaseModel):
+    id: str
+    type: str
+    name: str  # Display name, e.g. "MACD (12, 26, 9)"
+    pane: str  # "overlay" (on the price chart) or "separate"
+    params: Dict[str, float]  # Settings used, defaults filled in
+    values: Dict[str, List[Optional[float]]]  # One value per bar, null during warm-up
+
+class IndicatorsResponse(BaseModel):
+    ticker: str
+    interval: str
+    time: List[str | int]
+    indicators: List[IndicatorOutput]
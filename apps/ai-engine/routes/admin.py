@@ -1,21 +1,61 @@
 from fastapi import APIRouter
-from models import SystemStats
-import random
+from fastapi.responses import PlainTextResponse
+from models import SystemStats, StreamStats
+from services.mq_listener import broadcaster
+from services.metrics import metrics
 import time
 
 router = APIRouter()
 
 START_TIME = time.time()
 
+def stream_gauges() -> dict:
+    lags = [q.lag for q in broadcaster.all_subscribers()]
+    return {
+        "subscribers": len(lags),
+        "queue_depth": sum(lags),
+        "max_queue_depth": max(lags, default=0),
+        "replayed_events": broadcaster.replayed,
+        "resume_snapshots": broadcaster.snapshots,
+    }
+
 @router.get("/stats", response_model=SystemStats)
 async def get_system_stats():
     """
     Get current system status and usage metrics.
+    CPU is the process's share of one core since the previous read; memory is RSS
+    as a share of host memory. Latency percentiles are estimated from histograms.
     """
+    stream = stream_gauges()
     return SystemStats(
-        cpu_usage=round(random.uniform(10.0, 45.0), 1),
-        memory_usage=round(random.uniform(20.0, 60.0), 1),
-        active_connections=random.randint(5, 50),
-        total_api_calls=random.randint(1000, 50000),
-        uptime_seconds=int(time.time() - START_TIME)
+        cpu_usage=round(metrics.process.cpu_percent(), 1),
+        memory_usage=round(metrics.process.memory_percent(), 1),
+        active_connections=metrics.in_flight,
+        total_api_calls=metrics.total_requests,
+        uptime_seconds=int(time.time() - START_TIME),
+        rss_bytes=metrics.process.rss_bytes(),
+        stream_subscribers=stream["subscribers"],
+        stream_queue_depth=stream["queue_depth"],
+        stream_max_queue_depth=stream["max_queue_depth"],
+        redis_messages_per_second=round(metrics.redis_messages.rate(), 2),
+        cache_hit_ratio=metrics.cache_hit_ratios(),
+        routes=metrics.route_latencies(),
+        upstream=metrics.upstream_stats(),
     )
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_prometheus_metrics():
+    """
+    The same instrumentation in Prometheus text exposition format.
+    """
+    stream = stream_gauges()
+    gauges = {f"yukti_stream_{name}": value for name, value in stream.items()}
+    return PlainTextResponse(metrics.render_prometheus(gauges), media_type="text/plain; version=0.0.4")
+
+@router.get("/stream", response_model=StreamStats)
+async def get_stream_stats():
+    """
+    Per-subscriber SSE queue depth and drop/conflation counters.
+    """
+    subscribers = broadcaster.stats()
+    return StreamStats(subscriber_count=len(subscribers), subscribers=subscribers)
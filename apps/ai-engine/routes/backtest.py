@@ -0,0 +1,115 @@
+from fastapi import APIRouter, HTTPException
+from sse_starlette.sse import EventSourceResponse
+import asyncio
+import json
+from contextlib import aclosing
+from models import (BacktestRequest, BacktestResponse, BacktestMetrics, BacktestStrategy, ChartFormat, EquityCurve,
+                    OptimizeRequest, SearchMode, SignalAction)
+from services.signal_generator import get_chart_data, CHART_INTERVALS
+from services.backtest import BacktestOptions, backtest_columns, BUY, SELL
+from services.optimizer import (OptimizationJob, optimization_jobs, expand_grid, grid_size, sample_random,
+                                OPTIMIZER_MAX_COMBINATIONS)
+
+router = APIRouter()
+
+def check_interval(interval):
+    if interval and interval not in CHART_INTERVALS:
+        raise HTTPException(status_code=400, detail=f"Unknown interval: {interval}")
+
+@router.post("/backtest", response_model=BacktestResponse)
+async def run_backtest(req: BacktestRequest):
+    """
+    Backtest a built-in strategy (sma_cross, rsi_reversion) or client-supplied
+    signals over the same history the chart endpoint serves.
+    """
+    check_interval(req.interval)
+    chart = await get_chart_data(req.ticker, req.range, req.interval, ChartFormat.COLUMNS)
+    columns = chart.columns
+    if columns is None or not columns.time:
+        raise HTTPException(status_code=404, detail=f"No history for {req.ticker}")
+
+    events = [(s.time, BUY if s.type == SignalAction.BUY else SELL) for s in req.signals if s.type != SignalAction.NEUTRAL]
+    options = BacktestOptions(
+        initial_capital=req.initial_capital,
+        commission_percent=req.commission_percent,
+        slippage_percent=req.slippage_percent,
+    )
+    try:
+        # CPU-bound, keep it off the event loop
+        result = await asyncio.to_thread(backtest_columns, columns, req.strategy.value, req.params, events, options)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    equity = result["equity"]
+    return BacktestResponse(
+        ticker=req.ticker,
+        interval=chart.interval,
+        strategy=req.strategy,
+        bars=len(columns.time),
+        trades=result["trades"],
+        metrics=result["metrics"],
+        equity_curve=EquityCurve(time=columns.time[:len(equity)], value=equity.tolist()),
+    )
+
+@router.post("/optimize")
+async def optimize_strategy(req: OptimizeRequest):
+    """
+    Parameter sweep (grid or random search) for a built-in strategy, run on all cores.
+    Streams SSE `job` (id for cancellation), one `result` per parameter set as it
+    finishes, and a final `done` with the best result.
+    """
+    check_interval(req.interval)
+    if req.strategy == BacktestStrategy.SIGNALS:
+        raise HTTPException(status_code=400, detail="Optimization needs a built-in strategy")
+    if req.objective not in BacktestMetrics.model_fields:
+        raise HTTPException(status_code=400, detail=f"Unknown objective: {req.objective}")
+
+    ranges = {name: (r.start, r.end, r.step) for name, r in req.ranges.items()}
+    try:
+        # Counted before anything is built: a large grid would block the loop and exhaust memory
+        size = grid_size(ranges)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if req.search == SearchMode.RANDOM:
+        combos = sample_random(ranges, min(req.samples, OPTIMIZER_MAX_COMBINATIONS), req.seed)
+    elif size > OPTIMIZER_MAX_COMBINATIONS:
+        raise HTTPException(status_code=400, detail=f"{size} combinations exceed the limit of {OPTIMIZER_MAX_COMBINATIONS}")
+    else:
+        combos = expand_grid(ranges)
+    if not combos:
+        raise HTTPException(status_code=400, detail="Empty parameter space")
+
+    chart = await get_chart_data(req.ticker, req.range, req.interval, ChartFormat.COLUMNS)
+    if chart.columns is None or not chart.columns.time:
+        raise HTTPException(status_code=404, detail=f"No history for {req.ticker}")
+
+    options = BacktestOptions(
+        initial_capital=req.initial_capital,
+        commission_percent=req.commission_percent,
+        slippage_percent=req.slippage_percent,
+    )
+    job = OptimizationJob(chart.columns, req.strategy.value, combos, options,
+                          objective=req.objective, minimize=req.minimize, patience=req.patience)
+
+    async def events():
+        optimization_jobs[job.id] = job
+        try:
+            yield {"event": "job", "data": json.dumps({"id": job.id, "total": len(combos)})}
+            # aclosing: on disconnect, run() is closed right away, which unlinks its shared memory
+            async with aclosing(job.run()) as results:
+                async for result in results:
+                    yield {"event": "done" if result.get("done") else "result", "data": json.dumps(result)}
+        finally:
+            # Also runs when the client disconnects: pending chunks are cancelled
+            job.cancel()
+            optimization_jobs.pop(job.id, None)
+
+    return EventSourceResponse(events())
+
+@router.delete("/optimize/{job_id}")
+async def cancel_optimization(job_id: str):
+    job = optimization_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No running job {job_id}")
+    job.cancel()
+    return {"id": job_id, "cancelled": True}
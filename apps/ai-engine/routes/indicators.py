@@ -0,0 +1,35 @@
+from fastapi import APIRouter, HTTPException, Response
+from models import ChartFormat, IndicatorsRequest, IndicatorsResponse
+from services.signal_generator import get_chart_data, CHART_INTERVALS
+from services.indicator_cache import compute_indicators, render_response, resolve_configs
+import os
+
+router = APIRouter()
+
+INDICATORS_MAX_PER_REQUEST = int(os.getenv("INDICATORS_MAX_PER_REQUEST", "32"))
+
+@router.post("/indicators/{ticker}", response_model=IndicatorsResponse)
+async def get_indicators(ticker: str, req: IndicatorsRequest):
+    """
+    Compute chart indicators (the web chart's IndicatorConfig list) over the same
+    bars /chart serves for `range`/`interval`. One value per bar in `time`,
+    null during each indicator's warm-up. Results are cached per series and
+    settings and only the bars that changed are recomputed.
+    """
+    if req.interval and req.interval not in CHART_INTERVALS:
+        raise HTTPException(status_code=400, detail=f"Unknown interval: {req.interval}")
+    if not req.indicators or len(req.indicators) > INDICATORS_MAX_PER_REQUEST:
+        raise HTTPException(status_code=400, detail=f"Between 1 and {INDICATORS_MAX_PER_REQUEST} indicators per request")
+    try:
+        configs = resolve_configs(req.indicators)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    chart = await get_chart_data(ticker, req.range, req.interval, ChartFormat.COLUMNS)
+    columns = chart.columns
+    if columns is None or not columns.time:
+        raise HTTPException(status_code=404, detail=f"No history for {ticker}")
+
+    outputs = await compute_indicators((ticker, req.range, chart.interval), columns, configs)
+    # Outputs come serialized from the cache; skip re-validating thousands of values per request
+    return Response(content=render_response(ticker, chart.interval, columns, outputs), media_type="application/json")
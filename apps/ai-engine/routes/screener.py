@@ -0,0 +1,31 @@
+from fastapi import APIRouter, HTTPException
+from typing import Optional
+from models import MarketRegion, ScreenerResponse, ScreenerSort, SignalAction
+from services.screener import screener
+import os
+
+router = APIRouter()
+
+SCREENER_MAX_LIMIT = int(os.getenv("SCREENER_MAX_LIMIT", "500"))
+
+@router.get("/screener", response_model=ScreenerResponse)
+async def screen_market(market: MarketRegion = MarketRegion.US, action: Optional[SignalAction] = None,
+                        rsi_min: Optional[float] = None, rsi_max: Optional[float] = None,
+                        above_sma_20: Optional[bool] = None, sort: ScreenerSort = ScreenerSort.CONFIDENCE,
+                        descending: bool = True, offset: int = 0, limit: int = 50):
+    """
+    Rank a market's whole universe (SCREENER_UNIVERSE_DIR/{market}.txt, or the
+    built-in tickers) by technical signals. Filter by `action`, an RSI band or
+    position against the 20-day SMA; sort by any numeric field; page with
+    `offset`/`limit`. Scans are recomputed at most every SCREENER_TTL_SECONDS.
+    """
+    if offset < 0 or not 1 <= limit <= SCREENER_MAX_LIMIT:
+        raise HTTPException(status_code=400, detail=f"offset must be >= 0 and limit between 1 and {SCREENER_MAX_LIMIT}")
+
+    scan = await screener.scan(market)
+    if scan is None:
+        raise HTTPException(status_code=503, detail=f"Screener for {market.value} is not available yet")
+
+    total, items = scan.query(action, rsi_min, rsi_max, above_sma_20, sort, descending, offset, limit)
+    return ScreenerResponse(market=market, universe=scan.size, total=total, offset=offset, limit=limit,
+                            computed_at=scan.computed_at, items=items)
@@ -1,15 +1,39 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Header
+from typing import Optional
 from sse_starlette.sse import EventSourceResponse
 from services.mq_listener import broadcaster
+from services.subscriber_queue import QueuePolicy
 import asyncio
+import os
 
 router = APIRouter()
 
+# Bounds for the client-chosen batching window
+STREAM_BATCH_MIN_MS = int(os.getenv("STREAM_BATCH_MIN_MS", "50"))
+STREAM_BATCH_MAX_MS = int(os.getenv("STREAM_BATCH_MAX_MS", "250"))
+
 @router.get("/stream")
-async def stream_market_data():
+async def stream_market_data(symbols: Optional[str] = None, policy: Optional[QueuePolicy] = None,
+                             batch_ms: Optional[int] = None, latest: bool = False,
+                             last_event_id: Optional[str] = None,
+                             last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")):
     """
     Server-Sent Events (SSE) endpoint for real-time market data.
+    Pass `symbols=btcusdt,ethusdt` to receive only those symbols (default: all).
+    `policy` overrides how a lagging client's queue overflows:
+    conflate (newest pending event per symbol), drop_oldest or disconnect.
+
+    `batch_ms` (clamped to 50-250) opts into batched mode: trades arriving within
+    each window are sent as one `trades` event whose data is a JSON array.
+    Add `latest=true` to keep only the newest trade per symbol in each frame.
+
+    Every event carries an id. Browsers reconnect with a Last-Event-ID header
+    (or pass `last_event_id` explicitly) and receive exactly the events they
+    missed; if the gap is too old to replay they get a `snapshot` event listing
+    the affected symbols, followed by the latest trade, bars and signal of each.
     """
+    symbol_list = symbols.split(",") if symbols else None
+    batch_window = min(max(batch_ms, STREAM_BATCH_MIN_MS), STREAM_BATCH_MAX_MS) / 1000 if batch_ms else None
     return EventSourceResponse(
-        broadcaster.subscribe()
+        broadcaster.subscribe(symbol_list, policy, batch_window, last_event_id_header or last_event_id, latest)
     )
@@ -0,0 +1,263 @@
+import math
+import numpy as np
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from models import ChartColumns
+from services.indicators import sma, rsi
+
+# Server-side port of the web BacktestEngine (apps/web/lib/backtest-engine.ts).
+# Same execution model: a signal generated at a bar's close fills at the next
+# bar's open with slippage, positions are all-in and flip long/short, equity is
+# marked to market at each close and the open position is force-closed on the
+# last bar. Trades are only as many as signal flips, so the per-trade work is a
+# small scalar loop and everything per-bar is done on whole arrays.
+
+BUY = 1
+SELL = -1
+
+MS_PER_YEAR = 31536000000
+
+
+@dataclass
+class BacktestOptions:
+    initial_capital: float = 100000.0
+    commission_percent: float = 0.1
+    slippage_percent: float = 0.05
+
+
+# --- Strategies: close prices -> signal array (+1 BUY, -1 SELL, 0 none) ---
+
+def sma_cross_signals(close: np.ndarray, fast: int = 10, slow: int = 30) -> np.ndarray:
+    spread = np.sign(sma(close, int(fast)) - sma(close, int(slow)))
+    spread = np.nan_to_num(spread)
+    signals = np.zeros(close.shape, dtype=np.int8)
+    crossed = (spread[1:] != spread[:-1]) & (spread[1:] != 0)
+    signals[1:][crossed] = spread[1:][crossed]
+    return signals
+
+
+def rsi_reversion_signals(close: np.ndarray, period: int = 14, lower: float = 30, upper: float = 70) -> np.ndarray:
+    value = rsi(close, int(period))
+    signals = np.zeros(close.shape, dtype=np.int8)
+    signals[value < lower] = BUY
+    signals[value > upper] = SELL
+    return signals
+
+
+STRATEGIES = {
+    "sma_cross": sma_cross_signals,
+    "rsi_reversion": rsi_reversion_signals,
+}
+
+
+def strategy_signals(strategy: str, close: np.ndarray, params: Dict[str, float]) -> np.ndarray:
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+    return STRATEGIES[strategy](close, **params)
+
+
+def signals_from_events(times: list, events: List[tuple]) -> np.ndarray:
+    """(time, +1/-1) events, e.g. from a client script, -> signal array. Last event per bar wins."""
+    index = {t: i for i, t in enumerate(times)}
+    signals = np.zeros(len(times), dtype=np.int8)
+    for t, direction in events:
+        i = index.get(t)
+        if i is not None:
+            signals[i] = direction
+    return signals
+
+
+def backtest_columns(columns: ChartColumns, strategy: str, params: Dict[str, float],
+                     events: Optional[List[tuple]] = None, options: Optional[BacktestOptions] = None) -> dict:
+    """Backtest a chart series (as served by get_chart_data) with a named strategy or given signals."""
+    opens = np.asarray(columns.open, dtype=float)
+    closes = np.asarray(columns.close, dtype=float)
+    if strategy == "signals":
+        signals = signals_from_events(columns.time, events or [])
+    else:
+        signals = strategy_signals(strategy, closes, params)
+    return run_backtest(columns.time, opens, closes, signals, options)
+
+
+# --- Engine ---
+
+def _epoch_ms(t) -> float:
+    if isinstance(t, (int, np.integer)):
+        return float(t) * 1000  # Chart times are UNIX seconds for intraday
+    return datetime.strptime(str(t)[:10], "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp() * 1000
+
+
+def _close_trade(trade: dict, price: float, time, fee_rate: float):
+    trade["exit_time"] = time
+    trade["exit_price"] = price
+    trade["status"] = "CLOSED"
+    entry_val = trade["size"] * trade["entry_price"]
+    raw_pnl = trade["side_sign"] * (price - trade["entry_price"]) * trade["size"]
+    trade["pnl"] = raw_pnl - (entry_val + trade["size"] * price) * fee_rate
+    trade["pnl_percent"] = trade["pnl"] / entry_val * 100
+
+
+def run_backtest(times: list, opens: np.ndarray, closes: np.ndarray, signals: np.ndarray,
+                 options: Optional[BacktestOptions] = None) -> dict:
+    options = options or BacktestOptions()
+    n = len(closes)
+    if n == 0:
+        return {"trades": [], "metrics": calculate_metrics([], closes, times, opens, closes, options.initial_capital), "equity": closes}
+
+    fee_rate = options.commission_percent / 100
+    slippage_rate = options.slippage_percent / 100
+    opens = np.where(np.isnan(opens), closes, opens)
+
+    # Executions: a signal on bar i fills at bar i + 1; same-side signals are no-ops
+    side = 0
+    executions = []
+    for i in np.flatnonzero(signals[:-1]):
+        direction = int(signals[i])
+        if direction != side:
+            executions.append((i + 1, direction))
+            side = direction
+
+    # Walk the executions with scalar cash/position accounting (mirrors the web engine)
+    trades: List[dict] = []
+    cash = options.initial_capital
+    realized = 0.0
+    position: Optional[dict] = None
+    # One segment per execution: position held from seg_start until the next one
+    seg_start, seg_side, seg_size, seg_entry, seg_realized = [0], [0], [0.0], [0.0], [0.0]
+    seg_trade: List[Optional[dict]] = [None]
+
+    for bar, direction in executions:
+        open_price = opens[bar]
+        exec_price = open_price * (1 + slippage_rate) if direction == BUY else open_price * (1 - slippage_rate)
+
+        if position is not None:
+            _close_trade(position, exec_price, times[bar], fee_rate)
+            realized += position["pnl"]
+            if position["side_sign"] == SELL:
+                cash += position["pnl"] + position["size"] * position["entry_price"]  # Return collateral + PnL
+            else:
+                cash += position["size"] * exec_price * (1 - fee_rate)
+            position["exit_bar"] = bar
+            trades.append(position)
+            position = None
+
+        size = cash * 0.99 / (exec_price * (1 + fee_rate))  # Leave 1% buffer
+        if size > 0:
+            cash -= size * exec_price * (1 + fee_rate)
+            position = {
+                "id": f"trade-{len(trades) + 1}",
+                "entry_time": times[bar],
+                "side": "LONG" if direction == BUY else "SHORT",
+                "side_sign": direction,
+                "entry_price": exec_price,
+                "size": size,
+                "status": "OPEN",
+                "entry_bar": bar,
+            }
+
+        seg_start.append(bar)
+        seg_side.append(direction if position else 0)
+        seg_size.append(size if position else 0.0)
+        seg_entry.append(exec_price if position else 0.0)
+        seg_realized.append(realized)
+        seg_trade.append(position)
+
+    # Mark to market every bar at once
+    lengths = np.diff(np.append(seg_start, n))
+    bar_side = np.repeat(seg_side, lengths)
+    bar_size = np.repeat(seg_size, lengths)
+    bar_entry = np.repeat(seg_entry, lengths)
+    bar_realized = np.repeat(seg_realized, lengths)
+    equity = options.initial_capital + bar_realized + bar_side * bar_size * (closes - bar_entry)
+
+    # Liquidation: stop at the first bar where equity hits zero
+    busted = np.flatnonzero(equity <= 0)
+    if busted.size:
+        j = int(busted[0])
+        equity = equity[:j + 1]
+        equity[j] = 0.0
+        trades = [t for t in trades if t["exit_bar"] <= j]
+        position = seg_trade[np.searchsorted(seg_start, j, side="right") - 1]
+        if position is not None:
+            _close_trade(position, closes[j], times[j], fee_rate)
+            trades.append(position)
+            position = None
+
+    # Force close at end (close price with slippage)
+    if position is not None:
+        last = closes[-1]
+        exit_price = last * (1 - slippage_rate) if position["side_sign"] == BUY else last * (1 + slippage_rate)
+        _close_trade(position, exit_price, times[-1], fee_rate)
+        trades.append(position)
+
+    for t in trades:
+        for key in ("side_sign", "entry_bar", "exit_bar"):
+            t.pop(key, None)
+
+    metrics = calculate_metrics(trades, equity, times, opens, closes, options.initial_capital)
+    trades.reverse()
+    return {"trades": trades, "metrics": metrics, "equity": equity}
+
+
+def calculate_metrics(trades: List[dict], equity: np.ndarray, times: list, opens: np.ndarray,
+                      closes: np.ndarray, initial_capital: float) -> dict:
+    n = len(closes)
+    if not trades:
+        start_price = closes[0] if n and closes[0] else 1
+        end_price = closes[-1] if n and closes[-1] else 1
+        return {
+            "total_trades": 0, "win_rate": 0, "net_profit": 0, "net_profit_percent": 0,
+            "max_drawdown": 0, "profit_factor": 0, "sharpe_ratio": 0, "daily_sharpe": 0,
+            "annualized_return": 0, "avg_trade": 0, "best_trade": 0, "worst_trade": 0,
+            "buy_and_hold_return": (end_price - start_price) / start_price * 100,
+        }
+
+    pnl = np.array([t["pnl"] for t in trades])
+    pnl_percent = np.array([t["pnl_percent"] for t in trades])
+    total_profit = pnl[pnl > 0].sum()
+    total_loss = abs(pnl[pnl <= 0].sum())
+    net_profit = total_profit - total_loss
+
+    peak = np.maximum.accumulate(equity)
+    max_dd = float(np.max((peak - equity) / peak))
+
+    returns = np.diff(equity) / equity[:-1]
+    mean_return = returns.mean() if returns.size else math.nan
+    std = returns.std() if returns.size else math.nan
+    daily_sharpe = 0.0 if std == 0 or math.isnan(std) else float(mean_return / std)
+
+    total_ms = _epoch_ms(times[-1]) - _epoch_ms(times[0])
+    bars_per_year = MS_PER_YEAR / (total_ms / n) if total_ms > 0 else 0
+    sharpe = daily_sharpe * math.sqrt(bars_per_year) if bars_per_year > 0 else 0
+
+    annualized_return = 0.0
+    factor = bars_per_year / n
+    end_equity = equity[-1]
+    if end_equity > 0 and initial_capital > 0 and factor > 0:
+        try:
+            annualized_return = ((end_equity / initial_capital) ** factor - 1) * 100
+        except OverflowError:
+            annualized_return = 0.0
+    if not math.isfinite(annualized_return):
+        annualized_return = 0.0
+
+    start_price = opens[0] or closes[0] or 1
+    end_price = closes[-1] or 1
+
+    return {
+        "total_trades": len(trades),
+        "win_rate": float((pnl > 0).sum() / len(trades) * 100),
+        "net_profit": float(net_profit),
+        "net_profit_percent": float(net_profit / initial_capital * 100),
+        "max_drawdown": max_dd * 100,
+        "profit_factor": float(total_profit if total_loss == 0 else total_profit / total_loss),
+        "sharpe_ratio": float(sharpe),
+        "daily_sharpe": daily_sharpe,
+        "annualized_return": float(annualized_return),
+        "avg_trade": float(pnl_percent.mean()),
+        "best_trade": float(pnl_percent.max()),
+        "worst_trade": float(pnl_percent.min()),
+        "buy_and_hold_return": float((end_price - start_price) / start_price * 100),
+    }
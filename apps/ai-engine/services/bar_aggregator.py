@@ -0,0 +1,151 @@
+import os
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from models import ChartColumns
+
+# Bar intervals rolled from the trade stream (seconds)
+AGG_INTERVALS: Dict[str, int] = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "1h": 3600,
+}
+
+# yfinance spellings of the same intervals
+INTERVAL_ALIASES = {"60m": "1h"}
+
+BAR_BUFFER_SIZE = int(os.getenv("BAR_BUFFER_SIZE", "1440"))  # Closed bars kept per symbol & interval
+
+
+class BarRing:
+    """Fixed-size ring buffer of closed OHLCV bars, stored as NumPy columns."""
+
+    def __init__(self, capacity: int = BAR_BUFFER_SIZE):
+        self.capacity = capacity
+        self.time = np.zeros(capacity, dtype=np.int64)
+        self.ohlcv = np.zeros((5, capacity), dtype=np.float64)
+        self.start = 0
+        self.count = 0
+
+    def append(self, bar: list):
+        idx = (self.start + self.count) % self.capacity
+        self.time[idx] = bar[0]
+        self.ohlcv[:, idx] = bar[1:]
+        if self.count == self.capacity:
+            self.start = (self.start + 1) % self.capacity
+        else:
+            self.count += 1
+
+    def first_time(self) -> Optional[int]:
+        return int(self.time[self.start]) if self.count else None
+
+    def ordered(self) -> Tuple[np.ndarray, np.ndarray]:
+        idx = (self.start + np.arange(self.count)) % self.capacity
+        return self.time[idx], self.ohlcv[:, idx]
+
+
+class LiveSeries:
+    """Closed bars plus the bar currently forming, for one symbol and interval."""
+
+    def __init__(self, seconds: int, capacity: int = BAR_BUFFER_SIZE):
+        self.seconds = seconds
+        self.ring = BarRing(capacity)
+        self.current: Optional[list] = None  # [time, open, high, low, close, volume]
+        # The first bucket we see started before we were listening, so it is incomplete
+        self.partial_bucket: Optional[int] = None
+
+    def on_trade(self, ts: float, price: float, size: float) -> Optional[list]:
+        """Apply a trade; returns the bar it closed, if any."""
+        bucket = int(ts // self.seconds) * self.seconds
+        bar = self.current
+
+        if bar is None:
+            self.partial_bucket = bucket
+            self.current = [bucket, price, price, price, price, size]
+            return None
+
+        if bucket < bar[0]:
+            return None  # Late trade for an already closed bar
+
+        if bucket == bar[0]:
+            bar[2] = max(bar[2], price)
+            bar[3] = min(bar[3], price)
+            bar[4] = price
+            bar[5] += size
+            return None
+
+        closed = None
+        if bar[0] != self.partial_bucket:
+            self.ring.append(bar)
+            closed = bar
+        self.current = [bucket, price, price, price, price, size]
+        return closed
+
+    def earliest_time(self) -> Optional[int]:
+        first = self.ring.first_time()
+        if first is not None:
+            return first
+        if self.current is not None and self.current[0] != self.partial_bucket:
+            return self.current[0]
+        return None
+
+    def columns_since(self, since: int) -> ChartColumns:
+        times, ohlcv = self.ring.ordered()
+        mask = times >= since
+        columns = {
+            "time": times[mask].tolist(),
+            "open": ohlcv[0, mask].tolist(),
+            "high": ohlcv[1, mask].tolist(),
+            "low": ohlcv[2, mask].tolist(),
+            "close": ohlcv[3, mask].tolist(),
+            "volume": ohlcv[4, mask].tolist(),
+        }
+        bar = self.current
+        if bar is not None and bar[0] != self.partial_bucket and bar[0] >= since:
+            for field, value in zip(columns, bar):
+                columns[field].append(value)
+        return ChartColumns.model_construct(**columns)
+
+
+class BarAggregator:
+    """Rolls trades from the Redis stream into OHLCV bars at several intervals."""
+
+    def __init__(self, intervals: Dict[str, int] = AGG_INTERVALS, capacity: int = BAR_BUFFER_SIZE):
+        self.intervals = intervals
+        self.capacity = capacity
+        self.series: Dict[str, Dict[str, LiveSeries]] = {}
+
+    def has(self, symbol: str) -> bool:
+        return symbol in self.series
+
+    def on_trade(self, symbol: str, ts: float, price: float, size: float) -> List[Tuple[str, list]]:
+        """Apply a trade to every interval; returns (interval, bar) for each bar closed."""
+        per_interval = self.series.get(symbol)
+        if per_interval is None:
+            per_interval = {name: LiveSeries(secs, self.capacity) for name, secs in self.intervals.items()}
+            self.series[symbol] = per_interval
+
+        closed = []
+        for name, series in per_interval.items():
+            bar = series.on_trade(ts, price, size)
+            if bar is not None:
+                closed.append((name, bar))
+        return closed
+
+    def bars_since(self, symbol: str, interval: str, since: int) -> Optional[ChartColumns]:
+        """
+        Bars with open time >= since, or None when the live buffer does not reach
+        back that far (the caller then has to go upstream).
+        """
+        interval = INTERVAL_ALIASES.get(interval, interval)
+        series = self.series.get(symbol, {}).get(interval)
+        if series is None:
+            return None
+        earliest = series.earliest_time()
+        if earliest is None or earliest > since:
+            return None
+        return series.columns_since(since)
+
+
+bar_aggregator = BarAggregator()
@@ -0,0 +1,114 @@
+import os
+import time
+import asyncio
+import httpx
+from typing import List, Optional
+from services.metrics import metrics
+
+BINANCE_API_URL = os.getenv("BINANCE_API_URL", "https://api.binance.com")
+BINANCE_TIMEOUT = float(os.getenv("BINANCE_TIMEOUT", "10"))
+BINANCE_MAX_CONNECTIONS = int(os.getenv("BINANCE_MAX_CONNECTIONS", "20"))
+
+KLINE_LIMIT = 1000  # Binance max candles per request
+MAX_PAGES = 5       # -> 5000 candles per history request
+
+MINUTE_MS = 60_000
+INTERVAL_MS = {
+    "1m": MINUTE_MS,
+    "3m": 3 * MINUTE_MS,
+    "5m": 5 * MINUTE_MS,
+    "15m": 15 * MINUTE_MS,
+    "30m": 30 * MINUTE_MS,
+    "1h": 60 * MINUTE_MS,
+    "2h": 120 * MINUTE_MS,
+    "4h": 240 * MINUTE_MS,
+    "6h": 360 * MINUTE_MS,
+    "8h": 480 * MINUTE_MS,
+    "12h": 720 * MINUTE_MS,
+    "1d": 1440 * MINUTE_MS,
+    "3d": 3 * 1440 * MINUTE_MS,
+    "1w": 7 * 1440 * MINUTE_MS,
+    "1M": 31 * 1440 * MINUTE_MS,  # Upper bound; overlapping pages are deduplicated
+}
+
+
+def to_binance_symbol(ticker: str) -> str:
+    # Map Ticker to Binance Symbol (BTC-USD -> BTCUSDT)
+    return ticker.replace("-", "").replace("USD", "USDT")
+
+
+class BinanceHistoryClient:
+    """
+    Async kline client sharing one connection pool.
+    Page boundaries are derived from the interval, so all pages of a range are
+    requested concurrently instead of chaining on each page's close time.
+    """
+
+    def __init__(self, base_url: str = BINANCE_API_URL, timeout: float = BINANCE_TIMEOUT,
+                 max_connections: int = BINANCE_MAX_CONNECTIONS):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch_page(self, symbol: str, interval: str, start_ms: int, end_ms: int) -> list:
+        params = {
+            "symbol": symbol,
+            "interval": interval,
+            "limit": KLINE_LIMIT,
+            "startTime": start_ms,
+            "endTime": end_ms,
+        }
+        async with metrics.upstream("binance"):
+            resp = await self._get_client().get("/api/v3/klines", params=params)
+            resp.raise_for_status()
+            return resp.json()
+
+    async def fetch_klines(self, symbol: str, interval: str, start_ms: int,
+                           end_ms: Optional[int] = None, max_pages: int = MAX_PAGES) -> List[list]:
+        """
+        Klines between start_ms and end_ms (default: now), oldest first.
+        When the range needs more than max_pages pages, the most recent ones are kept.
+        """
+        if interval not in INTERVAL_MS:
+            raise ValueError(f"Unsupported Binance interval: {interval}")
+        if end_ms is None:
+            end_ms = int(time.time() * 1000)
+
+        span = INTERVAL_MS[interval] * KLINE_LIMIT
+        pages = max(1, min(max_pages, -(-(end_ms - start_ms) // span)))
+        first_start = max(start_ms, end_ms - pages * span)
+        windows = [(first_start + i * span, min(first_start + (i + 1) * span - 1, end_ms)) for i in range(pages)]
+
+        results = await asyncio.gather(
+            *(self.fetch_page(symbol, interval, s, e) for s, e in windows),
+            return_exceptions=True,
+        )
+
+        # Merge pages, deduplicating on open time
+        by_open_time = {}
+        for page in results:
+            if isinstance(page, Exception):
+                print(f"Error fetching Binance page for {symbol}: {page}")
+                continue
+            for k in page:
+                by_open_time[k[0]] = k
+        return [by_open_time[t] for t in sorted(by_open_time)]
+
+
+binance_client = BinanceHistoryClient()
@@ -0,0 +1,84 @@
+import numpy as np
+
+from models import ChartColumns, DownsampleMethod
+
+# Server-side reduction of long series to about the number of points a chart
+# panel can show. Both methods keep the first and last bar.
+
+
+def bucket_starts(n: int, buckets: int) -> np.ndarray:
+    """Start index of `buckets` near-equal runs of bars covering 0..n."""
+    return np.unique(np.linspace(0, n, buckets + 1).astype(np.int64)[:-1])
+
+
+def merge_runs(columns: ChartColumns, starts: np.ndarray, times: list) -> ChartColumns:
+    """
+    Merge each run of bars beginning at `starts` into one candle: first open,
+    highest high, lowest low, last close, summed volume. `times` labels the runs.
+    """
+    ends = np.append(starts[1:], len(columns.time)) - 1
+    high = np.maximum.reduceat(np.asarray(columns.high, dtype=np.float64), starts)
+    low = np.minimum.reduceat(np.asarray(columns.low, dtype=np.float64), starts)
+    volume = np.add.reduceat(np.nan_to_num(np.asarray(columns.volume, dtype=np.float64)), starts)
+    return ChartColumns.model_construct(
+        time=times,
+        open=np.asarray(columns.open, dtype=np.float64)[starts].tolist(),
+        high=high.tolist(),
+        low=low.tolist(),
+        close=np.asarray(columns.close, dtype=np.float64)[ends].tolist(),
+        volume=volume.tolist(),
+    )
+
+
+def downsample_ohlc(columns: ChartColumns, max_points: int) -> ChartColumns:
+    """Merge near-equal runs of bars into candles; every extreme of the source is preserved."""
+    starts = bucket_starts(len(columns.time), max_points)
+    return merge_runs(columns, starts, [columns.time[i] for i in starts.tolist()])
+
+
+def lttb_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets over bar positions: from each bucket keep the
+    bar forming the largest triangle with the previously kept bar and the mean
+    of the next bucket. The area is computed for a whole bucket at once.
+    Bucket bounds are floor(i * every) + 1, as in the reference implementation.
+    """
+    n = len(y)
+    buckets = max_points - 2  # First and last bar are kept as-is
+    every = (n - 2) / buckets
+    edges = np.minimum(np.floor(np.arange(buckets + 2) * every).astype(np.int64) + 1, n)
+    x = np.arange(n, dtype=np.float64)
+
+    # Mean of the bucket following each one; the final bucket's is the last bar
+    lo, hi = edges[1:-1], edges[2:]
+    mean_x = (lo + hi - 1) / 2
+    mean_y = np.add.reduceat(y, lo) / (hi - lo)
+
+    keep = np.empty(buckets + 2, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    prev = 0
+    for b, (start, end) in enumerate(zip(edges[:-2].tolist(), edges[1:-1].tolist())):
+        cx, cy = mean_x[b], mean_y[b]
+        px, py = x[prev], y[prev]
+        area = np.abs((px - cx) * (y[start:end] - py) - (px - x[start:end]) * (cy - py))
+        prev = start + int(np.argmax(area))
+        keep[b + 1] = prev
+    return keep
+
+
+def downsample_lttb(columns: ChartColumns, max_points: int) -> ChartColumns:
+    """Keep the `max_points` bars that best preserve the shape of the close line."""
+    idx = lttb_indices(np.asarray(columns.close, dtype=np.float64), max_points).tolist()
+    return ChartColumns.model_construct(**{
+        field: [values[i] for i in idx]
+        for field, values in (("time", columns.time), ("open", columns.open), ("high", columns.high),
+                              ("low", columns.low), ("close", columns.close), ("volume", columns.volume))
+    })
+
+
+def downsample(columns: ChartColumns, max_points: int, method: DownsampleMethod = DownsampleMethod.OHLC) -> ChartColumns:
+    if len(columns.time) <= max_points:
+        return columns
+    if method == DownsampleMethod.LTTB:
+        return downsample_lttb(columns, max_points)
+    return downsample_ohlc(columns, max_points)
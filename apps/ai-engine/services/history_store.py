@@ -0,0 +1,236 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from models import ChartColumns
+
+# On-disk OHLCV history, one append-only file per (symbol, interval).
+# Each file is a raw array of fixed-size records (no header), so a range read is
+# a memory map plus a binary search on the time column, and an append is a write
+# at the end of the file. A small JSON sidecar keeps the region the bars came
+# from and how far back upstream has already been asked for.
+# A file's mtime doubles as its last use: reads touch it, and pruning removes
+# series unused for HISTORY_STORE_MAX_AGE_DAYS, then the least recently used
+# until the store fits in HISTORY_STORE_MAX_MB.
+
+HISTORY_STORE_DIR = os.getenv("HISTORY_STORE_DIR", "data/history")  # Empty disables the store
+HISTORY_STORE_MAX_MB = float(os.getenv("HISTORY_STORE_MAX_MB", "1024"))
+HISTORY_STORE_MAX_AGE_DAYS = float(os.getenv("HISTORY_STORE_MAX_AGE_DAYS", "30"))
+HISTORY_STORE_PRUNE_SECONDS = float(os.getenv("HISTORY_STORE_PRUNE_SECONDS", "3600"))
+
+RECORD = np.dtype([
+    ("time", "<i8"),  # UNIX seconds (daily bars: midnight UTC of the bar date)
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+])
+
+DAY_SECONDS = 86400
+INTRADAY = {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h", "4h"}
+
+
+@dataclass
+class StoredHistory:
+    region: str
+    floor: Optional[int]  # Earliest start already requested upstream; nothing older exists
+    records: np.ndarray
+
+    @property
+    def first_time(self) -> int:
+        return int(self.records["time"][0])
+
+    @property
+    def last_time(self) -> int:
+        return int(self.records["time"][-1])
+
+
+def to_records(columns: ChartColumns) -> np.ndarray:
+    records = np.empty(len(columns.time), dtype=RECORD)
+    if not columns.time:
+        return records
+    if isinstance(columns.time[0], str):
+        records["time"] = np.array(columns.time, dtype="datetime64[D]").astype(np.int64) * DAY_SECONDS
+    else:
+        records["time"] = columns.time
+    for field in ("open", "high", "low", "close", "volume"):
+        records[field] = getattr(columns, field)
+    return records
+
+
+def to_columns(records: np.ndarray, region: str, interval: str) -> ChartColumns:
+    """Records -> chart columns, with times in the format the upstream parsers produce."""
+    times = records["time"]
+    if region != "CRYPTO" and interval not in INTRADAY:
+        times = (times // DAY_SECONDS).astype("datetime64[D]").astype(str)
+    return ChartColumns.model_construct(
+        time=times.tolist(),
+        open=records["open"].tolist(),
+        high=records["high"].tolist(),
+        low=records["low"].tolist(),
+        close=records["close"].tolist(),
+        volume=records["volume"].tolist(),
+    )
+
+
+class HistoryStore:
+    def __init__(self, root: str = HISTORY_STORE_DIR):
+        self.root = root
+        # Files are only ever grown in place, so open maps stay valid; the lock
+        # keeps readers from seeing a record that is half overwritten
+        self._locks = defaultdict(threading.Lock)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.root)
+
+    def _path(self, symbol: str, interval: str) -> str:
+        safe = re.sub(r"[^A-Za-z0-9._-]", "_", symbol)
+        path = os.path.join(self.root, interval, f"{safe}.bin")
+        # Exactly one directory (the interval) below the root, whatever `interval` holds
+        if os.path.dirname(os.path.dirname(os.path.abspath(path))) != os.path.abspath(self.root):
+            raise ValueError(f"Invalid history interval: {interval!r}")
+        return path
+
+    def _read_meta(self, path: str) -> dict:
+        try:
+            with open(path + ".json") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_meta(self, path: str, meta: dict):
+        tmp = path + ".json.tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, path + ".json")
+
+    def _map(self, path: str) -> Optional[np.ndarray]:
+        try:
+            count = os.path.getsize(path) // RECORD.itemsize  # Ignore a torn trailing record
+        except OSError:
+            return None
+        if count == 0:
+            return None
+        return np.memmap(path, dtype=RECORD, mode="r", shape=(count,))
+
+    def read(self, symbol: str, interval: str, since: Optional[int] = None) -> Optional[StoredHistory]:
+        """
+        Stored bars at or after `since` (UNIX seconds), copied out of the map.
+        If all stored bars are older, the last one is returned so the caller still
+        knows where the file ends.
+        """
+        if not self.enabled:
+            return None
+        path = self._path(symbol, interval)
+        with self._locks[path]:
+            mapped = self._map(path)
+            if mapped is None:
+                return None
+            start = int(np.searchsorted(mapped["time"], since)) if since is not None else 0
+            records = np.array(mapped[min(start, len(mapped) - 1):])
+            meta = self._read_meta(path)
+            os.utime(path)  # Last use, for pruning
+        return StoredHistory(region=meta.get("region", "US"), floor=meta.get("floor"), records=records)
+
+    def write(self, symbol: str, interval: str, region: str, columns: ChartColumns, floor: Optional[int] = None):
+        """
+        Merge bars into the file. New bars replace stored bars from their first
+        timestamp on (the last stored bar is usually still forming); the common
+        case of bars at the end is an in-place write, anything older rewrites the file.
+        """
+        if not self.enabled:
+            return
+        new = to_records(columns)
+        path = self._path(symbol, interval)
+        with self._locks[path]:
+            meta = self._read_meta(path)
+            mapped = self._map(path) if len(new) else None
+            if mapped is None and len(new):
+                self._rewrite(path, new)
+            elif mapped is not None:
+                keep = int(np.searchsorted(mapped["time"], new["time"][0]))
+                resume = int(np.searchsorted(mapped["time"], new["time"][-1], side="right"))
+                if keep > 0 and resume == len(mapped) and keep + len(new) >= len(mapped):
+                    with open(path, "r+b") as f:
+                        f.seek(keep * RECORD.itemsize)
+                        f.write(new.tobytes())
+                else:
+                    self._rewrite(path, np.concatenate([mapped[:keep], new, mapped[resume:]]))
+
+            changed = meta.get("region") != region
+            if floor is not None and (meta.get("floor") is None or floor < meta["floor"]):
+                meta["floor"] = floor
+                changed = True
+            if changed and os.path.exists(path):
+                meta["region"] = region
+                self._write_meta(path, meta)
+
+    def _rewrite(self, path: str, records: np.ndarray):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(records.tobytes())
+        os.replace(tmp, path)
+
+    def prune(self, max_bytes: float = HISTORY_STORE_MAX_MB * 1024 * 1024,
+              max_age: float = HISTORY_STORE_MAX_AGE_DAYS * DAY_SECONDS) -> int:
+        """
+        Remove series unused for `max_age` seconds, then the least recently used
+        ones until the store fits in `max_bytes`. Returns the number removed.
+        """
+        if not self.enabled:
+            return 0
+        files = []
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if not name.endswith(".bin"):
+                    continue
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        cutoff = time.time() - max_age
+        removed = 0
+        for mtime, size, path in files:
+            if mtime >= cutoff and total <= max_bytes:
+                break
+            with self._locks[path]:
+                for stale in (path, path + ".json"):
+                    try:
+                        os.remove(stale)
+                    except OSError:
+                        pass
+            self._locks.pop(path, None)
+            total -= size
+            removed += 1
+        return removed
+
+
+history_store = HistoryStore()
+
+
+async def prune_history(period: float = HISTORY_STORE_PRUNE_SECONDS):
+    """Background task: keep the store within its size and age limits."""
+    while True:
+        try:
+            removed = await asyncio.to_thread(history_store.prune)
+            if removed:
+                print(f"Pruned {removed} series from the history store")
+        except Exception as e:
+            print(f"Error pruning history store: {e}")
+        await asyncio.sleep(period)
@@ -0,0 +1,303 @@
+import asyncio
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from models import ChartColumns, IndicatorConfig
+from services.indicators import sma, ema, rsi, bollinger, macd, atr, stochastic, williams_r, cci, psar, supertrend
+from services.metrics import metrics
+from services.resample import utc_seconds
+from services.single_flight import SingleFlight
+
+# Chart indicators computed on the server, for the indicator set the web chart
+# offers (apps/web/lib/indicators.ts). Results are memoized per (series,
+# indicator, settings). When the series moves on (new bars, a forming bar that
+# changed, the head trimmed to keep the window) only the values from the first
+# changed bar on are recomputed, from just enough earlier bars to reproduce them.
+
+INDICATOR_CACHE_MAX_ENTRIES = int(os.getenv("INDICATOR_CACHE_MAX_ENTRIES", "1024"))
+
+# Over this many periods an exponential average forgets its seed (by ~e^-30), so
+# a recomputation starting that far back matches a full pass to float precision
+EWM_SETTLE_PERIODS = 30
+
+OHLCV_FIELDS = ("time", "open", "high", "low", "close", "volume")
+
+
+@dataclass
+class Bars:
+    time: np.ndarray  # UNIX seconds
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @classmethod
+    def from_columns(cls, columns: ChartColumns) -> "Bars":
+        return cls(
+            time=utc_seconds(columns.time),
+            open=np.asarray(columns.open, dtype=np.float64),
+            high=np.asarray(columns.high, dtype=np.float64),
+            low=np.asarray(columns.low, dtype=np.float64),
+            close=np.asarray(columns.close, dtype=np.float64),
+            volume=np.nan_to_num(np.asarray(columns.volume, dtype=np.float64)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def since(self, start: int) -> "Bars":
+        return Bars(**{name: getattr(self, name)[start:] for name in OHLCV_FIELDS})
+
+    def until(self, end: int) -> "Bars":
+        return Bars(**{name: getattr(self, name)[:end] for name in OHLCV_FIELDS})
+
+
+def common_prefix(old: Bars, new: Bars) -> Tuple[int, int]:
+    """(shift, n): the first n bars of `new` are identical to `old` bars shift..shift+n."""
+    if not len(old) or not len(new):
+        return 0, 0
+    shift = int(np.searchsorted(old.time, new.time[0]))
+    if shift == len(old) or old.time[shift] != new.time[0]:
+        return 0, 0
+    n = min(len(old) - shift, len(new))
+    differs = np.zeros(n, dtype=bool)
+    for name in OHLCV_FIELDS:
+        differs |= getattr(old, name)[shift:shift + n] != getattr(new, name)[:n]
+    changed = np.flatnonzero(differs)
+    return shift, int(changed[0]) if len(changed) else n
+
+
+@dataclass(frozen=True)
+class IndicatorSpec:
+    label: str  # Display name, formatted with the settings
+    pane: str
+    defaults: Dict[str, float]
+    compute: Callable[[Bars, Dict[str, float]], Dict[str, np.ndarray]]
+    # Bars after which a value no longer depends on where the series starts (the
+    # window, or the settling time of an exponential average); None when every
+    # value depends on the whole history (always recomputed in full)
+    warmup: Optional[Callable[[Dict[str, float]], int]] = None
+
+
+def _bollinger(bars: Bars, p: Dict[str, float]) -> Dict[str, np.ndarray]:
+    upper, middle, lower = bollinger(bars.close, p["period"], p["stdDev"])
+    return {"upper": upper, "middle": middle, "lower": lower}
+
+
+def _macd(bars: Bars, p: Dict[str, float]) -> Dict[str, np.ndarray]:
+    line, signal, histogram = macd(bars.close, p["fast"], p["slow"], p["signal"])
+    return {"macd": line, "signal": signal, "histogram": histogram}
+
+
+def _stochastic(bars: Bars, p: Dict[str, float]) -> Dict[str, np.ndarray]:
+    k, d = stochastic(bars.high, bars.low, bars.close, p["period"], p["signal"])
+    return {"k": k, "d": d}
+
+
+def _supertrend(bars: Bars, p: Dict[str, float]) -> Dict[str, np.ndarray]:
+    value, direction = supertrend(bars.high, bars.low, bars.close, p["period"], p["multiplier"])
+    return {"value": value, "direction": direction}
+
+
+# Names, settings and defaults as in the web client's strategies
+INDICATORS: Dict[str, IndicatorSpec] = {
+    "SMA": IndicatorSpec("SMA ({period:g})", "overlay", {"period": 20},
+                         lambda b, p: {"value": sma(b.close, p["period"])},
+                         lambda p: p["period"] - 1),
+    "EMA": IndicatorSpec("EMA ({period:g})", "overlay", {"period": 20},
+                         lambda b, p: {"value": ema(b.close, p["period"])},
+                         lambda p: EWM_SETTLE_PERIODS * p["period"]),
+    "BollingerBands": IndicatorSpec("BB ({period:g}, {stdDev:g})", "overlay", {"period": 20, "stdDev": 2.0},
+                                    _bollinger, lambda p: p["period"] - 1),
+    "ParabolicSAR": IndicatorSpec("Parabolic SAR", "overlay", {"step": 0.02, "max": 0.2},
+                                  lambda b, p: {"value": psar(b.high, b.low, p["step"], p["max"])}),
+    "RSI": IndicatorSpec("RSI ({period:g})", "separate", {"period": 14},
+                         lambda b, p: {"value": rsi(b.close, p["period"])},
+                         lambda p: EWM_SETTLE_PERIODS * p["period"]),
+    "MACD": IndicatorSpec("MACD ({fast:g}, {slow:g}, {signal:g})", "separate", {"fast": 12, "slow": 26, "signal": 9},
+                          _macd, lambda p: EWM_SETTLE_PERIODS * (max(p["fast"], p["slow"]) + p["signal"])),
+    "Stochastic": IndicatorSpec("Stoch ({period:g}, {signal:g})", "separate", {"period": 14, "signal": 3},
+                                _stochastic, lambda p: p["period"] + p["signal"] - 2),
+    "CCI": IndicatorSpec("CCI ({period:g})", "separate", {"period": 20},
+                         lambda b, p: {"value": cci(b.high, b.low, b.close, p["period"])},
+                         lambda p: p["period"] - 1),
+    "ATR": IndicatorSpec("ATR ({period:g})", "separate", {"period": 14},
+                         lambda b, p: {"value": atr(b.high, b.low, b.close, p["period"])},
+                         lambda p: EWM_SETTLE_PERIODS * p["period"] + 1),
+    "WilliamsR": IndicatorSpec("Williams %R ({period:g})", "separate", {"period": 14},
+                               lambda b, p: {"value": williams_r(b.high, b.low, b.close, p["period"])},
+                               lambda p: p["period"] - 1),
+    "SuperTrend": IndicatorSpec("SuperTrend ({period:g}, {multiplier:g})", "overlay", {"period": 10, "multiplier": 3.0},
+                                _supertrend),
+}
+
+
+def resolve_params(type: str, params: dict) -> Dict[str, float]:
+    """Settings with defaults filled in (missing or zero, like the web client). Raises ValueError."""
+    spec = INDICATORS.get(type)
+    if spec is None:
+        raise ValueError(f"Unknown indicator: {type}")
+    resolved = {}
+    for name, default in spec.defaults.items():
+        value = params.get(name) or default
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            raise ValueError(f"{type} {name} must be a positive number")
+        if isinstance(default, int):
+            if value != int(value):
+                raise ValueError(f"{type} {name} must be a whole number")
+            value = int(value)
+        resolved[name] = value
+    return resolved
+
+
+@dataclass
+class Memo:
+    bars: Bars
+    values: Dict[str, np.ndarray]
+    encoded: Optional[str] = field(default=None, repr=False)
+
+    def as_json(self) -> str:
+        """The values as a JSON object, NaN as null; serialized once per memo."""
+        if self.encoded is None:
+            self.encoded = json.dumps({
+                name: [None if v != v else v for v in values.tolist()] for name, values in self.values.items()
+            })
+        return self.encoded
+
+
+class IndicatorCache:
+    """LRU of indicator results per (series, indicator, settings), updated incrementally."""
+
+    def __init__(self, max_entries: int = INDICATOR_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._series: "OrderedDict[Hashable, Tuple[ChartColumns, Bars]]" = OrderedDict()
+        self._memos: "OrderedDict[Hashable, Memo]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bars_for(self, series_key: Hashable, columns: ChartColumns) -> Bars:
+        """Array form of a series, shared while the chart layer serves the same columns object."""
+        with self._lock:
+            cached = self._series.get(series_key)
+            if cached is not None and cached[0] is columns:
+                self._series.move_to_end(series_key)
+                return cached[1]
+        bars = Bars.from_columns(columns)
+        with self._lock:
+            self._series[series_key] = (columns, bars)
+            self._series.move_to_end(series_key)
+            while len(self._series) > self.max_entries:
+                self._series.popitem(last=False)
+        return bars
+
+    def get(self, series_key: Hashable, type: str, params: Dict[str, float], bars: Bars) -> Memo:
+        spec = INDICATORS[type]
+        key = (series_key, type, tuple(sorted(params.items())))
+        with self._lock:
+            memo = self._memos.get(key)
+            if memo is not None:
+                self._memos.move_to_end(key)
+        if memo is not None and memo.bars is bars:
+            metrics.cache("indicators", "hit")
+            return memo
+
+        values = self._update(spec, params, memo, bars) if memo is not None else None
+        if values is not None and values is memo.values:
+            # Same bars in a new series object
+            metrics.cache("indicators", "hit")
+            memo.bars = bars
+            return memo
+        if values is None:
+            metrics.cache("indicators", "miss")
+            values = spec.compute(bars, params)
+        else:
+            metrics.cache("indicators", "incremental")
+        memo = Memo(bars, values)
+
+        with self._lock:
+            self._memos[key] = memo
+            self._memos.move_to_end(key)
+            while len(self._memos) > self.max_entries:
+                self._memos.popitem(last=False)
+        return memo
+
+    def _update(self, spec: IndicatorSpec, params: Dict[str, float], memo: Memo, bars: Bars) -> Optional[Dict[str, np.ndarray]]:
+        """
+        Values for `bars` reusing `memo` between the head and the first changed
+        bar; None when a full pass is needed. Every indicator here is causal (a
+        value depends only on the bars up to it), so a pass over a prefix gives
+        exactly the full pass's values for that prefix.
+        """
+        shift, same = common_prefix(memo.bars, bars)
+        if shift == 0 and same == len(bars) == len(memo.bars):
+            return memo.values
+        if spec.warmup is None:
+            return None
+        warm = spec.warmup(params)
+        if same - warm <= 0:
+            return None
+
+        # Bars trimmed off the head reseed the start of the series
+        head = spec.compute(bars.until(warm), params) if shift else None
+        tail = spec.compute(bars.since(same - warm), params)
+        values = {}
+        for name, old in memo.values.items():
+            kept = old[shift:shift + same]
+            if head is not None:
+                kept = np.concatenate([head[name], kept[warm:]])
+            values[name] = np.concatenate([kept, tail[name][warm:]])
+        return values
+
+    def compute_all(self, series_key: Hashable, columns: ChartColumns,
+                    configs: List[Tuple[str, str, Dict[str, float]]]) -> List[str]:
+        """An IndicatorOutput, as JSON, for each (id, type, settings) over one series."""
+        bars = self.bars_for(series_key, columns)
+        outputs = []
+        for id, type, params in configs:
+            spec = INDICATORS[type]
+            memo = self.get(series_key, type, params, bars)
+            meta = json.dumps({"id": id, "type": type, "name": spec.label.format(**params), "pane": spec.pane,
+                               "params": params})
+            outputs.append(f'{meta[:-1]}, "values": {memo.as_json()}}}')
+        return outputs
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+            self._memos.clear()
+
+    def __len__(self):
+        return len(self._memos)
+
+
+indicator_cache = IndicatorCache()
+indicator_flights = SingleFlight("indicators")
+
+
+def resolve_configs(configs: List[IndicatorConfig]) -> List[Tuple[str, str, Dict[str, float]]]:
+    """(id, type, settings) per config; ids default to e.g. "RSI-14". Raises ValueError."""
+    resolved = []
+    for config in configs:
+        params = resolve_params(config.type, config.params)
+        id = config.id or "-".join([config.type] + [f"{v:g}" for v in params.values()])
+        resolved.append((id, config.type, params))
+    return resolved
+
+
+async def compute_indicators(series_key: Hashable, columns: ChartColumns,
+                             configs: List[Tuple[str, str, Dict[str, float]]]) -> List[str]:
+    """Identical concurrent requests share one computation."""
+    key = (series_key, tuple((id, type, tuple(params.items())) for id, type, params in configs))
+    return await indicator_flights.do(key, asyncio.to_thread, indicator_cache.compute_all, series_key, columns, configs)
+
+
+def render_response(ticker: str, interval: str, columns: ChartColumns, outputs: List[str]) -> str:
+    """IndicatorsResponse JSON around already serialized outputs."""
+    head = json.dumps({"ticker": ticker, "interval": interval, "time": columns.time})
+    return f'{head[:-1]}, "indicators": [{", ".join(outputs)}]}}'
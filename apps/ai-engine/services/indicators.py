@@ -0,0 +1,198 @@
+import numpy as np
+import pandas as pd
+
+# Vectorized indicators over NumPy arrays. Inputs are 1-D (time) or 2-D
+# (symbols x time); time is always the last axis. Warm-up positions are NaN,
+# so outputs line up index-for-index with the input bars.
+# Seeding follows the `technicalindicators` package used by the web client:
+# EMA and Wilder averages start from the SMA of the first `period` values.
+
+
+def _along_time(values: np.ndarray, fn) -> np.ndarray:
+    """Apply a pandas column-wise op along the last axis of a 1-D/2-D array."""
+    if values.ndim == 1:
+        return fn(pd.Series(values)).to_numpy()
+    return fn(pd.DataFrame(values.T)).to_numpy().T
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] < period:
+        return out
+    csum = np.cumsum(values, axis=-1)
+    out[..., period - 1] = csum[..., period - 1]
+    out[..., period:] = csum[..., period:] - csum[..., :-period]
+    out[..., period - 1:] /= period
+    return out
+
+
+def _seeded_ewm(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] < period:
+        return out
+    # Replace the warm-up window by its SMA, then run the recursion from there
+    seeded = values[..., period - 1:].copy()
+    seeded[..., 0] = values[..., :period].mean(axis=-1)
+    out[..., period - 1:] = _along_time(seeded, lambda x: x.ewm(alpha=alpha, adjust=False).mean())
+    return out
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    return _seeded_ewm(values, period, 2.0 / (period + 1))
+
+
+def wilder(values: np.ndarray, period: int) -> np.ndarray:
+    """Wilder's smoothing (RMA), used by RSI and ATR."""
+    return _seeded_ewm(values, period, 1.0 / period)
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    close = np.asarray(close, dtype=float)
+    out = np.full(close.shape, np.nan)
+    if close.shape[-1] <= period:
+        return out
+    change = np.diff(close, axis=-1)
+    avg_gain = wilder(np.clip(change, 0, None), period)
+    avg_loss = wilder(np.clip(-change, 0, None), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = 100 - 100 / (1 + avg_gain / avg_loss)
+    value = np.where(avg_loss == 0, 100.0, value)
+    value = np.where(np.isnan(avg_gain), np.nan, value)
+    out[..., 1:] = value
+    return out
+
+
+def _rolling(values: np.ndarray, period: int, fn) -> np.ndarray:
+    """`fn(window, axis=-1)` over each trailing window of `period` values; NaN until the first full one."""
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] < period:
+        return out
+    out[..., period - 1:] = fn(np.lib.stride_tricks.sliding_window_view(values, period, axis=-1), axis=-1)
+    return out
+
+
+def bollinger(close: np.ndarray, period: int = 20, std_dev: float = 2.0):
+    """(upper, middle, lower); the band width uses the population standard deviation."""
+    middle = sma(close, period)
+    deviation = std_dev * _rolling(close, period, np.std)
+    return middle + deviation, middle, middle - deviation
+
+
+def macd(close: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9):
+    """(macd, signal, histogram) with EMAs for both the oscillator and the signal line."""
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = np.full(line.shape, np.nan)
+    start = max(fast, slow) - 1
+    if line.shape[-1] > start:
+        signal_line[..., start:] = ema(line[..., start:], signal)
+    return line, signal_line, line - signal_line
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """NaN for the first bar, which has no previous close."""
+    high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+    out = np.full(close.shape, np.nan)
+    prev = close[..., :-1]
+    out[..., 1:] = np.maximum(high[..., 1:] - low[..., 1:],
+                              np.maximum(np.abs(high[..., 1:] - prev), np.abs(low[..., 1:] - prev)))
+    return out
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    tr = true_range(high, low, close)
+    out = np.full(tr.shape, np.nan)
+    out[..., 1:] = wilder(tr[..., 1:], period)
+    return out
+
+
+def stochastic(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14, signal: int = 3):
+    """(%K, %D). A window with no range reports %K = 0."""
+    highest = _rolling(high, period, np.max)
+    lowest = _rolling(low, period, np.min)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        k = (np.asarray(close, dtype=float) - lowest) / (highest - lowest) * 100
+    k = np.where(highest == lowest, 0.0, k)
+    d = np.full(k.shape, np.nan)
+    if k.shape[-1] >= period:
+        d[..., period - 1:] = sma(k[..., period - 1:], signal)
+    return k, d
+
+
+def williams_r(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    highest = _rolling(high, period, np.max)
+    lowest = _rolling(low, period, np.min)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (highest - np.asarray(close, dtype=float)) / (highest - lowest) * -100
+
+
+def cci(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 20) -> np.ndarray:
+    typical = (np.asarray(high, dtype=float) + np.asarray(low, dtype=float) + np.asarray(close, dtype=float)) / 3
+    out = np.full(typical.shape, np.nan)
+    if typical.shape[-1] < period:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(typical, period, axis=-1)
+    mean = windows.mean(axis=-1)
+    mean_deviation = np.abs(windows - mean[..., None]).mean(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[..., period - 1:] = (typical[..., period - 1:] - mean) / (0.015 * mean_deviation)
+    return out
+
+
+# Path-dependent indicators: every value depends on a trend state carried from
+# the first bar, so these are plain loops over 1-D series.
+
+def psar(high: np.ndarray, low: np.ndarray, step: float = 0.02, max_step: float = 0.2) -> np.ndarray:
+    """Parabolic SAR, starting long from the first bar's low like `technicalindicators`."""
+    high, low = np.asarray(high, dtype=float).tolist(), np.asarray(low, dtype=float).tolist()
+    out = np.empty(len(high))
+    if not high:
+        return out
+    sar, extreme, up, accel = low[0], high[0], True, step
+    out[0] = sar
+    for i in range(1, len(high)):
+        prev, furthest = i - 1, max(i - 2, 0)
+        sar += accel * (extreme - sar)
+        if up:
+            sar = min(sar, low[furthest], low[prev])
+            if high[i] > extreme:
+                extreme, accel = high[i], min(accel + step, max_step)
+        else:
+            sar = max(sar, high[furthest], high[prev])
+            if low[i] < extreme:
+                extreme, accel = low[i], min(accel + step, max_step)
+        if (up and low[i] < sar) or (not up and high[i] > sar):
+            accel, sar, up = step, extreme, not up
+            extreme = high[i] if up else low[i]
+        out[i] = sar
+    return out
+
+
+def supertrend(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 10, multiplier: float = 3.0):
+    """(value, direction): the trailing band and +1 (up) / -1 (down), NaN until ATR is defined."""
+    ranges = atr(high, low, close, period)
+    mid = (np.asarray(high, dtype=float) + np.asarray(low, dtype=float)) / 2
+    basic_upper = (mid + multiplier * ranges).tolist()
+    basic_lower = (mid - multiplier * ranges).tolist()
+    closes = np.asarray(close, dtype=float).tolist()
+    value, direction = np.full(len(closes), np.nan), np.full(len(closes), np.nan)
+
+    trend, upper, lower = 1, 0.0, 0.0
+    first = period  # First bar with an ATR
+    for i in range(first, len(closes)):
+        if i == first:
+            upper, lower = basic_upper[i], basic_lower[i]
+        else:
+            prev_close = closes[i - 1]
+            # Resistance only tightens (and support only rises) until price breaks through
+            upper = basic_upper[i] if basic_upper[i] < upper or prev_close > upper else upper
+            lower = basic_lower[i] if basic_lower[i] > lower or prev_close < lower else lower
+        if trend == 1 and closes[i] < lower:
+            trend = -1
+        elif trend == -1 and closes[i] > upper:
+            trend = 1
+        value[i] = lower if trend == 1 else upper
+        direction[i] = trend
+    return value, direction
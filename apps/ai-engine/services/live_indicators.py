@@ -0,0 +1,171 @@
+import math
+from collections import deque
+from typing import Optional, Tuple
+
+# Incremental indicator state. Every indicator advances in O(1) per value:
+#   update(x) commits x as the next closed value and returns the new reading,
+#   peek(x) returns the reading as if x were the next value, without committing
+#   (used for the bar that is still forming while trades arrive).
+# Readings are None until enough values have been seen.
+
+
+class SMA:
+    def __init__(self, period: int = 20):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+
+    @property
+    def value(self) -> Optional[float]:
+        if len(self.window) < self.period:
+            return None
+        return self.total / self.period
+
+    def update(self, x: float) -> Optional[float]:
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(x)
+        self.total += x
+        return self.value
+
+    def peek(self, x: float) -> Optional[float]:
+        if len(self.window) + 1 < self.period:
+            return None
+        dropped = self.window[0] if len(self.window) == self.period else 0.0
+        return (self.total - dropped + x) / self.period
+
+
+class EMA:
+    def __init__(self, period: int = 20):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.seed = SMA(period)  # First reading is the SMA of the first `period` values
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> Optional[float]:
+        if self.value is None:
+            self.value = self.seed.update(x)
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+    def peek(self, x: float) -> Optional[float]:
+        if self.value is None:
+            return self.seed.peek(x)
+        return self.value + self.alpha * (x - self.value)
+
+
+class WilderRSI:
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev: Optional[float] = None
+        self.count = 0  # Price changes seen
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+    @staticmethod
+    def _rsi(avg_gain: float, avg_loss: float) -> float:
+        # No losses reads 100, flat included, as in services.indicators.rsi
+        if avg_loss == 0:
+            return 100.0
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+
+    def _advance(self, x: float) -> Tuple[int, float, float]:
+        change = x - self.prev
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        count = self.count + 1
+        if count <= self.period:
+            # Seed with the simple average of the first `period` changes
+            avg_gain = self.avg_gain + (gain - self.avg_gain) / count
+            avg_loss = self.avg_loss + (loss - self.avg_loss) / count
+        else:
+            avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        return count, avg_gain, avg_loss
+
+    @property
+    def value(self) -> Optional[float]:
+        if self.count < self.period:
+            return None
+        return self._rsi(self.avg_gain, self.avg_loss)
+
+    def update(self, x: float) -> Optional[float]:
+        if self.prev is not None:
+            self.count, self.avg_gain, self.avg_loss = self._advance(x)
+        self.prev = x
+        return self.value
+
+    def peek(self, x: float) -> Optional[float]:
+        if self.prev is None:
+            return None
+        count, avg_gain, avg_loss = self._advance(x)
+        if count < self.period:
+            return None
+        return self._rsi(avg_gain, avg_loss)
+
+
+class MACD:
+    """Returns (macd, signal, histogram)."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+
+    def update(self, x: float) -> Optional[Tuple[float, float, float]]:
+        fast, slow = self.fast.update(x), self.slow.update(x)
+        if fast is None or slow is None:
+            return None
+        macd = fast - slow
+        signal = self.signal.update(macd)
+        if signal is None:
+            return None
+        return macd, signal, macd - signal
+
+    def peek(self, x: float) -> Optional[Tuple[float, float, float]]:
+        fast, slow = self.fast.peek(x), self.slow.peek(x)
+        if fast is None or slow is None:
+            return None
+        macd = fast - slow
+        signal = self.signal.peek(macd)
+        if signal is None:
+            return None
+        return macd, signal, macd - signal
+
+
+class Bollinger:
+    """Returns (middle, upper, lower) using the population standard deviation."""
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0):
+        self.period = period
+        self.std_dev = std_dev
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def _bands(self, total: float, total_sq: float) -> Tuple[float, float, float]:
+        mean = total / self.period
+        std = math.sqrt(max(total_sq / self.period - mean * mean, 0.0))
+        return mean, mean + self.std_dev * std, mean - self.std_dev * std
+
+    @property
+    def value(self) -> Optional[Tuple[float, float, float]]:
+        if len(self.window) < self.period:
+            return None
+        return self._bands(self.total, self.total_sq)
+
+    def update(self, x: float) -> Optional[Tuple[float, float, float]]:
+        if len(self.window) == self.period:
+            old = self.window[0]
+            self.total -= old
+            self.total_sq -= old * old
+        self.window.append(x)
+        self.total += x
+        self.total_sq += x * x
+        return self.value
+
+    def peek(self, x: float) -> Optional[Tuple[float, float, float]]:
+        if len(self.window) + 1 < self.period:
+            return None
+        old = self.window[0] if len(self.window) == self.period else 0.0
+        return self._bands(self.total - old + x, self.total_sq - old * old + x * x)
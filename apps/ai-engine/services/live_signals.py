@@ -0,0 +1,112 @@
+import asyncio
+import math
+import time
+from typing import Dict, Optional
+
+from models import Signal
+from services.binance_client import to_binance_symbol
+from services.live_indicators import SMA, WilderRSI
+from services.signal_generator import TICKERS_CRYPTO, build_technical_signal, evaluate_technical, fetch_crypto_history
+
+DAY_SECONDS = 86400
+SEED_RETRY_SECONDS = 60
+
+# Stream symbol (btcusdt) -> chart ticker (BTC-USD)
+STREAM_TICKERS = {to_binance_symbol(t).lower(): t for t in TICKERS_CRYPTO}
+
+
+class LiveSignal:
+    """
+    Technical signal for one streamed ticker, kept current trade by trade.
+    Indicators run on daily closes like /signals; the forming day's close is the
+    latest trade price (peeked, not committed) until the day rolls over.
+    """
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+        self.rsi = WilderRSI(14)
+        self.sma = SMA(20)
+        self.day: Optional[int] = None
+        self.last_price: Optional[float] = None
+        self.state = None  # (action, whole-point confidence) of the current signal
+        self.signal: Optional[Signal] = None
+
+    def seed(self, times: list, closes: list):
+        """Warm up from daily bars; the last bar is today's and still forming."""
+        for close in closes[:-1]:
+            self.rsi.update(close)
+            self.sma.update(close)
+        self.day = int(times[-1]) // DAY_SECONDS
+        self.last_price = closes[-1]
+        self.evaluate(self.last_price)
+
+    def on_trade(self, ts: float, price: float) -> Optional[Signal]:
+        """Returns the new signal when the trade changes it, otherwise None."""
+        day = int(ts // DAY_SECONDS)
+        if day < self.day:
+            return None
+        if day > self.day:
+            # Yesterday closed at the last price we saw
+            self.rsi.update(self.last_price)
+            self.sma.update(self.last_price)
+            self.day = day
+        self.last_price = price
+        return self.evaluate(price)
+
+    def evaluate(self, price: float) -> Optional[Signal]:
+        rsi = self.rsi.peek(price)
+        rsi = 50.0 if rsi is None else rsi
+        sma_20 = self.sma.peek(price)
+        sma_20 = math.nan if sma_20 is None else sma_20
+
+        action, confidence, _, _ = evaluate_technical(price, rsi, sma_20)
+        state = (action, round(min(confidence, 99.9)))
+        if state == self.state:
+            return None
+        self.state = state
+        self.signal = build_technical_signal(self.ticker, price, rsi, sma_20)
+        return self.signal
+
+
+class LiveSignalBook:
+    """LiveSignal per streamed crypto symbol, seeded lazily from daily history."""
+
+    def __init__(self):
+        self.trackers: Dict[str, LiveSignal] = {}
+        self._seeding = set()
+        self._seed_failed_at: Dict[str, float] = {}
+
+    def latest(self, ticker: str) -> Optional[Signal]:
+        tracker = self.trackers.get(to_binance_symbol(ticker).lower())
+        return tracker.signal if tracker else None
+
+    def on_trade(self, symbol: str, ts: float, price: float) -> Optional[Signal]:
+        tracker = self.trackers.get(symbol)
+        if tracker is not None:
+            return tracker.on_trade(ts, price)
+
+        ticker = STREAM_TICKERS.get(symbol)
+        if ticker is None or symbol in self._seeding:
+            return None
+        if time.monotonic() - self._seed_failed_at.get(symbol, -SEED_RETRY_SECONDS) < SEED_RETRY_SECONDS:
+            return None
+        self._seeding.add(symbol)
+        asyncio.get_running_loop().create_task(self._seed(symbol, ticker))
+        return None
+
+    async def _seed(self, symbol: str, ticker: str):
+        try:
+            history = await fetch_crypto_history(ticker, "1d", "1mo")
+            if not history.time:
+                raise ValueError("no daily history")
+            tracker = LiveSignal(ticker)
+            tracker.seed(history.time, history.close)
+            self.trackers[symbol] = tracker
+        except Exception as e:
+            print(f"Error seeding live signal for {ticker}: {e}")
+            self._seed_failed_at[symbol] = time.monotonic()
+        finally:
+            self._seeding.discard(symbol)
+
+
+live_signals = LiveSignalBook()
@@ -0,0 +1,333 @@
+import os
+import time
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import psutil
+except ImportError:  # Optional; /proc and os.times() cover Linux containers
+    psutil = None
+
+# In-process instrumentation. Recording is a lock plus a few integer updates;
+# percentiles, rates and the Prometheus text are only computed when read.
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout (last bucket is +Inf)."""
+
+    __slots__ = ("buckets", "counts", "count", "total")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding the q-th observation."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+class RateMeter:
+    """Events per second over a sliding window of one-second slots."""
+
+    def __init__(self, window: int = 60):
+        self.window = window
+        self.slots = [0] * window
+        self.stamps = [0] * window
+        self.total = 0
+
+    def mark(self, n: int = 1):
+        second = int(time.monotonic())
+        i = second % self.window
+        if self.stamps[i] != second:
+            self.stamps[i] = second
+            self.slots[i] = 0
+        self.slots[i] += n
+        self.total += n
+
+    def rate(self) -> float:
+        # Whole seconds only; the current one is still filling
+        now = int(time.monotonic())
+        return sum(n for n, s in zip(self.slots, self.stamps) if now - self.window <= s < now) / self.window
+
+
+class UpstreamTimer:
+    """`with metrics.upstream("binance"):` (or `async with`) counts the call and its duration."""
+
+    __slots__ = ("registry", "service", "started")
+
+    def __init__(self, registry: "Metrics", service: str):
+        self.registry = registry
+        self.service = service
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe_upstream(self.service, time.perf_counter() - self.started, exc_type is None)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+class ProcessSampler:
+    """Process CPU % (since the previous sample) and resident memory."""
+
+    def __init__(self):
+        self.process = psutil.Process() if psutil else None
+        self.last_wall = time.monotonic()
+        self.last_cpu = self._cpu_seconds()
+        self.last_percent = 0.0
+
+    def _cpu_seconds(self) -> float:
+        t = os.times()
+        return t.user + t.system
+
+    def cpu_percent(self) -> float:
+        wall, cpu = time.monotonic(), self._cpu_seconds()
+        elapsed = wall - self.last_wall
+        if elapsed < 0.1:  # Too short to be meaningful; keep the previous window
+            return self.last_percent
+        self.last_percent = max(0.0, (cpu - self.last_cpu) / elapsed * 100)
+        self.last_wall, self.last_cpu = wall, cpu
+        return self.last_percent
+
+    def rss_bytes(self) -> int:
+        if self.process is not None:
+            return self.process.memory_info().rss
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return 0
+
+    def total_memory(self) -> int:
+        if psutil is not None:
+            return psutil.virtual_memory().total
+        try:
+            return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        except (ValueError, OSError, AttributeError):
+            return 0
+
+    def memory_percent(self) -> float:
+        total = self.total_memory()
+        return self.rss_bytes() / total * 100 if total else 0.0
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.time()
+        self.requests: Dict[Tuple[str, str, int], int] = defaultdict(int)  # (method, route, status)
+        self.latency: Dict[Tuple[str, str], Histogram] = defaultdict(Histogram)
+        self.in_flight = 0
+        self.upstream_calls: Dict[Tuple[str, str], int] = defaultdict(int)  # (service, ok|error)
+        self.upstream_latency: Dict[str, Histogram] = defaultdict(Histogram)
+        self.cache_events: Dict[Tuple[str, str], int] = defaultdict(int)  # (cache, hit|stale|miss|...)
+        self.flights: Dict[Tuple[str, str], int] = defaultdict(int)  # (flight, leader|shared)
+        self.redis_messages = RateMeter()
+        self.process = ProcessSampler()
+        self._lock = threading.Lock()
+
+    # --- Recording (hot path) ---
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        with self._lock:
+            self.requests[(method, route, status)] += 1
+            self.latency[(method, route)].observe(seconds)
+
+    def upstream(self, service: str) -> UpstreamTimer:
+        return UpstreamTimer(self, service)
+
+    def observe_upstream(self, service: str, seconds: float, ok: bool):
+        with self._lock:
+            self.upstream_calls[(service, "ok" if ok else "error")] += 1
+            self.upstream_latency[service].observe(seconds)
+
+    def cache(self, name: str, result: str):
+        with self._lock:
+            self.cache_events[(name, result)] += 1
+
+    def flight(self, name: str, role: str):
+        with self._lock:
+            self.flights[(name, role)] += 1
+
+    # --- Reading ---
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    def cache_hit_ratios(self) -> Dict[str, float]:
+        """Share of lookups served without a full upstream fetch, per cache."""
+        totals, misses = defaultdict(int), defaultdict(int)
+        for (name, result), n in list(self.cache_events.items()):
+            totals[name] += n
+            if result == "miss":
+                misses[name] += n
+        return {name: round(1 - misses[name] / total, 4) for name, total in totals.items() if total}
+
+    def route_latencies(self) -> List[dict]:
+        rows = []
+        for (method, route), h in sorted(list(self.latency.items())):
+            rows.append({
+                "method": method, "route": route, "count": h.count,
+                "mean_ms": round(h.mean * 1000, 3),
+                "p50_ms": round(h.quantile(0.5) * 1000, 3),
+                "p95_ms": round(h.quantile(0.95) * 1000, 3),
+                "p99_ms": round(h.quantile(0.99) * 1000, 3),
+            })
+        return rows
+
+    def upstream_stats(self) -> List[dict]:
+        rows = []
+        for service, h in sorted(list(self.upstream_latency.items())):
+            rows.append({
+                "service": service,
+                "calls": self.upstream_calls.get((service, "ok"), 0) + self.upstream_calls.get((service, "error"), 0),
+                "errors": self.upstream_calls.get((service, "error"), 0),
+                "mean_ms": round(h.mean * 1000, 3),
+                "p95_ms": round(h.quantile(0.95) * 1000, 3),
+            })
+        return rows
+
+    def render_prometheus(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        lines = []
+
+        def histogram(name: str, help_text: str, series: Dict[str, Histogram]):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, h in series.items():
+                cumulative = 0
+                for bound, n in zip(list(h.buckets) + ["+Inf"], h.counts):
+                    cumulative += n
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {h.total}")
+                lines.append(f"{name}_count{{{labels}}} {h.count}")
+
+        with self._lock:
+            lines.append("# HELP yukti_http_requests_total HTTP requests by route and status")
+            lines.append("# TYPE yukti_http_requests_total counter")
+            for (method, route, status), n in sorted(self.requests.items()):
+                lines.append(f'yukti_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {n}')
+            histogram("yukti_http_request_duration_seconds", "Time to response start",
+                      {f'method="{m}",route="{r}"': h for (m, r), h in sorted(self.latency.items())})
+
+            lines.append("# HELP yukti_upstream_calls_total Upstream calls by service and outcome")
+            lines.append("# TYPE yukti_upstream_calls_total counter")
+            for (service, outcome), n in sorted(self.upstream_calls.items()):
+                lines.append(f'yukti_upstream_calls_total{{service="{service}",outcome="{outcome}"}} {n}')
+            histogram("yukti_upstream_duration_seconds", "Upstream call duration",
+                      {f'service="{s}"': h for s, h in sorted(self.upstream_latency.items())})
+
+            lines.append("# HELP yukti_cache_lookups_total Cache lookups by cache and result")
+            lines.append("# TYPE yukti_cache_lookups_total counter")
+            for (name, result), n in sorted(self.cache_events.items()):
+                lines.append(f'yukti_cache_lookups_total{{cache="{name}",result="{result}"}} {n}')
+
+            lines.append("# HELP yukti_singleflight_calls_total Coalesced calls: leaders went upstream, shared waited on one")
+            lines.append("# TYPE yukti_singleflight_calls_total counter")
+            for (name, role), n in sorted(self.flights.items()):
+                lines.append(f'yukti_singleflight_calls_total{{flight="{name}",role="{role}"}} {n}')
+
+            lines.append("# HELP yukti_redis_messages_total Market data messages received from Redis")
+            lines.append("# TYPE yukti_redis_messages_total counter")
+            lines.append(f"yukti_redis_messages_total {self.redis_messages.total}")
+
+        all_gauges = {
+            "yukti_http_requests_in_flight": self.in_flight,
+            "yukti_redis_messages_per_second": self.redis_messages.rate(),
+            "yukti_process_cpu_percent": self.process.cpu_percent(),
+            "yukti_process_resident_memory_bytes": self.process.rss_bytes(),
+            "yukti_process_uptime_seconds": time.time() - self.started,
+            **(gauges or {}),
+        }
+        for name, value in all_gauges.items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+def route_template(scope) -> str:
+    """
+    Route label without path parameter values (/api/v1/chart/{ticker}), so label
+    cardinality stays bounded. Older FastAPI copies the include_router prefix into
+    route.path; newer versions include routers lazily, leave route.path as the
+    router's own path and put the prefixed one on the effective route context.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    effective = scope.get("fastapi", {}).get("effective_route_context")
+    return getattr(effective, "path", None) or route.path
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: per-route latency to the start of the response (for
+    SSE that is time to first byte, not stream lifetime) and an in-flight gauge.
+    """
+
+    def __init__(self, app, registry: Metrics = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        recorded = False
+        registry = self.registry
+
+        def record():
+            registry.observe_request(scope["method"], route_template(scope), status, time.perf_counter() - started)
+
+        async def send_wrapper(message):
+            nonlocal status, recorded
+            if message["type"] == "http.response.start" and not recorded:
+                status = message["status"]
+                recorded = True
+                record()
+            await send(message)
+
+        registry.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            registry.in_flight -= 1
+            if not recorded:
+                record()
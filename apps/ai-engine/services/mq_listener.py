@@ -1,36 +1,329 @@
 import asyncio
+import heapq
+import itertools
 import redis.asyncio as redis
 import os
+import re
 import json
 import logging
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set
+from datetime import datetime
+from services.bar_aggregator import bar_aggregator
+from services.live_signals import live_signals
+from services.metrics import metrics
+from services.replay_buffer import ReplayRing, STREAM_REPLAY_SIZE, event_id_base
+from services.subscriber_queue import SubscriberQueue, QueuePolicy, SlowConsumerError, STREAM_QUEUE_SIZE, STREAM_QUEUE_POLICY
+
+try:
+    import orjson
+except ImportError:  # Optional; the stdlib parser is slower but equivalent here
+    orjson = None
 
 # Configure logger
 logger = logging.getLogger("uvicorn")
 
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# raw: trades go to SSE clients exactly as published; json: re-serialized (normalized) after parsing
+STREAM_RELAY_MODE = os.getenv("STREAM_RELAY_MODE", "raw")
+REDIS_BATCH_SIZE = int(os.getenv("REDIS_BATCH_SIZE", "512"))  # Pub/sub messages taken per read
+
+parse_json = orjson.loads if orjson else json.loads
+
+# The fields the bars and live signals read. The market data service publishes
+# flat objects with them as plain strings (decimals, RFC 3339 times), so they
+# can be picked out without parsing the rest of the payload.
+TRADE_FIELD = re.compile(rb'"(price|size|timestamp)"\s*:\s*"?([^",}]*)')
+
+def normalize_symbol(symbol: str) -> str:
+    # Channels and clients disagree on case (market.trade.BTCUSDT vs ?symbols=btcusdt)
+    return symbol.strip().lower()
+
+@lru_cache(maxsize=4096)
+def symbol_from_channel(channel) -> str:
+    # market.trade.{symbol} -> symbol; the listener reads channels as bytes
+    if isinstance(channel, bytes):
+        channel = channel.decode()
+    return normalize_symbol(channel.rsplit(".", 1)[-1])
 
 # Global Broadcaster
 class StreamBroadcaster:
-    def __init__(self):
-        self.subscribers = []
+    """
+    Fan-out of market events to SSE subscribers.
+    Subscribers are indexed by symbol, so a trade only touches the queues of the
+    clients that asked for it (plus the unfiltered "firehose" subscribers).
+    Each subscriber has a bounded SubscriberQueue, so a stalled client cannot
+    grow memory without limit.
+
+    Every event gets a monotonically increasing id and is kept in a bounded
+    per-symbol replay ring, so a client reconnecting with Last-Event-ID receives
+    exactly the events it missed. When the gap has already left the ring (or the
+    id is from before a restart) the client gets a snapshot instead: the latest
+    event of each kind per symbol, announced by a `snapshot` event.
+    """
+
+    def __init__(self, queue_size: int = STREAM_QUEUE_SIZE, policy: QueuePolicy = STREAM_QUEUE_POLICY,
+                 replay_size: int = STREAM_REPLAY_SIZE):
+        self.queue_size = queue_size
+        self.policy = policy
+        self.replay_size = replay_size
+        self.subscribers: Set[SubscriberQueue] = set()  # Unfiltered subscribers
+        self.by_symbol: Dict[str, Set[SubscriberQueue]] = defaultdict(set)
+        self.base_id = event_id_base()
+        self._ids = itertools.count(self.base_id)
+        self.replay: Dict[str, ReplayRing] = {}
+        self.latest: Dict[str, Dict[str, dict]] = defaultdict(dict)  # symbol -> kind -> newest event
+        self.replayed = 0
+        self.snapshots = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self.all_subscribers())
+
+    def all_subscribers(self) -> Set[SubscriberQueue]:
+        return self.subscribers.union(*self.by_symbol.values())
 
-    async def subscribe(self):
-        queue = asyncio.Queue()
-        self.subscribers.append(queue)
+    def stats(self) -> List[dict]:
+        return [q.stats() for q in sorted(self.all_subscribers(), key=lambda q: q.id)]
+
+    async def subscribe(self, symbols: Optional[Iterable[str]] = None, policy: Optional[QueuePolicy] = None,
+                        batch_window: Optional[float] = None, last_event_id: Optional[str] = None,
+                        latest: bool = False):
+        """
+        Yield SSE events for one client. With `batch_window` (seconds) the trades
+        that arrive within each window go out as a single `trades` frame
+        (with `latest`, only the newest event per symbol and kind).
+        `last_event_id` resumes a previous connection (see resume()).
+        """
+        queue = SubscriberQueue(self.queue_size, policy or self.policy)
+        keys = {normalize_symbol(s) for s in symbols or [] if s.strip()}
+        if keys:
+            for key in keys:
+                self.by_symbol[key].add(queue)
+        else:
+            self.subscribers.add(queue)
+        # Registered before reading the history, with no await in between: every
+        # event is either in the backlog or will arrive through the queue, never both
+        backlog = self.resume(last_event_id, keys) if last_event_id is not None else []
         try:
+            if batch_window:
+                for frame in batch_frames(backlog):
+                    yield frame
+                while True:
+                    for frame in batch_frames(await queue.get_batch(batch_window, latest)):
+                        yield frame
+            for event in backlog:
+                yield event
             while True:
                 data = await queue.get()
                 yield data
-        except asyncio.CancelledError: # NOSONAR
-            self.subscribers.remove(queue)
-            raise
+        except SlowConsumerError as e:
+            logger.warning(f"⚠️ {e}")
+        finally:
+            self._unsubscribe(queue, keys)
+
+    def resume(self, last_event_id: str, keys: Set[str]) -> List[dict]:
+        """Events after `last_event_id` for `keys` (all symbols if empty), or a snapshot where lost."""
+        try:
+            last_id = int(last_event_id)
+        except ValueError:
+            last_id = -1
+        symbols = keys or set(self.replay)
+
+        missed, lost = [], []
+        for symbol in sorted(symbols):
+            ring = self.replay.get(symbol)
+            if ring is None:
+                if last_id < self.base_id:
+                    lost.append(symbol)  # Quiet since a restart: nothing to send, but the client must reset
+                continue
+            if last_id < self.base_id or not ring.covers(last_id):
+                lost.append(symbol)
+            else:
+                missed.append(ring.since(last_id))
+
+        self.replayed += sum(len(m) for m in missed)
+        if lost:
+            self.snapshots += 1
+            missed.append(sorted((int(e["id"]), e) for symbol in lost for e in self.latest.get(symbol, {}).values()))
+        events = [event for _, event in heapq.merge(*missed, key=lambda item: item[0])]
+        if lost:
+            # No id of its own, so the client's Last-Event-ID only moves forward
+            events.insert(0, {"event": "snapshot", "data": json.dumps({"symbols": lost})})
+        return events
+
+    def _unsubscribe(self, queue: SubscriberQueue, keys: Set[str]):
+        queue.close()
+        self.subscribers.discard(queue)
+        for key in keys:
+            subs = self.by_symbol.get(key)
+            if subs is None:
+                continue
+            subs.discard(queue)
+            if not subs:
+                del self.by_symbol[key]
 
-    def publish(self, data):
-        for queue in self.subscribers:
-            queue.put_nowait(data)
+    def publish(self, data, symbol: Optional[str] = None, kind: str = "trade"):
+        """
+        Deliver to subscribers of `symbol`; events without a symbol go to everyone
+        and are not kept for replay.
+        (kind, symbol) is the conflation key: once a conflating queue is full, a
+        new event replaces the pending one with the same key.
+        `data` is an SSE event dict or, for plain messages, its data string.
+        """
+        event_id = next(self._ids)
+        event = data if isinstance(data, dict) else {"data": data}
+        event["id"] = str(event_id)
+
+        if symbol is None:
+            key = None
+            targets = self.all_subscribers()
+        else:
+            symbol = normalize_symbol(symbol)
+            key = (kind, symbol)
+            ring = self.replay.get(symbol)
+            if ring is None:
+                ring = self.replay[symbol] = ReplayRing(self.replay_size)
+            ring.append(event_id, event)
+            self.latest[symbol][kind] = event
+            targets = self.by_symbol.get(symbol, ())
+            for queue in self.subscribers:
+                queue.put(event, key)
+        for queue in targets:
+            queue.put(event, key)
 
 broadcaster = StreamBroadcaster()
 
+def batch_frames(batch: list) -> List[dict]:
+    """
+    Runs of trades become one `trades` event holding a JSON array, joined without
+    re-parsing, and carrying the id of the run's last trade. Bar, signal and
+    snapshot events are rare and go out between the runs, so ids stay in
+    increasing order and a client resuming from any frame has seen everything
+    before it.
+    """
+    frames, trades = [], []
+    for event in batch:
+        if "event" not in event:
+            trades.append(event)
+            continue
+        if trades:
+            frames.append(trades_frame(trades))
+            trades = []
+        frames.append(event)
+    if trades:
+        frames.append(trades_frame(trades))
+    return frames
+
+def trades_frame(trades: list) -> dict:
+    return {"event": "trades", "id": trades[-1]["id"], "data": "[" + ",".join(event["data"] for event in trades) + "]"}
+
+def trade_time(trade: dict) -> float:
+    try:
+        return datetime.fromisoformat(trade["timestamp"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return datetime.now().timestamp()
+
+def apply_trade(symbol: str, trade: dict):
+    """
+    Feed a trade to the live state: push a `bar` SSE event for every bar it
+    closes and a `signal` event when it changes the symbol's live signal.
+    """
+    try:
+        price = float(trade["price"])
+        size = float(trade.get("size") or 0)
+    except (KeyError, TypeError, ValueError):
+        return
+
+    ts = trade_time(trade)
+    signal = live_signals.on_trade(symbol, ts, price)
+    if signal is not None:
+        broadcaster.publish({"event": "signal", "data": signal.model_dump_json()}, symbol, kind="signal")
+
+    for interval, bar in bar_aggregator.on_trade(symbol, ts, price, size):
+        event = {
+            "symbol": symbol,
+            "interval": interval,
+            "time": bar[0],
+            "open": bar[1],
+            "high": bar[2],
+            "low": bar[3],
+            "close": bar[4],
+            "volume": bar[5],
+        }
+        broadcaster.publish({"event": "bar", "data": json.dumps(event)}, symbol, kind=f"bar:{interval}")
+
+def trade_fields(data) -> Optional[dict]:
+    """
+    price, size and timestamp of a raw trade payload, or None if it is not a
+    JSON object. With orjson the whole payload is parsed: that is still cheaper
+    than scanning it for the three fields in Python.
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    if orjson is not None:
+        try:
+            trade = orjson.loads(data)
+        except ValueError:
+            return None
+        return trade if isinstance(trade, dict) else None
+    data = data.strip()
+    if not (data.startswith(b"{") and data.endswith(b"}")):
+        return None
+    return {key.decode(): value.decode() for key, value in TRADE_FIELD.findall(data)}
+
+def relay_trade(channel, data):
+    """
+    Relay one trade to SSE clients and update live state. In raw mode clients
+    get the payload as published and only the fields the bars and live signals
+    need are read from it; json mode parses and re-serializes the whole trade.
+    """
+    symbol = symbol_from_channel(channel)
+    if STREAM_RELAY_MODE == "json":
+        try:
+            trade = parse_json(data)
+        except ValueError:
+            trade = None
+        payload = json.dumps(trade) if isinstance(trade, dict) else None
+    else:
+        trade = trade_fields(data)
+        payload = data.decode() if isinstance(data, bytes) else data
+    if not isinstance(trade, dict):
+        logger.error("Failed to decode trade JSON")
+        return
+    broadcaster.publish(payload, symbol)
+    apply_trade(symbol, trade)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"🔥 RELAY: {symbol} @ {trade.get('price')}")
+
+def handle_message(channel, data):
+    """One trade message from Redis (str or bytes)."""
+    metrics.redis_messages.mark()
+    relay_trade(channel, data)
+
+def handle_batch(messages: List[tuple]):
+    """(channel, data) pairs from one read."""
+    metrics.redis_messages.mark(len(messages))
+    for channel, data in messages:
+        relay_trade(channel, data)
+
+async def read_batch(pubsub) -> List[tuple]:
+    """
+    Wait for the next pub/sub message, then take the ones already buffered
+    behind it (up to REDIS_BATCH_SIZE), as (channel, data).
+    Raw replies skip redis-py's per-message dict building.
+    """
+    responses = [await pubsub.parse_response(block=True)]
+    while len(responses) < REDIS_BATCH_SIZE:
+        response = await pubsub.parse_response(block=False, timeout=0)
+        if response is None:
+            break
+        responses.append(response)
+    # [b"pmessage", pattern, channel, data]; subscribe confirmations are skipped
+    return [(r[2], r[3]) for r in responses if r and r[0] == b"pmessage"]
+
 async def listen_to_market_data():
     """
     Connects to Redis Pub/Sub and listens for market trades.
@@ -39,25 +332,18 @@ async def listen_to_market_data():
     while True:
         try:
             logger.info(f"🔌 Connecting to Redis at {REDIS_URL}...")
-            r = redis.from_url(REDIS_URL, decode_responses=True)
+            # Bytes in: payloads are relayed without a parse/re-encode round trip
+            r = redis.from_url(REDIS_URL)
             pubsub = r.pubsub()
             
             # Subscribe to all market trades
             await pubsub.psubscribe("market.trade.*")
             logger.info("✅ Subscribed to 'market.trade.*'")
 
-            async for message in pubsub.listen():
-                if message["type"] in ["message", "pmessage"]:
-                    data = message["data"]
-                    
-                    try:
-                        trade = json.loads(data)
-                        # Broadcast to SSE clients
-                        broadcaster.publish(json.dumps(trade))
-                        
-                        logger.debug(f"🔥 RELAY: {trade.get('symbol')} @ {trade.get('price')}")
-                    except json.JSONDecodeError:
-                        logger.error("Failed to decode trade JSON")
+            while True:
+                messages = await read_batch(pubsub)
+                if messages:
+                    handle_batch(messages)
         except Exception as e:
             logger.error(f"❌ Redis Listener Error: {e}. Retrying in 5s...")
             await asyncio.sleep(5)
@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import yfinance as yf
+
+from models import NewsItem, NewsResponse
+from services.metrics import metrics
+from services.sentiment import classify
+from services.single_flight import SingleFlight
+from services.signal_generator import resolve_yf_symbol
+
+# Articles are fetched per ticker and cached with a TTL, but stored once per
+# article id: a story tagged with several tickers is kept (and scored) a single
+# time. Sentiment runs as one batch over the articles that are new in a fetch.
+
+NEWS_TTL_SECONDS = float(os.getenv("NEWS_TTL_SECONDS", "300"))
+NEWS_MAX_ARTICLES = int(os.getenv("NEWS_MAX_ARTICLES", "5000"))
+
+
+def parse_news_item(n: dict, ticker: str) -> NewsItem:
+    # Check if content is nested (some versions)
+    item = n.get('content', n)
+
+    # Map Correct Keys
+    provider = item.get('provider', {})
+    source_name = provider.get('displayName', 'Yahoo Finance')
+
+    # URL: Try clickThrough -> canonical
+    url_obj = item.get('clickThroughUrl') or item.get('canonicalUrl') or {}
+    url = url_obj.get('url', '#')
+
+    # Title
+    title = item.get('title', 'No Title')
+
+    # Time: pubDate is widely used now
+    published = item.get('pubDate') or datetime.now().isoformat()
+
+    # Stable id when Yahoo has none, so the article still deduplicates
+    article_id = item.get('id') or hashlib.blake2b(f"{url}|{title}".encode(), digest_size=8).hexdigest()
+
+    return NewsItem(
+        id=article_id,
+        title=title,
+        source=source_name,
+        published_at=published,
+        url=url,
+        tickers=[ticker],
+    )
+
+
+def fetch_ticker_news(ticker: str) -> List[NewsItem]:
+    """Blocking yfinance fetch; sentiment is left for the pipeline."""
+    with metrics.upstream("yfinance"):
+        news_data = yf.Ticker(resolve_yf_symbol(ticker)).news or []
+    return [parse_news_item(n, ticker) for n in news_data]
+
+
+class NewsPipeline:
+    def __init__(self, ttl: float = NEWS_TTL_SECONDS, max_articles: int = NEWS_MAX_ARTICLES):
+        self.ttl = ttl
+        self.max_articles = max_articles
+        self.articles: "OrderedDict[str, NewsItem]" = OrderedDict()
+        self.by_ticker: Dict[str, Tuple[float, List[str]]] = {}  # ticker -> (fetched_at, article ids)
+        self.scored = 0  # Articles scored so far (each exactly once)
+        self.flights = SingleFlight("news")
+        self._lock = threading.Lock()
+
+    def ingest(self, ticker: str, items: List[NewsItem]) -> List[str]:
+        """Merge fetched articles, scoring only those not seen before. Returns the ticker's ids."""
+        with self._lock:
+            fresh = [item for item in items if item.id not in self.articles]
+            for item, sentiment in zip(fresh, classify([item.title for item in fresh])):
+                item.sentiment = sentiment
+                self.articles[item.id] = item
+            self.scored += len(fresh)
+
+            ids = []
+            for item in items:
+                article = self.articles[item.id]
+                if ticker not in article.tickers:
+                    article.tickers.append(ticker)
+                self.articles.move_to_end(item.id)
+                if item.id not in ids:
+                    ids.append(item.id)
+
+            while len(self.articles) > self.max_articles:
+                self.articles.popitem(last=False)
+            self.by_ticker[ticker] = (time.monotonic(), ids)
+            return ids
+
+    def _response(self, ticker: str, ids: List[str]) -> NewsResponse:
+        news = [self.articles[i] for i in ids if i in self.articles]
+        return NewsResponse(ticker=ticker, news=news)
+
+    async def get(self, ticker: str) -> NewsResponse:
+        cached = self.by_ticker.get(ticker)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            metrics.cache("news", "hit")
+            return self._response(ticker, cached[1])
+        metrics.cache("news", "miss")
+
+        # One upstream fetch per ticker, however many requests are waiting on it
+        return self._response(ticker, await self.flights.do(ticker, self._refresh, ticker))
+
+    async def _refresh(self, ticker: str) -> List[str]:
+        try:
+            items = await asyncio.to_thread(fetch_ticker_news, ticker)
+            return self.ingest(ticker, items)
+        except Exception as e:
+            print(f"Error fetching news for {ticker}: {e}")
+            # Serve what we had; the next request retries
+            cached = self.by_ticker.get(ticker)
+            return cached[1] if cached else []
+
+
+news_pipeline = NewsPipeline()
@@ -0,0 +1,161 @@
+import os
+import time
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+from models import ChartColumns
+
+# How long a cached series is served as-is before we go upstream for the tail.
+# Intraday bars move quickly, daily/weekly bars barely change within a session.
+INTERVAL_TTL_SECONDS: Dict[str, int] = {
+    "1m": 15,
+    "2m": 20,
+    "5m": 30,
+    "15m": 60,
+    "30m": 120,
+    "60m": 300,
+    "90m": 300,
+    "1h": 300,
+    "1d": 900,
+    "5d": 1800,
+    "1wk": 3600,
+    "1mo": 3600,
+    "3mo": 3600,
+}
+DEFAULT_TTL_SECONDS = 300
+
+# Rough per-bar footprint (six list slots + boxed floats), used for the memory cap
+BAR_SIZE_ESTIMATE = 200
+
+OHLCV_FIELDS = ("time", "open", "high", "low", "close", "volume")
+
+CHART_CACHE_MAX_BYTES = int(os.getenv("CHART_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Views derived from one series (e.g. downsampled variants) kept alongside it
+DERIVED_PER_ENTRY = int(os.getenv("CHART_CACHE_DERIVED_PER_ENTRY", "4"))
+
+
+@dataclass
+class CacheEntry:
+    region: str
+    interval: str
+    data: ChartColumns
+    fetched_at: float
+    # Computed from `data` and dropped with it: a new series is a new entry
+    derived: "OrderedDict[Hashable, ChartColumns]" = field(default_factory=OrderedDict)
+    source: Optional[Hashable] = None  # Key of the finer series this one was resampled from
+
+    @property
+    def size(self) -> int:
+        return len(self.data.time) * BAR_SIZE_ESTIMATE
+
+    @property
+    def last_time(self):
+        return self.data.time[-1] if self.data.time else None
+
+
+def merge_tail(cached: ChartColumns, tail: ChartColumns) -> ChartColumns:
+    """
+    Append freshly fetched bars to a cached series.
+    The last cached bar is usually still forming, so any cached bar at or after
+    the first tail bar is replaced. The head is trimmed by the same number of
+    bars we gained, so the series keeps covering the same window length.
+    """
+    if not tail.time:
+        return cached
+
+    keep = bisect_left(cached.time, tail.time[0])
+    overflow = max(0, keep + len(tail.time) - len(cached.time))
+    return ChartColumns.model_construct(**{
+        field: (getattr(cached, field)[:keep] + getattr(tail, field))[overflow:]
+        for field in OHLCV_FIELDS
+    })
+
+
+class OHLCVCache:
+    """
+    In-process LRU cache of chart series keyed by (ticker, period, interval).
+    Entries expire per interval; expired entries are kept so the caller can
+    refresh only the bars after the last cached one.
+    """
+
+    def __init__(self, max_bytes: int = CHART_CACHE_MAX_BYTES, ttls: Optional[Dict[str, int]] = None):
+        self.max_bytes = max_bytes
+        self.ttls = ttls or INTERVAL_TTL_SECONDS
+        self.bytes_used = 0
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ttl_for(self, interval: str) -> int:
+        return self.ttls.get(interval, DEFAULT_TTL_SECONDS)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return time.monotonic() - entry.fetched_at < self.ttl_for(entry.interval)
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def items(self) -> List[Tuple[Hashable, CacheEntry]]:
+        with self._lock:
+            return list(self._entries.items())
+
+    def put(self, key: Hashable, region: str, interval: str, data: ChartColumns,
+            source: Optional[Hashable] = None) -> CacheEntry:
+        entry = CacheEntry(region=region, interval=interval, data=data, fetched_at=time.monotonic(), source=source)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes_used -= old.size
+            # A single series bigger than the whole budget is served but not kept
+            if entry.size <= self.max_bytes:
+                self._entries[key] = entry
+                self.bytes_used += entry.size
+                self._evict()
+        return entry
+
+    def append_tail(self, key: Hashable, entry: CacheEntry, tail: ChartColumns) -> CacheEntry:
+        """Merge new bars into an expired entry and mark it fresh again."""
+        return self.put(key, entry.region, entry.interval, merge_tail(entry.data, tail), entry.source)
+
+    def derive(self, entry: CacheEntry, variant: Hashable, build: Callable[[ChartColumns], ChartColumns]) -> ChartColumns:
+        """`build(entry.data)`, memoized on the entry (the few most recent variants only)."""
+        with self._lock:
+            data = entry.derived.get(variant)
+            if data is not None:
+                entry.derived.move_to_end(variant)
+                return data
+        data = build(entry.data)
+        with self._lock:
+            entry.derived[variant] = data
+            while len(entry.derived) > DERIVED_PER_ENTRY:
+                entry.derived.popitem(last=False)
+        return data
+
+    def touch(self, key: Hashable, entry: CacheEntry) -> CacheEntry:
+        """Mark an entry fresh without new data (e.g. market closed, upstream down)."""
+        with self._lock:
+            entry.fetched_at = time.monotonic()
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes_used = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _evict(self):
+        while self.bytes_used > self.max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes_used -= evicted.size
+
+
+chart_cache = OHLCVCache()
@@ -0,0 +1,212 @@
+import asyncio
+import itertools
+import math
+import multiprocessing
+import os
+import uuid
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing.shared_memory import SharedMemory
+from typing import AsyncIterator, Dict, List, Optional
+
+from models import ChartColumns
+from services.backtest import BacktestOptions, run_backtest, strategy_signals
+
+# Parameter sweeps run on a long-lived process pool. The OHLCV arrays of a job
+# are written once into a shared memory block; tasks only carry the block name
+# and a chunk of parameter sets, and each worker maps the block on first use.
+
+OPTIMIZER_WORKERS = int(os.getenv("OPTIMIZER_WORKERS", str(os.cpu_count() or 2)))
+OPTIMIZER_MAX_COMBINATIONS = int(os.getenv("OPTIMIZER_MAX_COMBINATIONS", "20000"))
+OPTIMIZER_CHUNK_SIZE = int(os.getenv("OPTIMIZER_CHUNK_SIZE", "16"))
+
+
+# --- Search spaces ---
+
+MAX_AXIS_VALUES = 2 ** 53  # Beyond this, neighbouring values are no longer distinct floats
+
+
+def _range_count(start: float, end: float, step: float) -> int:
+    """How many values _range_values yields, without building them."""
+    step = step if step and step > 0 else 1
+    span = (end - start) / step
+    if not math.isfinite(span) or span + 1 > MAX_AXIS_VALUES:
+        raise ValueError(f"Invalid parameter range {start}..{end} (step {step})")
+    return max(int(np.floor(span + 1e-9)) + 1, 0)
+
+
+def _range_value(start: float, step: float, i: int) -> float:
+    step = step if step and step > 0 else 1
+    # Round to remove float errors, as the web optimizer does
+    return round(start + i * step, 2)
+
+
+def _range_values(start: float, end: float, step: float) -> List[float]:
+    return [_range_value(start, step, i) for i in range(_range_count(start, end, step))]
+
+
+def grid_size(ranges: Dict[str, tuple]) -> int:
+    """Combinations in the grid of {name: (start, end, step)}, counted without building it."""
+    return math.prod(_range_count(*r) for r in ranges.values())
+
+
+def expand_grid(ranges: Dict[str, tuple]) -> List[Dict[str, float]]:
+    """Cartesian product of {name: (start, end, step)}. Check grid_size() first."""
+    names = list(ranges)
+    axes = [_range_values(*ranges[name]) for name in names]
+    return [dict(zip(names, combo)) for combo in itertools.product(*axes)]
+
+
+def sample_random(ranges: Dict[str, tuple], samples: int, seed: Optional[int] = None) -> List[Dict[str, float]]:
+    """Distinct random points of the grid defined by {name: (start, end, step)}; axes are never materialized."""
+    rng = np.random.default_rng(seed)
+    names = list(ranges)
+    counts = [_range_count(*ranges[name]) for name in names]
+    total = math.prod(counts) if counts else 0  # Python ints: no overflow however large the grid
+    seen = set()
+    combos = []
+    while len(combos) < min(samples, total):
+        point = tuple(int(rng.integers(count)) for count in counts)
+        if point not in seen:
+            seen.add(point)
+            combos.append({name: _range_value(ranges[name][0], ranges[name][2], i) for name, i in zip(names, point)})
+    return combos
+
+
+# --- Worker side ---
+
+_attached: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def _attach(name: str, n: int) -> tuple:
+    hit = _attached.get(name)
+    if hit is None:
+        # Spawned workers share the parent's resource tracker, so the parent's unlink covers this too
+        shm = SharedMemory(name=name)
+        data = np.ndarray((3, n), dtype=np.float64, buffer=shm.buf)
+        hit = (shm, data[0].astype(np.int64), data[1].copy(), data[2].copy())
+        _attached[name] = hit
+        while len(_attached) > 2:
+            _, old = _attached.popitem(last=False)
+            old[0].close()
+    return hit
+
+
+def _run_chunk(name: str, n: int, strategy: str, chunk: List[Dict[str, float]], options: BacktestOptions) -> List[tuple]:
+    _, times, opens, closes = _attach(name, n)
+    results = []
+    for params in chunk:
+        try:
+            signals = strategy_signals(strategy, closes, params)
+            metrics = run_backtest(times, opens, closes, signals, options)["metrics"]
+            results.append((params, metrics, None))
+        except Exception as e:
+            results.append((params, None, str(e)))
+    return results
+
+
+# --- Parent side ---
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that runs an event loop and thread pools is unsafe
+        _pool = ProcessPoolExecutor(max_workers=OPTIMIZER_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _epoch_seconds(t) -> int:
+    if isinstance(t, int):
+        return t
+    return int(datetime.strptime(str(t)[:10], "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+
+
+class OptimizationJob:
+    """One sweep: shared series, task fan-out, streaming results, early stop and cancel."""
+
+    def __init__(self, columns: ChartColumns, strategy: str, combos: List[Dict[str, float]],
+                 options: BacktestOptions, objective: str = "net_profit", minimize: bool = False,
+                 patience: Optional[int] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.columns = columns
+        self.strategy = strategy
+        self.combos = combos
+        self.options = options
+        self.objective = objective
+        self.minimize = minimize
+        self.patience = patience
+        self.cancelled = False
+        self.completed = 0
+        self.best: Optional[dict] = None
+
+    def cancel(self):
+        self.cancelled = True
+
+    def _better(self, value: float) -> bool:
+        if self.best is None:
+            return True
+        best = self.best["metrics"][self.objective]
+        return value < best if self.minimize else value > best
+
+    async def run(self) -> AsyncIterator[dict]:
+        """Yields one dict per finished parameter set, then a final summary with `done`."""
+        n = len(self.columns.time)
+        shm = SharedMemory(create=True, size=max(3 * n * 8, 1))
+        futures = []
+        stop_reason = "completed"
+        try:
+            data = np.ndarray((3, n), dtype=np.float64, buffer=shm.buf)
+            data[0] = [_epoch_seconds(t) for t in self.columns.time]
+            data[1] = np.asarray(self.columns.open, dtype=float)
+            data[2] = np.asarray(self.columns.close, dtype=float)
+            del data
+
+            pool = get_pool()
+            loop = asyncio.get_running_loop()
+            for i in range(0, len(self.combos), OPTIMIZER_CHUNK_SIZE):
+                chunk = self.combos[i:i + OPTIMIZER_CHUNK_SIZE]
+                futures.append(asyncio.wrap_future(
+                    pool.submit(_run_chunk, shm.name, n, self.strategy, chunk, self.options), loop=loop))
+
+            since_improved = 0
+            for next_done in asyncio.as_completed(futures):
+                if self.cancelled:
+                    stop_reason = "cancelled"
+                    break
+                for params, metrics, error in await next_done:
+                    self.completed += 1
+                    result = {"params": params, "metrics": metrics, "error": error}
+                    if metrics is not None and self._better(metrics[self.objective]):
+                        self.best = result
+                        since_improved = 0
+                    else:
+                        since_improved += 1
+                    yield result
+                if self.patience and since_improved >= self.patience:
+                    stop_reason = "early_stopped"
+                    break
+        finally:
+            for f in futures:
+                f.cancel()
+                # Chunks already running may fail once the block is unlinked; nobody awaits them
+                f.add_done_callback(lambda f: f.cancelled() or f.exception())
+            shm.close()
+            shm.unlink()
+
+        yield {"done": True, "reason": stop_reason, "completed": self.completed,
+               "total": len(self.combos), "best": self.best}
+
+
+optimization_jobs: Dict[str, OptimizationJob] = {}
@@ -0,0 +1,43 @@
+import os
+import time
+from collections import deque
+from typing import Deque, List, Tuple
+
+STREAM_REPLAY_SIZE = int(os.getenv("STREAM_REPLAY_SIZE", "1000"))  # Events kept per symbol for reconnects
+
+
+def event_id_base() -> int:
+    """
+    First event id of this process: microseconds since the epoch at startup.
+    Ids keep increasing across restarts (as long as the stream averages under a
+    million events per second), and any id below the base is from an earlier
+    process whose history is gone.
+    """
+    return time.time_ns() // 1000
+
+
+class ReplayRing:
+    """Last `capacity` events of one symbol as (id, event), oldest first."""
+
+    def __init__(self, capacity: int = STREAM_REPLAY_SIZE):
+        self.events: Deque[Tuple[int, dict]] = deque(maxlen=capacity)
+        self.evicted = 0  # Highest id that fell out of the ring
+
+    def append(self, event_id: int, event: dict):
+        if len(self.events) == self.events.maxlen:
+            self.evicted = self.events[0][0]
+        self.events.append((event_id, event))
+
+    def covers(self, last_id: int) -> bool:
+        """True when every event after `last_id` is still in the ring."""
+        return last_id >= self.evicted
+
+    def since(self, last_id: int) -> List[Tuple[int, dict]]:
+        # Reconnects are usually a few events behind: walk back from the newest
+        tail: List[Tuple[int, dict]] = []
+        for item in reversed(self.events):
+            if item[0] <= last_id:
+                break
+            tail.append(item)
+        tail.reverse()
+        return tail
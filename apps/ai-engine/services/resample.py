@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from models import ChartColumns
+from services.downsample import merge_runs
+
+# Coarser bars built from finer ones already held, so switching a chart's
+# timeframe needs no upstream call. Intraday buckets are aligned to the session
+# open in the exchange's timezone (09:15 IST for NSE, 09:30 New York for US,
+# midnight UTC for 24/7 crypto); daily, weekly and monthly bars group by the
+# exchange's local calendar date.
+
+DAY_SECONDS = 86400
+
+INTERVAL_SECONDS = {
+    "1m": 60, "2m": 120, "5m": 300, "15m": 900, "30m": 1800, "60m": 3600, "90m": 5400, "1h": 3600,
+    "4h": 14400, "1d": DAY_SECONDS, "1wk": 7 * DAY_SECONDS, "1mo": 30 * DAY_SECONDS,
+}
+CALENDAR_INTERVALS = ("1d", "1wk", "1mo")
+
+# Intervals yfinance does not serve, and the finer interval they are built from
+YF_RESAMPLED = {"4h": "1h"}
+
+
+@dataclass(frozen=True)
+class Session:
+    tz: str
+    open_minutes: int  # Session open, minutes after local midnight
+
+
+CRYPTO_SESSION = Session("UTC", 0)
+NSE_SESSION = Session("Asia/Kolkata", 9 * 60 + 15)
+US_SESSION = Session("America/New_York", 9 * 60 + 30)
+
+
+def session_for(ticker: str, region: str) -> Session:
+    if region == "CRYPTO":
+        return CRYPTO_SESSION
+    if ticker.endswith((".NS", ".BO")):
+        return NSE_SESSION
+    return US_SESSION
+
+
+def can_resample(source: str, target: str) -> bool:
+    """Whether whole `source` bars tile `target` bars."""
+    if source == target or source not in INTERVAL_SECONDS or target not in INTERVAL_SECONDS:
+        return False
+    if target in CALENDAR_INTERVALS:
+        # Any intraday interval rolls up into days; weeks and months only from days
+        return source not in CALENDAR_INTERVALS or (source == "1d" and target != "1d")
+    if source in CALENDAR_INTERVALS:
+        return False
+    return INTERVAL_SECONDS[target] % INTERVAL_SECONDS[source] == 0
+
+
+def utc_seconds(times: list) -> np.ndarray:
+    """Bar times as UNIX seconds; date strings (daily bars) count as midnight UTC."""
+    if times and isinstance(times[0], str):
+        return np.array(times, dtype="datetime64[D]").astype(np.int64) * DAY_SECONDS
+    return np.asarray(times, dtype=np.int64)
+
+
+def local_seconds(times: list, session: Session) -> np.ndarray:
+    """Wall-clock seconds in the session's timezone; date strings already are local dates."""
+    if times and isinstance(times[0], str):
+        return utc_seconds(times)
+    if session.tz == "UTC":
+        return np.asarray(times, dtype=np.int64)
+    index = pd.to_datetime(np.asarray(times, dtype=np.int64), unit="s", utc=True)
+    return index.tz_convert(session.tz).tz_localize(None).as_unit("s").asi8
+
+
+def bucket_start(local: np.ndarray, target: str, session: Session) -> np.ndarray:
+    """Local start time of the `target` bar each bar falls into."""
+    days = local // DAY_SECONDS
+    if target == "1d":
+        return days * DAY_SECONDS
+    if target == "1wk":
+        weekday = (days + 3) % 7  # 1970-01-01 was a Thursday; weeks start on Monday
+        return (days - weekday) * DAY_SECONDS
+    if target == "1mo":
+        return local.astype("datetime64[s]").astype("datetime64[M]").astype("datetime64[s]").astype(np.int64)
+    step = INTERVAL_SECONDS[target]
+    session_open = days * DAY_SECONDS + session.open_minutes * 60
+    return session_open + (local - session_open) // step * step
+
+
+def resample(columns: ChartColumns, source: str, target: str, session: Session,
+             daily_dates: bool = True, since: Optional[int] = None) -> ChartColumns:
+    """
+    Aggregate `source` bars into `target` bars. Calendar bars are labelled with
+    date strings when `daily_dates` (what yfinance daily bars look like), UNIX
+    seconds otherwise. Bars before `since` (UNIX seconds) are ignored, and a
+    first bar that started before the data does is dropped as incomplete.
+    """
+    if not columns.time:
+        return ChartColumns()
+    if since is not None:
+        first = int(np.searchsorted(utc_seconds(columns.time), since))
+        if first:
+            columns = ChartColumns.model_construct(**{
+                field: getattr(columns, field)[first:] for field in ("time", "open", "high", "low", "close", "volume")
+            })
+        if not columns.time:
+            return ChartColumns()
+
+    local = local_seconds(columns.time, session)
+    keys = bucket_start(local, target, session)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+    # The first bucket is incomplete when the data starts after it opened
+    # (weeks and months are left alone: holidays make their first session uncertain)
+    expected = keys[0] + (session.open_minutes * 60 if target == "1d" and session is not CRYPTO_SESSION else 0)
+    if target not in ("1wk", "1mo") and local[0] > expected and len(starts) > 1:
+        columns = ChartColumns.model_construct(**{
+            field: getattr(columns, field)[starts[1]:] for field in ("time", "open", "high", "low", "close", "volume")
+        })
+        local, keys = local[starts[1]:], keys[starts[1]:]
+        starts = starts[1:] - starts[1]
+
+    if target in CALENDAR_INTERVALS and daily_dates:
+        times = (keys[starts] // DAY_SECONDS).astype("datetime64[D]").astype(str).tolist()
+    elif target in CALENDAR_INTERVALS or isinstance(columns.time[0], str):
+        times = keys[starts].tolist()
+    else:
+        # Back to UTC with each bucket's own offset (DST changes between buckets)
+        offset = utc_seconds(columns.time) - local
+        times = (keys[starts] + offset[starts]).tolist()
+    return merge_runs(columns, starts, times)
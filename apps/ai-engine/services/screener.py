@@ -0,0 +1,260 @@
+import asyncio
+import math
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models import MarketRegion, ScreenerItem, ScreenerSort, SignalAction
+from services.history_store import history_store, to_records, DAY_SECONDS
+from services.indicators import rsi
+from services.metrics import metrics
+from services.signal_generator import TICKERS_CRYPTO, fetch_yf_charts, market_tickers, resolve_yf_symbol, window_start_for
+from services.single_flight import SingleFlight
+
+# Market-wide scan. Daily bars for the whole universe are aligned into
+# (symbols x sessions) matrices and every indicator is computed in one
+# vectorized pass over all symbols. A scan is cached per market; requests only
+# filter, rank and page the precomputed per-symbol arrays.
+
+SCREENER_UNIVERSE_DIR = os.getenv("SCREENER_UNIVERSE_DIR", "data/universe")  # {MARKET}.txt, one symbol per line
+SCREENER_LOOKBACK = os.getenv("SCREENER_LOOKBACK", "1y")
+SCREENER_TTL_SECONDS = float(os.getenv("SCREENER_TTL_SECONDS", "900"))
+SCREENER_DOWNLOAD_CHUNK = int(os.getenv("SCREENER_DOWNLOAD_CHUNK", "200"))  # Symbols per batched download
+
+TRADING_DAYS = 252
+
+
+def load_universe(market: MarketRegion) -> List[str]:
+    """Symbols to scan: SCREENER_UNIVERSE_DIR/{market}.txt if present, else the built-in list."""
+    path = os.path.join(SCREENER_UNIVERSE_DIR, f"{market.value}.txt")
+    try:
+        with open(path) as f:
+            symbols = [line.split("#", 1)[0].strip() for line in f]
+    except OSError:
+        return list(market_tickers(market))
+    return list(dict.fromkeys(s for s in symbols if s))
+
+
+@dataclass
+class PriceMatrix:
+    tickers: List[str]
+    times: np.ndarray  # Session times, UNIX seconds
+    close: np.ndarray  # symbols x sessions; gaps carry the last close, NaN before a symbol's first bar
+    volume: np.ndarray  # symbols x sessions; 0 where a symbol did not trade
+
+
+def align(records: Dict[str, np.ndarray]) -> PriceMatrix:
+    """Put every symbol's bars on the union of session times."""
+    tickers = [t for t, r in records.items() if len(r)]
+    if not tickers:
+        return PriceMatrix([], np.empty(0, dtype=np.int64), np.empty((0, 0)), np.empty((0, 0)))
+    times = np.unique(np.concatenate([records[t]["time"] for t in tickers]))
+    close = np.full((len(tickers), len(times)), np.nan)
+    volume = np.zeros((len(tickers), len(times)))
+    for i, t in enumerate(tickers):
+        cols = np.searchsorted(times, records[t]["time"])
+        close[i, cols] = records[t]["close"]
+        volume[i, cols] = np.nan_to_num(records[t]["volume"])
+
+    # Forward fill along time: index of the last observed session for every cell
+    last = np.where(np.isnan(close), 0, np.arange(len(times)))
+    np.maximum.accumulate(last, axis=1, out=last)
+    close = close[np.arange(len(tickers))[:, None], last]
+    return PriceMatrix(tickers, times, close, volume)
+
+
+def download_daily(tickers: List[str], period: Optional[str], start: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+    """Batched daily downloads in chunks, persisted to the history store. Returns records per ticker."""
+    records = {}
+    for i in range(0, len(tickers), SCREENER_DOWNLOAD_CHUNK):
+        chunk = tickers[i:i + SCREENER_DOWNLOAD_CHUNK]
+        try:
+            charts = fetch_yf_charts(chunk, period, "1d", start=start)
+        except Exception as e:
+            print(f"Screener download failed for {len(chunk)} tickers: {e}")
+            continue
+        for ticker, columns in charts.items():
+            history_store.write(resolve_yf_symbol(ticker), "1d", "CRYPTO" if ticker in TICKERS_CRYPTO else "US", columns)
+            records[ticker] = to_records(columns)
+    return records
+
+
+def load_matrix(tickers: List[str], lookback: str = SCREENER_LOOKBACK) -> PriceMatrix:
+    """
+    Daily bars from the history store, topped up with one batched download per
+    chunk: the full lookback for symbols not stored yet, the recent sessions for
+    the rest.
+    """
+    window_start = window_start_for(lookback)
+    records, cold, last_times = {}, [], []
+    for t in tickers:
+        stored = history_store.read(resolve_yf_symbol(t), "1d", window_start)
+        # A week of slack for weekends/holidays at the start of the window
+        if stored is None or stored.first_time > window_start + 7 * DAY_SECONDS:
+            cold.append(t)
+        else:
+            records[t] = stored.records
+            last_times.append(stored.last_time)
+
+    if cold:
+        records.update(download_daily(cold, lookback))
+    if last_times:
+        warm = [t for t in tickers if t not in cold]
+        since = datetime.fromtimestamp(min(last_times), tz=timezone.utc)
+        for t, tail in download_daily(warm, None, start=since).items():
+            if history_store.enabled:
+                records[t] = history_store.read(resolve_yf_symbol(t), "1d", window_start).records
+            else:
+                records[t] = np.concatenate([records[t][records[t]["time"] < tail["time"][0]], tail])
+
+    return align({t: r[r["time"] >= window_start] for t, r in records.items()})
+
+
+def _last_mean(values: np.ndarray, period: int) -> np.ndarray:
+    if values.shape[1] < period:
+        return np.full(values.shape[0], np.nan)
+    return values[:, -period:].mean(axis=1)
+
+
+def _change_over(close: np.ndarray, sessions: int) -> np.ndarray:
+    if close.shape[1] <= sessions:
+        return np.full(close.shape[0], np.nan)
+    return (close[:, -1] / close[:, -1 - sessions] - 1) * 100
+
+
+def screen(matrix: PriceMatrix) -> Dict[str, np.ndarray]:
+    """One value per symbol for every screener field, each computed across all symbols at once."""
+    close, volume = matrix.close, matrix.volume
+    price = close[:, -1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi_now = rsi(close)[:, -1] if close.shape[1] else np.full(len(price), np.nan)
+        sma_20 = _last_mean(close, 20)
+        log_returns = np.diff(np.log(close[:, -21:]), axis=1)
+        volatility = log_returns.std(axis=1, ddof=1) * math.sqrt(TRADING_DAYS) * 100 if log_returns.shape[1] > 1 \
+            else np.full(len(price), np.nan)
+        volume_ratio = volume[:, -1] / _last_mean(volume, 20)
+
+    # Same rules as evaluate_technical, for every symbol at once
+    rsi_or_mid = np.where(np.isnan(rsi_now), 50.0, rsi_now)
+    oversold, overbought, above = rsi_or_mid < 35, rsi_or_mid > 70, price > sma_20
+    conditions = [oversold, overbought, above]
+    action = np.select(conditions, [SignalAction.BUY.value, SignalAction.SELL.value, SignalAction.BUY.value],
+                       SignalAction.SELL.value)
+    confidence = np.minimum(np.select(conditions[:2], [80 + (35 - rsi_or_mid), 80 + (rsi_or_mid - 70)], 60.0), 99.9)
+    driver = np.select(conditions, ["RSI Oversold", "RSI Overbought", "Above 20 SMA"], "Below 20 SMA")
+
+    return {
+        "price": price,
+        "change_pct": _change_over(close, 1),
+        "rsi": rsi_now,
+        "sma_20": sma_20,
+        "sma_50": _last_mean(close, 50),
+        "momentum_20d": _change_over(close, 20),
+        "momentum_60d": _change_over(close, 60),
+        "volatility_20d": volatility,
+        "volume_ratio": np.where(np.isfinite(volume_ratio), volume_ratio, np.nan),
+        "action": action,
+        "confidence": confidence,
+        "driver": driver,
+    }
+
+
+def _number(value) -> Optional[float]:
+    return None if math.isnan(value) else round(float(value), 4)
+
+
+@dataclass
+class Scan:
+    tickers: np.ndarray
+    fields: Dict[str, np.ndarray]
+    computed_at: str  # ISO, UTC
+    computed_mono: float
+
+    @property
+    def size(self) -> int:
+        return len(self.tickers)
+
+    def query(self, action: Optional[SignalAction] = None, rsi_min: Optional[float] = None,
+              rsi_max: Optional[float] = None, above_sma_20: Optional[bool] = None,
+              sort: ScreenerSort = ScreenerSort.CONFIDENCE, descending: bool = True,
+              offset: int = 0, limit: int = 50) -> Tuple[int, List[ScreenerItem]]:
+        """(matches, one page of items) after filtering and ranking."""
+        f = self.fields
+        mask = np.ones(self.size, dtype=bool)
+        if action is not None:
+            mask &= f["action"] == action.value
+        if rsi_min is not None:
+            mask &= f["rsi"] >= rsi_min
+        if rsi_max is not None:
+            mask &= f["rsi"] <= rsi_max
+        if above_sma_20 is not None:
+            mask &= (f["price"] > f["sma_20"]) == above_sma_20
+
+        matches = np.flatnonzero(mask)
+        key = f[sort.value][matches]
+        # Stable, and NaN sorts last in either direction
+        order = np.argsort(-key if descending else key, kind="stable")
+        page = matches[order][offset:offset + limit]
+        items = [
+            ScreenerItem(
+                ticker=str(self.tickers[i]),
+                price=round(float(f["price"][i]), 4),
+                change_pct=_number(f["change_pct"][i]),
+                rsi=_number(f["rsi"][i]),
+                sma_20=_number(f["sma_20"][i]),
+                sma_50=_number(f["sma_50"][i]),
+                momentum_20d=_number(f["momentum_20d"][i]),
+                momentum_60d=_number(f["momentum_60d"][i]),
+                volatility_20d=_number(f["volatility_20d"][i]),
+                volume_ratio=_number(f["volume_ratio"][i]),
+                action=SignalAction(f["action"][i]),
+                confidence=round(float(f["confidence"][i]), 1),
+                driver=str(f["driver"][i]),
+            )
+            for i in page.tolist()
+        ]
+        return len(matches), items
+
+
+def build_scan(tickers: List[str], lookback: str = SCREENER_LOOKBACK) -> Scan:
+    matrix = load_matrix(tickers, lookback)
+    fields = screen(matrix)
+    valid = ~np.isnan(fields["price"])
+    return Scan(
+        tickers=np.asarray(matrix.tickers, dtype=object)[valid],
+        fields={name: values[valid] for name, values in fields.items()},
+        computed_at=datetime.now(timezone.utc).isoformat(),
+        computed_mono=time.monotonic(),
+    )
+
+
+class Screener:
+    def __init__(self, ttl: float = SCREENER_TTL_SECONDS, lookback: str = SCREENER_LOOKBACK):
+        self.ttl = ttl
+        self.lookback = lookback
+        self.scans: Dict[MarketRegion, Scan] = {}
+        self.flights = SingleFlight("screener")
+
+    async def scan(self, market: MarketRegion) -> Optional[Scan]:
+        scan = self.scans.get(market)
+        if scan is not None and time.monotonic() - scan.computed_mono < self.ttl:
+            metrics.cache("screener", "hit")
+            return scan
+        metrics.cache("screener", "miss")
+        return await self.flights.do(market, self._refresh, market)
+
+    async def _refresh(self, market: MarketRegion) -> Optional[Scan]:
+        try:
+            # Blocking downloads and numpy work, off the event loop
+            self.scans[market] = await asyncio.to_thread(build_scan, load_universe(market), self.lookback)
+        except Exception as e:
+            # Keep serving the previous scan
+            print(f"Error scanning {market}: {e}")
+        return self.scans.get(market)
+
+
+screener = Screener()
@@ -1,10 +1,22 @@
+import os
+import asyncio
 import yfinance as yf
 import pandas as pd
 import numpy as np
 import random
-from typing import List
+from typing import AsyncIterator, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from models import Signal, SignalAction, SignalDriver, MarketRegion, SignalResponse, ChartResponse, ChartDataPoint, NewsItem, NewsResponse
+from models import Signal, SignalAction, SignalDriver, MarketRegion, SignalResponse, ChartResponse, ChartDataPoint, ChartColumns, ChartFormat, DownsampleMethod
+from services.ohlcv_cache import chart_cache
+from services.binance_client import binance_client, to_binance_symbol
+from services.bar_aggregator import bar_aggregator
+from services.history_store import history_store, to_columns, to_records, DAY_SECONDS
+from services.metrics import metrics
+from services.single_flight import SingleFlight
+from services.downsample import downsample
+from services.indicators import rsi as wilder_rsi
+from services.resample import resample, session_for, can_resample, utc_seconds, INTERVAL_SECONDS, YF_RESAMPLED
 
 # ... existing code ...
 
@@ -21,26 +33,15 @@ DRIVERS = [
 MODELS = ["Mean Reversion v2", "Momentum Alpha", "Trend Follower", "Volatility Breakout", "LSTM-Hybrid"]
 
 def calculate_rsi(series, period=14):
-    delta = series.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
+    # Wilder's RSI, the one definition shared with the screener, backtests, /indicators and live signals
+    values = wilder_rsi(series.to_numpy(dtype=float).T, period).T
+    if isinstance(series, pd.DataFrame):
+        return pd.DataFrame(values, index=series.index, columns=series.columns)
+    return pd.Series(values, index=series.index)
 
 from datetime import timedelta, timezone
 
-def fetch_crypto_history(ticker: str, interval: str, period: str = "1mo") -> List[ChartDataPoint]:
-    # Map Ticker to Binance Symbol (BTC-USD -> BTCUSDT)
-    symbol = ticker.replace("-", "").replace("USD", "USDT")
-    
-    # Map Interval (yfinance -> binance)
-    binance_interval = interval
-    if interval == "1wk": binance_interval = "1w"
-    if interval == "1mo": binance_interval = "1M"
-    if interval == "max": binance_interval = "1w" 
-
-    # Calculate Start Time based on Period
-    now = datetime.now(timezone.utc)
+def period_to_timedelta(period: str, now: datetime) -> timedelta:
     delta = timedelta(days=30) # Default 1mo
     
     if period == "1d": delta = timedelta(days=1)
@@ -53,55 +54,48 @@ def fetch_crypto_history(ticker: str, interval: str, period: str = "1mo") -> Lis
     elif period == "5y": delta = timedelta(days=1825)
     elif period == "max": delta = timedelta(days=365*5)
     elif period == "ytd": delta = now - datetime(now.year, 1, 1, tzinfo=timezone.utc)
+    return delta
+
+async def fetch_crypto_history(ticker: str, interval: str, period: str = "1mo", start_time: Optional[int] = None,
+                               end_time: Optional[int] = None) -> ChartColumns:
+    symbol = to_binance_symbol(ticker)
     
-    start_time = int((now - delta).timestamp() * 1000)
+    # Map Interval (yfinance -> binance)
+    binance_interval = interval
+    if interval == "60m": binance_interval = "1h"
+    if interval == "1wk": binance_interval = "1w"
+    if interval == "1mo": binance_interval = "1M"
+    if interval == "max": binance_interval = "1w" 
+
+    # Calculate Start Time based on Period
+    now = datetime.now(timezone.utc)
     
-    url = "https://api.binance.com/api/v3/klines"
-    all_points = []
+    # Explicit start (ms) wins, used for incremental tail refreshes
+    if start_time is None:
+        start_time = int((now - period_to_timedelta(period, now)).timestamp() * 1000)
     
-    # Pagination Loop (Max 5 requests to avoid timeout/limits -> 5000 candles)
-    current_start = start_time
-    for _ in range(5):
-        params = {
-            "symbol": symbol,
-            "interval": binance_interval,
-            "limit": 1000,
-            "startTime": current_start
-        }
-        
-        try:
-            with httpx.Client() as client:
-                resp = client.get(url, params=params)
-                resp.raise_for_status()
-                data = resp.json()
-            
-            if not data:
-                break
-                
-            for k in data:
-                # Binance Kline: [Open Time, Open, High, Low, Close, Vol, Close Time, ...]
-                all_points.append(ChartDataPoint(
-                    time=int(k[0] / 1000), # ms to seconds
-                    open=float(k[1]),
-                    high=float(k[2]),
-                    low=float(k[3]),
-                    close=float(k[4]),
-                    volume=float(k[5])
-                ))
-            
-            # Update start for next page (Close Time + 1ms)
-            last_close_time = data[-1][6]
-            current_start = last_close_time + 1
-            
-            # If we got fewer than limit, we reached the end
-            if len(data) < 1000:
-                break
-                
-        except Exception as e:
-            print(f"Error fetching Binance data for {ticker}: {e}")
-            break
+    # Pages (max 5 -> 5000 candles) are fetched concurrently over a shared pool
+    try:
+        klines = await binance_client.fetch_klines(symbol, binance_interval, start_time, end_time or int(now.timestamp() * 1000))
+    except Exception as e:
+        print(f"Error fetching Binance data for {ticker}: {e}")
+        klines = []
             
-    return all_points
+    return parse_binance_klines(klines)
+
+def parse_binance_klines(klines: list) -> ChartColumns:
+    if not klines:
+        return ChartColumns()
+    # Binance Kline: [Open Time, Open, High, Low, Close, Vol, Close Time, ...]
+    arr = np.array([k[:6] for k in klines], dtype=float)
+    return ChartColumns.model_construct(
+        time=(arr[:, 0] // 1000).astype(np.int64).tolist(), # ms to seconds
+        open=arr[:, 1].tolist(),
+        high=arr[:, 2].tolist(),
+        low=arr[:, 3].tolist(),
+        close=arr[:, 4].tolist(),
+        volume=arr[:, 5].tolist(),
+    )
 
 def map_range_to_yf_interval(range_filter: str) -> tuple[str, str]:
 
@@ -112,32 +106,45 @@ def map_range_to_yf_interval(range_filter: str) -> tuple[str, str]:
     elif range_filter == "1H":
          return "1mo", "1h"
     elif range_filter == "4H":
-         return "3mo", "1h" # Fallback
+         return "3mo", "4h"
     elif range_filter in ["D", "1Y"]:
         return "1y", "1d"
     elif range_filter == "ALL":
         return "max", "1wk"
     return "1mo", "1d" # Default
 
-def parse_yf_history(hist: pd.DataFrame, interval: str) -> List[ChartDataPoint]:
-    data_points = []
-    for index, row in hist.iterrows():
-        # index is datetime
-        time_str = index.strftime("%Y-%m-%d")
-        # For intraday (1m, 5m, 1h), we need timestamps or full ISO
-        if interval in ["2m", "5m", "15m", "30m", "60m", "90m", "1h"]:
-            # Lightweight charts likes UNIX timestamp number for intraday
-            time_str = int(index.timestamp())
-        
-        data_points.append(ChartDataPoint(
-            time=time_str,
-            open=row['Open'],
-            high=row['High'],
-            low=row['Low'],
-            close=row['Close'],
-            volume=row['Volume']
-        ))
-    return data_points
+# Lightweight charts likes UNIX timestamp numbers for intraday, dates otherwise
+INTRADAY_INTERVALS = ["1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h", "4h"]
+# Everything /chart accepts: the intervals resampling knows, plus yfinance's that are only fetched as-is
+CHART_INTERVALS = set(INTERVAL_SECONDS) | {"5d", "3mo"}
+
+def parse_yf_history(hist: pd.DataFrame, interval: str) -> ChartColumns:
+    """Convert a yfinance history frame to columns in whole-array operations."""
+    if interval in INTRADAY_INTERVALS:
+        times = (hist.index.as_unit("ns").asi8 // 1_000_000_000).tolist()
+    else:
+        times = hist.index.strftime("%Y-%m-%d").tolist()
+
+    return ChartColumns.model_construct(
+        time=times,
+        open=hist['Open'].to_numpy(dtype=float).tolist(),
+        high=hist['High'].to_numpy(dtype=float).tolist(),
+        low=hist['Low'].to_numpy(dtype=float).tolist(),
+        close=hist['Close'].to_numpy(dtype=float).tolist(),
+        volume=hist['Volume'].to_numpy(dtype=float).tolist(),
+    )
+
+def columns_to_points(columns: ChartColumns) -> List[ChartDataPoint]:
+    # Values come from our own parsers, so skip per-row validation
+    return [
+        ChartDataPoint.model_construct(time=t, open=o, high=h, low=l, close=c, volume=v)
+        for t, o, h, l, c, v in zip(columns.time, columns.open, columns.high, columns.low, columns.close, columns.volume)
+    ]
+
+def build_chart_response(ticker: str, region: str, interval: str, columns: ChartColumns, format: ChartFormat = ChartFormat.ROWS) -> ChartResponse:
+    if format == ChartFormat.COLUMNS:
+        return ChartResponse(ticker=ticker, region=region, interval=interval, columns=columns)
+    return ChartResponse(ticker=ticker, region=region, interval=interval, data=columns_to_points(columns))
 
 def validate_interval_for_range(range_filter: str, interval: str) -> str:
     """Enforce logical bounds for interval based on range."""
@@ -156,7 +163,13 @@ def validate_interval_for_range(range_filter: str, interval: str) -> str:
              
     return interval
 
-def get_chart_data(ticker: str, range_filter: str, interval_filter: str = None) -> ChartResponse:
+def resolve_yf_symbol(ticker: str) -> str:
+    # Indian tickers may arrive without the exchange suffix
+    if ".NS" not in ticker and ticker in [t.replace(".NS", "") for t in TICKERS_IN]:
+        return f"{ticker}.NS"
+    return ticker
+
+def resolve_chart_params(range_filter: str, interval_filter: str = None) -> tuple[str, str]:
     # Determine Interval
     period = range_filter
     interval = interval_filter
@@ -166,101 +179,368 @@ def get_chart_data(ticker: str, range_filter: str, interval_filter: str = None)
         period = p
         interval = i
     else:
-        # Validate user/frontend provided interval
+        # Validate user/frontend provided interval (it ends up in cache keys and history file paths)
+        if interval not in CHART_INTERVALS:
+            raise ValueError(f"Unknown interval: {interval}")
         interval = validate_interval_for_range(period, interval)
         
     if period == "ALL": period = "max"
-        
+    return period, interval
+
+async def fetch_chart_data(ticker: str, period: str, interval: str) -> tuple[str, ChartColumns]:
+    """Full upstream fetch. Returns (region, columns); empty columns on failure."""
     # ROUTING FOR CRYPTO
     if ticker in TICKERS_CRYPTO:
-        # Pass period so fetcher can calculate start time and loop
-        data_points = fetch_crypto_history(ticker, interval, period)
-        if data_points:
-             return ChartResponse(ticker=ticker, region="CRYPTO", interval=interval, data=data_points)
+        # Pass period so fetcher can calculate start time and pages
+        columns = await fetch_crypto_history(ticker, interval, period)
+        if columns.time:
+             return "CRYPTO", columns
+
+    # yfinance is blocking, keep it off the event loop
+    return await asyncio.to_thread(fetch_yf_chart_data, ticker, period, interval)
 
+def parse_yf_resampled(ticker: str, hist: pd.DataFrame, interval: str) -> ChartColumns:
+    """Parse a history fetched at YF_RESAMPLED[interval] (or `interval` itself) into `interval` bars."""
+    source = YF_RESAMPLED.get(interval)
+    if source is None:
+        return parse_yf_history(hist, interval)
+    return resample(parse_yf_history(hist, source), source, interval, session_for(resolve_yf_symbol(ticker), "US"))
+
+def fetch_yf_chart_data(ticker: str, period: str, interval: str) -> tuple[str, ChartColumns]:
     try:
-        stock = yf.Ticker(ticker)
-        if ".NS" not in ticker and ticker in [t.replace(".NS", "") for t in TICKERS_IN]:
-            stock = yf.Ticker(f"{ticker}.NS")
-            
-        hist = stock.history(period=period, interval=interval)
+        stock = yf.Ticker(resolve_yf_symbol(ticker))
+        with metrics.upstream("yfinance"):
+            hist = stock.history(period=period, interval=YF_RESAMPLED.get(interval, interval))
         
         if hist.empty:
-            return ChartResponse(ticker=ticker, region="Unknown", interval=interval, data=[])
+            return "Unknown", ChartColumns()
 
-        data_points = parse_yf_history(hist, interval)
-            
-        return ChartResponse(ticker=ticker, region="US", interval=interval, data=data_points)
+        return "US", parse_yf_resampled(ticker, hist, interval)
             
     except Exception as e:
         print(f"Error fetching chart for {ticker}: {e}")
-        return ChartResponse(ticker=ticker, region="Error", interval=interval or "1d", data=[])
+        return "Error", ChartColumns()
 
-def get_signal_from_technical(ticker: str) -> Signal:
+def fetch_yf_chart_tail(ticker: str, interval: str, since: datetime, until: Optional[datetime] = None) -> ChartColumns:
+    with metrics.upstream("yfinance"):
+        hist = yf.Ticker(resolve_yf_symbol(ticker)).history(start=since, end=until, interval=YF_RESAMPLED.get(interval, interval))
+    if hist.empty:
+        return ChartColumns()
+    return parse_yf_resampled(ticker, hist, interval)
+
+async def fetch_chart_tail(ticker: str, region: str, interval: str, last_time, until: Optional[int] = None) -> ChartColumns:
+    """Fetch only the bars from the last cached bar onwards (or up to `until`, UNIX seconds)."""
+    if isinstance(last_time, int):
+        since = datetime.fromtimestamp(last_time, tz=timezone.utc)
+    else:
+        since = datetime.strptime(last_time, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    end = datetime.fromtimestamp(until, tz=timezone.utc) if until is not None else None
+
+    if region == "CRYPTO":
+        end_time = int(end.timestamp() * 1000) - 1 if end else None
+        return await fetch_crypto_history(ticker, interval, start_time=int(since.timestamp() * 1000), end_time=end_time)
+
+    return await asyncio.to_thread(fetch_yf_chart_tail, ticker, interval, since, end)
+
+def live_symbol(ticker: str) -> Optional[str]:
+    """Stream symbol for a ticker whose trades arrive on the Redis stream, if any."""
+    symbol = to_binance_symbol(ticker).lower()
+    return symbol if bar_aggregator.has(symbol) else None
+
+def window_start_for(period: str) -> int:
+    if period == "max":
+        return 0
+    now = datetime.now(timezone.utc)
+    return int((now - period_to_timedelta(period, now)).timestamp())
+
+async def load_history(ticker: str, period: str, interval: str) -> tuple[str, ChartColumns]:
+    """
+    Chart series from the local history store. Upstream is only asked for the
+    bars the store is missing: the tail after the last stored bar, and the head
+    when the window reaches back further than anything stored.
+    """
+    symbol = resolve_yf_symbol(ticker)
+    window_start = window_start_for(period)
+    stored = await asyncio.to_thread(history_store.read, symbol, interval, window_start)
+
+    if stored is not None:
+        region = stored.region
+        try:
+            tail = await fetch_chart_tail(ticker, region, interval, stored.last_time)
+            await asyncio.to_thread(history_store.write, symbol, interval, region, tail)
+            if stored.first_time > window_start and (stored.floor is None or stored.floor > window_start):
+                head = await fetch_chart_tail(ticker, region, interval, window_start, until=stored.first_time)
+                # Upstream pages are capped, so keep going back on later calls until it runs dry
+                floor = None if head.time else window_start
+                await asyncio.to_thread(history_store.write, symbol, interval, region, head, floor)
+        except Exception as e:
+            print(f"Error filling history for {ticker}: {e}")
+
+        stored = await asyncio.to_thread(history_store.read, symbol, interval, window_start)
+        records = stored.records[stored.records["time"] >= window_start]
+        if len(records):
+            metrics.cache("history", "hit")
+            return region, to_columns(records, region, interval)
+
+    metrics.cache("history", "miss")
+    region, columns = await fetch_chart_data(ticker, period, interval)
+    if columns.time:
+        await asyncio.to_thread(history_store.write, symbol, interval, region, columns)
+    return region, columns
+
+# Concurrent requests for the same series share one upstream fetch
+chart_flights = SingleFlight("chart")
+
+async def load_chart(key: tuple, ticker: str, period: str, interval: str) -> tuple[str, ChartColumns]:
+    region, columns = await load_history(ticker, period, interval)
+    if columns.time:
+        chart_cache.put(key, region, interval, columns)
+    return region, columns
+
+async def refresh_chart_tail(key: tuple, entry, ticker: str, interval: str):
+    try:
+        tail = await fetch_chart_tail(ticker, entry.region, interval, entry.last_time)
+        entry = chart_cache.append_tail(key, entry, tail)
+        await asyncio.to_thread(history_store.write, resolve_yf_symbol(ticker), interval, entry.region, tail)
+    except Exception as e:
+        # Serve the stale series rather than hammering a failing upstream
+        print(f"Error refreshing chart tail for {ticker}: {e}")
+        entry = chart_cache.touch(key, entry)
+    return entry
+
+def reduce_points(entry, columns: ChartColumns, max_points: Optional[int], method: DownsampleMethod) -> ChartColumns:
+    """Downsample to `max_points`, cached with the source series when it is a cache entry."""
+    if not max_points or len(columns.time) <= max_points:
+        return columns
+    if entry is not None and entry.data is columns:
+        return chart_cache.derive(entry, ("downsample", method, max_points), lambda data: downsample(data, max_points, method))
+    return downsample(columns, max_points, method)
+
+def covers_window(entry, window_start: int, interval: str) -> bool:
+    """Whether a cached series reaches back to the window start (weekends and holidays allowed for)."""
+    if not entry.data.time:
+        return False
+    first = int(utc_seconds(entry.data.time[:1])[0])
+    return first <= window_start + max(INTERVAL_SECONDS[interval], 4 * DAY_SECONDS)
+
+async def resample_cached(ticker: str, period: str, interval: str, source: Optional[tuple] = None):
+    """
+    Build the series from a finer one already in the chart cache (`source`, or
+    the coarsest that covers the window), so a timeframe switch needs no full
+    download. A stale source only has its tail refreshed. The result is cached
+    under its own key and remembers its source for the next refresh.
+    """
+    window_start = window_start_for(period)
+    entry = chart_cache.get(source) if source is not None else None
+    if entry is not None and covers_window(entry, window_start, interval):
+        key = source
+    else:
+        sources = [
+            (key, entry) for key, entry in chart_cache.items()
+            if key[0] == ticker and entry.source is None and can_resample(entry.interval, interval)
+            and covers_window(entry, window_start, interval)
+        ]
+        if not sources:
+            return None
+        key, entry = max(sources, key=lambda item: INTERVAL_SECONDS[item[1].interval])
+    if not chart_cache.is_fresh(entry):
+        entry = await chart_flights.do(("tail", key), refresh_chart_tail, key, entry, ticker, entry.interval)
+
+    session = session_for(resolve_yf_symbol(ticker), entry.region)
+    columns = resample(entry.data, entry.interval, interval, session, daily_dates=entry.region != "CRYPTO", since=window_start)
+    if not columns.time:
+        return None
+    return chart_cache.put((ticker, period, interval), entry.region, interval, columns, source=key)
+
+async def get_chart_data(ticker: str, range_filter: str, interval_filter: str = None, format: ChartFormat = ChartFormat.ROWS,
+                         max_points: Optional[int] = None, method: DownsampleMethod = DownsampleMethod.OHLC) -> ChartResponse:
+    period, interval = resolve_chart_params(range_filter, interval_filter)
+    key = (ticker, period, interval)
+    symbol = live_symbol(ticker) if interval in INTRADAY_INTERVALS else None
+
+    # Streamed symbol with enough live bars for the whole window: no upstream at all
+    if symbol is not None and chart_cache.get(key) is None:
+        live = bar_aggregator.bars_since(symbol, interval, window_start_for(period))
+        if live is not None:
+            metrics.cache("chart", "live")
+            return build_chart_response(ticker, "CRYPTO", interval, reduce_points(None, live, max_points, method), format)
+
+    entry = chart_cache.get(key)
+    if entry is not None:
+        metrics.cache("chart", "hit" if chart_cache.is_fresh(entry) else "stale")
+        # Live bars from the trade stream replace the cached tail when they reach back far enough and
+        # moved since; a quiet or stalled feed leaves the entry to expire and refresh from upstream
+        live = bar_aggregator.bars_since(symbol, interval, entry.last_time) if symbol else None
+        if live is not None and live.time and \
+                (live.time[-1], live.close[-1], live.volume[-1]) != (entry.last_time, entry.data.close[-1], entry.data.volume[-1]):
+            entry = chart_cache.append_tail(key, entry, live)
+        elif not chart_cache.is_fresh(entry):
+            # A resampled series is rebuilt from its source rather than fetched at this interval
+            resampled = await resample_cached(ticker, period, interval, entry.source) if entry.source else None
+            entry = resampled or await chart_flights.do(("tail", key), refresh_chart_tail, key, entry, ticker, interval)
+        return build_chart_response(ticker, entry.region, interval, reduce_points(entry, entry.data, max_points, method), format)
+
+    entry = await resample_cached(ticker, period, interval)
+    if entry is not None:
+        metrics.cache("chart", "resampled")
+        return build_chart_response(ticker, entry.region, interval, reduce_points(entry, entry.data, max_points, method), format)
+
+    metrics.cache("chart", "miss")
+    region, columns = await chart_flights.do(("load", key), load_chart, key, ticker, period, interval)
+    columns = reduce_points(chart_cache.get(key) if max_points else None, columns, max_points, method)
+    return build_chart_response(ticker, region, interval, columns, format)
+
+def fetch_yf_charts(tickers: List[str], period: Optional[str], interval: str,
+                    start: Optional[datetime] = None) -> Dict[str, ChartColumns]:
+    """One batched multi-ticker download (`period`, or from `start`); tickers that came back empty are left out."""
+    symbols = {resolve_yf_symbol(t): t for t in tickers}
+    with metrics.upstream("yfinance"):
+        data = yf.download(list(symbols), period=None if start else period, start=start,
+                           interval=YF_RESAMPLED.get(interval, interval), auto_adjust=True, threads=True, progress=False)
+    if data is None or data.empty:
+        return {}
+
+    charts = {}
+    for symbol, ticker in symbols.items():
+        if isinstance(data.columns, pd.MultiIndex):
+            if symbol not in data.columns.get_level_values(1):
+                continue
+            hist = data.xs(symbol, axis=1, level=1)
+        else:
+            hist = data
+        # The batch shares one index across listings; drop the other markets' sessions
+        hist = hist.dropna(subset=["Close"])
+        if not hist.empty:
+            charts[ticker] = parse_yf_resampled(ticker, hist, interval)
+    return charts
+
+async def load_chart_batch(tickers: List[str], period: str, interval: str):
+    """Fill the chart cache and history store for cold equity charts from one download."""
     try:
-        # Fetch data (1mo history to calculate indicators)
-        stock = yf.Ticker(ticker)
+        charts = await asyncio.to_thread(fetch_yf_charts, tickers, period, interval)
+    except Exception as e:
+        # The tickers fall back to one fetch each
+        print(f"Batch chart download failed for {len(tickers)} tickers: {e}")
+        return
+    for ticker, columns in charts.items():
+        chart_cache.put((ticker, period, interval), "US", interval, columns)
+        await asyncio.to_thread(history_store.write, resolve_yf_symbol(ticker), interval, "US", columns)
+
+async def iter_chart_data(tickers: List[str], range_filter: str, interval_filter: str = None,
+                          format: ChartFormat = ChartFormat.ROWS, max_points: Optional[int] = None,
+                          method: DownsampleMethod = DownsampleMethod.OHLC) -> AsyncIterator[ChartResponse]:
+    """
+    Charts for many tickers, yielded as each one is ready. Equities missing from
+    the chart cache are fetched in a single multi-ticker download (cheaper than
+    filling each one from the history store); cache hits and crypto go through
+    get_chart_data concurrently.
+    """
+    period, interval = resolve_chart_params(range_filter, interval_filter)
+    cold = [t for t in tickers if t not in TICKERS_CRYPTO and chart_cache.get((t, period, interval)) is None]
+    batch = None
+    if len(cold) > 1:
+        batch = asyncio.ensure_future(
+            chart_flights.do(("batch", tuple(cold), period, interval), load_chart_batch, cold, period, interval))
+
+    async def load(ticker: str) -> ChartResponse:
+        try:
+            if batch is not None and ticker in cold:
+                await asyncio.shield(batch)
+            return await get_chart_data(ticker, range_filter, interval_filter, format, max_points, method)
+        except Exception as e:
+            print(f"Error fetching chart for {ticker}: {e}")
+            return ChartResponse(ticker=ticker, region="Error", interval=interval)
+
+    tasks = [asyncio.ensure_future(load(t)) for t in tickers]
+    try:
+        for next_chart in asyncio.as_completed(tasks):
+            yield await next_chart
+    finally:
+        # Client went away mid-stream: stop the rest (shared fetches carry on)
+        for task in tasks + ([batch] if batch is not None else []):
+            task.cancel()
+
+def evaluate_technical(current_price: float, rsi: float, sma_20: float) -> tuple[SignalAction, float, str, str]:
+    """Signal rules: (action, confidence, driver label, driver sentiment) from price, RSI and 20-SMA."""
+    if rsi < 35:
+        return SignalAction.BUY, 80 + (35 - rsi), "RSI Oversold", "Bullish"
+    elif rsi > 70:
+        return SignalAction.SELL, 80 + (rsi - 70), "RSI Overbought", "Bearish"
+    # Trend check
+    if current_price > sma_20:
+        return SignalAction.BUY, 60.0, "Above 20 SMA", "Bullish"
+    return SignalAction.SELL, 60.0, "Below 20 SMA", "Bearish"
+
+def build_technical_signal(ticker: str, current_price: float, rsi: float, sma_20: float) -> Signal:
+    # Logic
+    action, confidence, label, sentiment = evaluate_technical(current_price, rsi, sma_20)
+    drivers: List[SignalDriver] = [SignalDriver(label=label, value=round(confidence), sentiment=sentiment)]
 
-        hist = stock.history(period="1mo")
+    # Add random secondary driver for flavor
+    secondary_driver = random.choice(DRIVERS) # NOSONAR
+    if secondary_driver not in [d.label for d in drivers]:
+         drivers.append(SignalDriver(label=secondary_driver, value=random.randint(40, 80), sentiment="Neutral"))
+    
+    # Clean ticker name
+    clean_name = ticker.replace(".NS", "")
+    currency = "₹" if ".NS" in ticker else "$"
+
+    return Signal(
+        id=f"sig_{ticker}_{int(datetime.now().timestamp())}",
+        ticker=clean_name,
+        name=f"{clean_name} Corp", # Can use stock.info['shortName'] but slow
+        price=f"{currency}{current_price:,.2f}",
+        action=action,
+        confidence=round(min(confidence, 99.9), 1),
+        uncertainty=round(random.uniform(2.0, 8.5), 1), # Still estimated
+        timestamp=datetime.now().strftime("%I:%M %p"),
+        model="Technical Analysis v1",
+        drivers=drivers
+    )
+
+def fetch_daily_closes(ticker: str, period: str = "1mo") -> pd.Series:
+    """Daily closes from the history store, topped up with the bars since the last stored day."""
+    symbol = resolve_yf_symbol(ticker)
+    region = "CRYPTO" if ticker in TICKERS_CRYPTO else "US"
+    window_start = window_start_for(period)
+    stock = yf.Ticker(symbol)
+
+    stored = history_store.read(symbol, "1d", window_start)
+    # A week of slack for weekends/holidays at the start of the window
+    if stored is not None and stored.first_time <= window_start + 7 * DAY_SECONDS:
+        with metrics.upstream("yfinance"):
+            tail = stock.history(start=datetime.fromtimestamp(stored.last_time, tz=timezone.utc), interval="1d")
+        if not tail.empty:
+            history_store.write(symbol, "1d", region, parse_yf_history(tail, "1d"))
+            stored = history_store.read(symbol, "1d", window_start)
+        closes = stored.records["close"][stored.records["time"] >= window_start]
+        if len(closes) >= 20:
+            return pd.Series(closes)
+
+    with metrics.upstream("yfinance"):
+        hist = stock.history(period=period)
+    if not hist.empty:
+        history_store.write(symbol, "1d", region, parse_yf_history(hist, "1d"))
+    return hist['Close']
+
+def get_signal_from_technical(ticker: str) -> Signal:
+    try:
+        # 1mo of daily closes to calculate indicators
+        closes = fetch_daily_closes(ticker)
         
-        if hist.empty:
+        if closes.empty:
             raise ValueError(f"No historical data found for {ticker}")
 
-        current_price = hist['Close'].iloc[-1]
+        current_price = closes.iloc[-1]
         
         # Calculate RSI
-        rsi_series = calculate_rsi(hist['Close'])
+        rsi_series = calculate_rsi(closes)
         rsi = rsi_series.iloc[-1] if not pd.isna(rsi_series.iloc[-1]) else 50.0
 
         # Calculate SMA
-        sma_20 = hist['Close'].rolling(window=20).mean().iloc[-1]
-        
-        # Logic
-        action = SignalAction.NEUTRAL
-        confidence = 50.0
-        
-        drivers: List[SignalDriver] = []
-
-        if rsi < 35:
-            action = SignalAction.BUY
-            confidence = 80 + (35 - rsi)
-            drivers.append(SignalDriver(label="RSI Oversold", value=round(80 + (35-rsi)), sentiment="Bullish"))
-        elif rsi > 70:
-            action = SignalAction.SELL
-            confidence = 80 + (rsi - 70)
-            drivers.append(SignalDriver(label="RSI Overbought", value=round(80 + (rsi-70)), sentiment="Bearish"))
-        else:
-             # Trend check
-             if current_price > sma_20:
-                 action = SignalAction.BUY
-                 confidence = 60.0
-                 drivers.append(SignalDriver(label="Above 20 SMA", value=60, sentiment="Bullish"))
-             else:
-                 action = SignalAction.SELL
-                 confidence = 60.0
-                 drivers.append(SignalDriver(label="Below 20 SMA", value=60, sentiment="Bearish"))
-
-        # Add random secondary driver for flavor
-        secondary_driver = random.choice(DRIVERS) # NOSONAR
-        if secondary_driver not in [d.label for d in drivers]:
-             drivers.append(SignalDriver(label=secondary_driver, value=random.randint(40, 80), sentiment="Neutral"))
+        sma_20 = closes.rolling(window=20).mean().iloc[-1]
         
-        # Clean ticker name
-        clean_name = ticker.replace(".NS", "")
-        currency = "₹" if ".NS" in ticker else "$"
-
-        return Signal(
-            id=f"sig_{ticker}_{int(datetime.now().timestamp())}",
-            ticker=clean_name,
-            name=f"{clean_name} Corp", # Can use stock.info['shortName'] but slow
-            price=f"{currency}{current_price:,.2f}",
-            action=action,
-            confidence=round(min(confidence, 99.9), 1),
-            uncertainty=round(random.uniform(2.0, 8.5), 1), # Still estimated
-            timestamp=datetime.now().strftime("%I:%M %p"),
-            model="Technical Analysis v1",
-            drivers=drivers
-        )
+        return build_technical_signal(ticker, current_price, rsi, sma_20)
 
     except Exception as e:
         print(f"Error fetching {ticker}: {e}")
@@ -283,69 +563,107 @@ def generate_mock_signal_fallback(ticker: str) -> Signal:
         drivers=[]
     )
 
-def get_market_signals(market: MarketRegion) -> SignalResponse:
-    tickers = []
+def market_tickers(market: MarketRegion) -> List[str]:
     if market == MarketRegion.IN:
-        tickers = TICKERS_IN
+        return TICKERS_IN
     elif market == MarketRegion.US:
-        tickers = TICKERS_US
+        return TICKERS_US
     elif market == MarketRegion.CRYPTO:
-        tickers = TICKERS_CRYPTO
-    signals = []
-    
-    # Analyze all tickers
+        return TICKERS_CRYPTO
+    return []
+
+def download_closes(tickers: List[str], period: str = "1mo") -> pd.DataFrame:
+    """
+    Close matrix (rows: dates, columns: tickers) from the history store. Tickers
+    whose stored daily bars cover the window share one batched download of the
+    sessions since; the rest share one batched download of the whole period.
+    """
+    window_start = window_start_for(period)
+    records, cold, last_times = {}, [], []
     for t in tickers:
-        signals.append(get_signal_from_technical(t))
+        stored = history_store.read(resolve_yf_symbol(t), "1d", window_start)
+        # A week of slack for weekends/holidays at the start of the window
+        if stored is None or stored.first_time > window_start + 7 * DAY_SECONDS:
+            cold.append(t)
+        else:
+            records[t] = stored.records
+            last_times.append(stored.last_time)
+
+    downloads = {}
+    if cold:
+        downloads.update(fetch_yf_charts(cold, period, "1d"))
+    if last_times:
+        warm = [t for t in tickers if t not in cold]
+        since = datetime.fromtimestamp(min(last_times), tz=timezone.utc)
+        try:
+            downloads.update(fetch_yf_charts(warm, None, "1d", start=since))
+        except Exception as e:
+            # The stored bars are at most one refresh behind
+            print(f"Error topping up closes for {len(warm)} tickers: {e}")
+
+    for t, columns in downloads.items():
+        symbol = resolve_yf_symbol(t)
+        history_store.write(symbol, "1d", "CRYPTO" if t in TICKERS_CRYPTO else "US", columns)
+        stored = history_store.read(symbol, "1d", window_start) if history_store.enabled else None
+        records[t] = stored.records if stored is not None else to_records(columns)
+
+    closes = {}
+    for t, r in records.items():
+        r = r[r["time"] >= window_start]
+        if len(r):
+            closes[t] = pd.Series(r["close"], index=pd.to_datetime(r["time"], unit="s"))
+    return pd.DataFrame(closes) if closes else pd.DataFrame()
+
+def compute_batch_signals(tickers: List[str]) -> dict[str, Signal]:
+    """
+    Signals for many tickers from a single download. RSI and SMA run once over
+    the whole Close matrix (column-wise) instead of once per ticker.
+    Tickers missing from the batch are left out so the caller can retry them.
+    """
+    close = download_closes(tickers)
+    if close.empty:
+        return {}
+
+    # Align calendars (holidays differ slightly across listings)
+    close = close.ffill()
+    rsi = calculate_rsi(close).iloc[-1]
+    sma_20 = close.rolling(window=20).mean().iloc[-1]
+    last = close.iloc[-1]
+
+    signals = {}
+    for t in tickers:
+        if t not in close.columns or pd.isna(last[t]):
+            continue
+        rsi_value = rsi[t] if not pd.isna(rsi[t]) else 50.0
+        signals[t] = build_technical_signal(t, last[t], rsi_value, sma_20[t])
+    return signals
+
+# Bounded pool for blocking yfinance calls, keeps them off the event loop
+SIGNAL_WORKERS = int(os.getenv("SIGNAL_WORKERS", "8"))
+signal_executor = ThreadPoolExecutor(max_workers=SIGNAL_WORKERS, thread_name_prefix="signals")
+signal_flights = SingleFlight("signal")
+
+async def get_market_signals(market: MarketRegion) -> SignalResponse:
+    tickers = market_tickers(market)
+    loop = asyncio.get_running_loop()
+
+    try:
+        batch = await loop.run_in_executor(signal_executor, compute_batch_signals, tickers)
+    except Exception as e:
+        print(f"Batch signal download failed for {market}: {e}")
+        batch = {}
+
+    # Whatever the batch could not cover is fetched per ticker, concurrently
+    missing = [t for t in tickers if t not in batch]
+    fallback = await asyncio.gather(
+        *(signal_flights.do(t, loop.run_in_executor, signal_executor, get_signal_from_technical, t) for t in missing)
+    )
+    batch.update(zip(missing, fallback))
+
+    signals = [batch[t] for t in tickers]
     
     return SignalResponse(
         signals=signals,
         market=market,
         count=len(signals)
     )
-
-def get_ticker_news(ticker: str) -> NewsResponse:
-    try:
-        # Normalize ticker
-        search_ticker = ticker
-        if ".NS" not in ticker and ticker in [t.replace(".NS", "") for t in TICKERS_IN]:
-            search_ticker = f"{ticker}.NS"
-            
-        stock = yf.Ticker(search_ticker)
-        news_data = stock.news
-        
-        items = []
-        for n in news_data:
-            # Check if content is nested (some versions)
-            item = n.get('content', n)
-            
-            sentiment = random.choice(["positive", "negative", "neutral"]) # Placeholder
-            
-            # Map Correct Keys
-            provider = item.get('provider', {})
-            source_name = provider.get('displayName', 'Yahoo Finance')
-            
-            # URL: Try clickThrough -> canonical
-            url_obj = item.get('clickThroughUrl') or item.get('canonicalUrl') or {}
-            url = url_obj.get('url', '#')
-            
-            # Title
-            title = item.get('title', 'No Title')
-            
-            # Time: pubDate is widely used now
-            published = item.get('pubDate') or datetime.now().isoformat()
-            
-            items.append(NewsItem(
-                id=item.get('id', str(random.randint(1000,9999))),
-                title=title,
-                source=source_name,
-                published_at=published,
-                url=url,
-                sentiment=sentiment,
-                tickers=[ticker]
-            ))
-            
-        return NewsResponse(ticker=ticker, news=items)
-            
-    except Exception as e:
-        print(f"Error fetching news for {ticker}: {e}")
-        return NewsResponse(ticker=ticker, news=[])
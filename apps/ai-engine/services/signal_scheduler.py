@@ -0,0 +1,95 @@
+import asyncio
+import hashlib
+import os
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from models import MarketRegion, SignalResponse
+from services.signal_generator import get_market_signals
+from services.single_flight import SingleFlight
+
+# Signals are recomputed in the background and served from the last snapshot,
+# so /signals never waits on yfinance. Markets are staggered across the refresh
+# period and each sleep is jittered, so refreshes don't line up into bursts.
+
+SIGNAL_REFRESH_SECONDS = float(os.getenv("SIGNAL_REFRESH_SECONDS", "60"))
+SIGNAL_REFRESH_JITTER = float(os.getenv("SIGNAL_REFRESH_JITTER", "0.1"))  # +/- fraction of the period
+
+
+# What a signal says. Ids, timestamps, the estimated uncertainty and the extra
+# flavour driver change on every refresh even when the signals do not; the
+# primary driver follows from action and confidence.
+ETAG_FIELDS = {"market": True, "signals": {"__all__": {"ticker", "name", "price", "action", "confidence", "model"}}}
+
+
+def signals_etag(response: SignalResponse) -> str:
+    """Weak ETag: equal for snapshots whose signals say the same, though their bodies differ."""
+    key = response.model_dump_json(include=ETAG_FIELDS).encode()
+    return 'W/"' + hashlib.blake2b(key, digest_size=12).hexdigest() + '"'
+
+
+@dataclass
+class SignalSnapshot:
+    response: SignalResponse
+    body: bytes  # Serialized once per refresh, served as-is
+    etag: str
+    computed_at: float  # time.monotonic()
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.computed_at
+
+
+class SignalScheduler:
+    def __init__(self, period: float = SIGNAL_REFRESH_SECONDS, jitter: float = SIGNAL_REFRESH_JITTER):
+        self.period = period
+        self.jitter = jitter
+        self.snapshots: Dict[MarketRegion, SignalSnapshot] = {}
+        self.flights = SingleFlight("signals")
+        self._tasks = []
+
+    def start(self):
+        markets = list(MarketRegion)
+        for i, market in enumerate(markets):
+            # Spread the first refreshes evenly over one period
+            self._tasks.append(asyncio.create_task(self._run(market, i * self.period / len(markets))))
+
+    async def stop(self):
+        self.flights.cancel_all()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def snapshot(self, market: MarketRegion) -> Optional[SignalSnapshot]:
+        return self.snapshots.get(market)
+
+    async def refresh(self, market: MarketRegion) -> Optional[SignalSnapshot]:
+        """Recompute a market; concurrent callers share the refresh already running."""
+        return await self.flights.do(market, self._compute, market)
+
+    async def _compute(self, market: MarketRegion) -> Optional[SignalSnapshot]:
+        try:
+            response = await get_market_signals(market)
+            response.generated_at = datetime.now(timezone.utc).isoformat()
+            body = response.model_dump_json().encode()
+            self.snapshots[market] = SignalSnapshot(response, body, signals_etag(response), time.monotonic())
+        except Exception as e:
+            # Keep serving the previous snapshot
+            print(f"Error refreshing signals for {market}: {e}")
+        return self.snapshots.get(market)
+
+    def _next_delay(self) -> float:
+        return self.period * (1 + random.uniform(-self.jitter, self.jitter))  # NOSONAR
+
+    async def _run(self, market: MarketRegion, delay: float):
+        await asyncio.sleep(delay)
+        while True:
+            await self.refresh(market)
+            await asyncio.sleep(self._next_delay())
+
+
+signal_scheduler = SignalScheduler()
@@ -0,0 +1,48 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from services.metrics import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Request coalescing: concurrent calls for the same key share one in-flight
+    call and all receive its result (or its exception). The key is released as
+    soon as the call finishes, so a failure only reaches the callers that were
+    already waiting on it and the next call tries again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[T]], *args) -> T:
+        task = self._inflight.get(key)
+        if task is None:
+            metrics.flight(self.name, "leader")
+            task = asyncio.ensure_future(fn(*args))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._release(key, t))
+        else:
+            metrics.flight(self.name, "shared")
+        # Shielded so one cancelled caller doesn't cancel the call the others wait on
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Retrieve it, so an error nobody is waiting for anymore isn't logged as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    def cancel_all(self):
+        for task in list(self._inflight.values()):
+            task.cancel()
@@ -0,0 +1,129 @@
+import asyncio
+import itertools
+import os
+from collections import OrderedDict
+from enum import Enum
+from typing import Dict, Hashable, Optional
+
+
+class QueuePolicy(str, Enum):
+    CONFLATE = "conflate"        # When full, a new event replaces the pending one of its symbol (and kind)
+    DROP_OLDEST = "drop_oldest"  # Discard the oldest pending event when full
+    DISCONNECT = "disconnect"    # Close the stream of a consumer that falls a full queue behind
+
+
+STREAM_QUEUE_SIZE = int(os.getenv("STREAM_QUEUE_SIZE", "1000"))
+STREAM_QUEUE_POLICY = QueuePolicy(os.getenv("STREAM_QUEUE_POLICY", QueuePolicy.CONFLATE.value))
+
+
+class SlowConsumerError(Exception):
+    """Raised to the reader of a queue that was disconnected for lagging."""
+
+
+class SubscriberQueue:
+    """
+    Bounded per-subscriber queue with an overflow policy and lag counters.
+    Producers never block: put() either enqueues, conflates, drops or disconnects.
+    Every policy only acts once the queue is full; a consumer that keeps up
+    receives every event.
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, maxsize: int = STREAM_QUEUE_SIZE, policy: QueuePolicy = STREAM_QUEUE_POLICY):
+        self.id = next(self._ids)
+        self.maxsize = maxsize
+        self.policy = policy
+        self.closed = False
+        # Counters
+        self.delivered = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.max_lag = 0
+
+        # Pending (key, event) by arrival, and the newest pending arrival per conflation key
+        self._pending: "OrderedDict[int, tuple]" = OrderedDict()
+        self._newest: Dict[Hashable, int] = {}
+        self._seq = itertools.count()
+        self._ready = asyncio.Event()
+
+    @property
+    def lag(self) -> int:
+        return len(self._pending)
+
+    def put(self, data, key: Optional[Hashable] = None):
+        if self.closed:
+            return
+
+        if len(self._pending) >= self.maxsize:
+            if self.policy == QueuePolicy.DISCONNECT:
+                self.close()
+                return
+            if self.policy == QueuePolicy.CONFLATE and key in self._newest:
+                # The replacement goes to the tail, so ids still reach the consumer in
+                # increasing order and a Last-Event-ID never skips an undelivered event
+                del self._pending[self._newest.pop(key)]
+                self.conflated += 1
+            else:
+                self._pop()
+                self.dropped += 1
+
+        seq = next(self._seq)
+        self._pending[seq] = (key, data)
+        if key is not None:
+            self._newest[key] = seq
+        self.max_lag = max(self.max_lag, len(self._pending))
+        self._ready.set()
+
+    def _pop(self):
+        seq, (key, data) = self._pending.popitem(last=False)
+        if self._newest.get(key) == seq:
+            del self._newest[key]
+        return data
+
+    async def _wait(self):
+        while not self._pending:
+            if self.closed:
+                raise SlowConsumerError(f"Subscriber {self.id} disconnected after falling {self.maxsize} events behind")
+            self._ready.clear()
+            await self._ready.wait()
+
+    async def get(self):
+        await self._wait()
+        self.delivered += 1
+        return self._pop()
+
+    async def get_batch(self, window: float, latest: bool = False) -> list:
+        """
+        Wait for an event, let `window` seconds of events accumulate behind it and
+        return everything pending. With `latest` the batch holds at most one
+        event per key, i.e. only the latest trade of each symbol.
+        """
+        await self._wait()
+        await asyncio.sleep(window)
+        await self._wait()  # Raises if the queue was closed while we slept
+        batch = [data for seq, (key, data) in self._pending.items()
+                 if not latest or key is None or self._newest[key] == seq]
+        self.conflated += len(self._pending) - len(batch)
+        self._pending.clear()
+        self._newest.clear()
+        self.delivered += len(batch)
+        return batch
+
+    def close(self):
+        self.closed = True
+        self._pending.clear()
+        self._newest.clear()
+        self._ready.set()
+
+    def stats(self) -> dict:
+        return {
+            "id": self.id,
+            "policy": self.policy.value,
+            "lag": self.lag,
+            "max_lag": self.max_lag,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "conflated": self.conflated,
+            "closed": self.closed,
+        }
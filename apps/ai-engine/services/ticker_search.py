@@ -0,0 +1,217 @@
+import os
+import time
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from models import SearchResultItem
+from services.metrics import metrics
+from services.signal_generator import TICKERS_IN, TICKERS_US, TICKERS_CRYPTO
+from services.single_flight import SingleFlight
+
+YAHOO_SEARCH_URL = os.getenv("YAHOO_SEARCH_URL", "https://query1.finance.yahoo.com/v1/finance/search")
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "5"))
+SEARCH_MAX_CONNECTIONS = int(os.getenv("SEARCH_MAX_CONNECTIONS", "20"))
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "2048"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "3600"))
+
+QUOTES_COUNT = 10  # Results asked from Yahoo; also a full local answer
+
+# Names for the tickers the app lists, so their prefixes resolve before any search
+KNOWN_NAMES = {
+    "RELIANCE.NS": "Reliance Industries Limited", "TCS.NS": "Tata Consultancy Services Limited",
+    "HDFCBANK.NS": "HDFC Bank Limited", "INFY.NS": "Infosys Limited",
+    "ICICIBANK.NS": "ICICI Bank Limited", "SBIN.NS": "State Bank of India",
+    "BHARTIARTL.NS": "Bharti Airtel Limited", "ITC.NS": "ITC Limited",
+    "NVDA": "NVIDIA Corporation", "AAPL": "Apple Inc.", "MSFT": "Microsoft Corporation",
+    "TSLA": "Tesla, Inc.", "AMZN": "Amazon.com, Inc.", "GOOGL": "Alphabet Inc.",
+    "META": "Meta Platforms, Inc.", "AMD": "Advanced Micro Devices, Inc.",
+    "BTC-USD": "Bitcoin USD", "ETH-USD": "Ethereum USD", "SOL-USD": "Solana USD",
+    "DOGE-USD": "Dogecoin USD", "XRP-USD": "XRP USD", "BNB-USD": "BNB USD",
+    "ADA-USD": "Cardano USD", "AVAX-USD": "Avalanche USD",
+}
+
+
+def normalize_query(q: str) -> str:
+    return " ".join(q.lower().split())
+
+
+def known_items() -> List[SearchResultItem]:
+    items = []
+    for symbol in TICKERS_IN:
+        items.append(SearchResultItem(symbol=symbol, name=KNOWN_NAMES[symbol], exchange="NSI", type="EQUITY"))
+    for symbol in TICKERS_US:
+        items.append(SearchResultItem(symbol=symbol, name=KNOWN_NAMES[symbol], exchange="NMS", type="EQUITY"))
+    for symbol in TICKERS_CRYPTO:
+        items.append(SearchResultItem(symbol=symbol, name=KNOWN_NAMES[symbol], exchange="CCC", type="CRYPTOCURRENCY"))
+    return items
+
+
+class PrefixIndex:
+    """
+    Sorted (key, symbol) array over lowercased symbols and names. A prefix is a
+    contiguous slice, found with two binary searches.
+    """
+
+    def __init__(self):
+        self.keys: List[Tuple[str, str]] = []
+        self.items: Dict[str, SearchResultItem] = {}
+        self._lock = threading.Lock()
+
+    def add(self, item: SearchResultItem):
+        with self._lock:
+            if item.symbol in self.items:
+                self.items[item.symbol] = item  # Fresher name/exchange, same keys
+                return
+            self.items[item.symbol] = item
+            insort(self.keys, (item.symbol.lower(), item.symbol))
+            name = normalize_query(item.name)
+            if name and name != item.symbol.lower():
+                insort(self.keys, (name, item.symbol))
+
+    def search(self, prefix: str, limit: int = QUOTES_COUNT) -> List[SearchResultItem]:
+        with self._lock:
+            lo = bisect_left(self.keys, (prefix,))
+            hi = bisect_left(self.keys, (prefix + "\uffff",))
+            # Symbol matches first, then name matches, shortest (closest) first
+            matches = sorted(self.keys[lo:hi], key=lambda k: (k[0] != k[1].lower(), len(k[1])))
+            results, seen = [], set()
+            for _, symbol in matches:
+                if symbol not in seen:
+                    seen.add(symbol)
+                    results.append(self.items[symbol])
+                    if len(results) == limit:
+                        break
+            return results
+
+    def __len__(self):
+        return len(self.items)
+
+
+class TickerSearch:
+    """
+    Ticker autocomplete backed by Yahoo, with local layers in front of it: an
+    LRU+TTL cache of normalized queries, and queries whose prefix already came
+    back complete (fewer than a full page), answered by filtering that result set.
+    A prefix index of known symbols and past results tops up short pages and
+    answers while Yahoo is unreachable; it never stands in for Yahoo on its own,
+    since Yahoo also matches inside names.
+    """
+
+    def __init__(self, url: str = YAHOO_SEARCH_URL, timeout: float = SEARCH_TIMEOUT,
+                 max_connections: int = SEARCH_MAX_CONNECTIONS, cache_size: int = SEARCH_CACHE_SIZE,
+                 ttl: float = SEARCH_CACHE_TTL):
+        self.url = url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self.index = PrefixIndex()
+        self.flights = SingleFlight("search")
+        for item in known_items():
+            self.index.add(item)
+        self._cache: "OrderedDict[str, Tuple[float, List[SearchResultItem]]]" = OrderedDict()
+        # Query -> (expiry, Yahoo results), for results shorter than a page
+        self._complete: Dict[str, Tuple[float, List[SearchResultItem]]] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                headers={'User-Agent': 'Mozilla/5.0'},
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _cached(self, query: str) -> Optional[List[SearchResultItem]]:
+        hit = self._cache.get(query)
+        if hit is None:
+            return None
+        expires, results = hit
+        if expires < time.monotonic():
+            del self._cache[query]
+            return None
+        self._cache.move_to_end(query)
+        return results
+
+    def _store(self, query: str, results: List[SearchResultItem]):
+        self._cache[query] = (time.monotonic() + self.ttl, results)
+        self._cache.move_to_end(query)
+        while len(self._cache) > self.cache_size:
+            evicted, _ = self._cache.popitem(last=False)
+            self._complete.pop(evicted, None)
+
+    def _covered(self, query: str) -> Optional[List[SearchResultItem]]:
+        """Results of `query` taken from the longest prefix Yahoo answered in full, if any."""
+        now = time.monotonic()
+        for i in range(len(query) - 1, 0, -1):
+            expires, results = self._complete.get(query[:i], (0, None))
+            if expires > now:
+                return [item for item in results
+                        if query in item.symbol.lower() or query in normalize_query(item.name)]
+        return None
+
+    async def fetch(self, query: str) -> List[SearchResultItem]:
+        params = {"q": query, "quotesCount": QUOTES_COUNT, "newsCount": 0}
+        async with metrics.upstream("yahoo_search"):
+            resp = await self._get_client().get(self.url, params=params)
+            data = resp.json()
+
+        items = []
+        for quote in data.get('quotes', []):
+            # Filter out non-equity if desired, keeping simple for now
+            items.append(SearchResultItem(
+                symbol=quote.get('symbol'),
+                name=quote.get('shortname') or quote.get('longname') or quote.get('symbol'),
+                exchange=quote.get('exchange', 'Unknown'),
+                type=quote.get('quoteType', 'Unknown'),
+            ))
+        return items
+
+    async def search(self, q: str) -> List[SearchResultItem]:
+        query = normalize_query(q)
+        if not query:
+            return []
+
+        cached = self._cached(query)
+        if cached is not None:
+            metrics.cache("search", "hit")
+            return cached
+
+        local = self.index.search(query)
+        results = self._covered(query)
+        if results is not None:
+            metrics.cache("search", "local")
+        else:
+            metrics.cache("search", "miss")
+            try:
+                # Keystrokes from many clients hit the same prefixes: one request per query
+                results = await self.flights.do(query, self.fetch, query)
+            except Exception as e:
+                print(f"Search API Error: {e}")
+                return local  # Best effort while Yahoo is unreachable; not cached
+
+            for item in results:
+                self.index.add(item)
+            if len(results) < QUOTES_COUNT:
+                self._complete[query] = (time.monotonic() + self.ttl, results)
+
+        if len(results) < QUOTES_COUNT:
+            # Top up a short page with local matches Yahoo did not return
+            symbols = {item.symbol for item in results}
+            results = results + [item for item in local if item.symbol not in symbols][:QUOTES_COUNT - len(results)]
+        self._store(query, results)
+        return results
+
+
+ticker_search = TickerSearch()
@@ -7,6 +7,7 @@ export const AP_INTERVALS = [
     { label: '15m', value: '15m' },
     { label: '30m', value: '30m' },
     { label: '1h', value: '1h' },
+    { label: '4h', value: '4h' },
     { label: '1D', value: '1d' },
     { label: '1W', value: '1wk' },
     { label: '1M', value: '1mo' },
@@ -15,9 +16,9 @@ export const AP_INTERVALS = [
 export const RANGE_CONFIG: Record<string, { valid: string[], default: string }> = {
     '1D': { valid: ['1m', '2m', '5m', '15m', '30m', '1h'], default: '5m' },
     '5D': { valid: ['5m', '15m', '30m', '1h'], default: '15m' },
-    '1M': { valid: ['15m', '30m', '1h', '1d'], default: '1h' },
-    '3M': { valid: ['1h', '1d', '1wk'], default: '1d' },
-    '6M': { valid: ['1h', '1d', '1wk'], default: '1d' },
+    '1M': { valid: ['15m', '30m', '1h', '4h', '1d'], default: '1h' },
+    '3M': { valid: ['1h', '4h', '1d', '1wk'], default: '1d' },
+    '6M': { valid: ['1h', '4h', '1d', '1wk'], default: '1d' },
     'YTD': { valid: ['1d', '1wk', '1mo'], default: '1d' },
     '1Y': { valid: ['1d', '1wk', '1mo'], default: '1d' },
     '5Y': { valid: ['1wk', '1mo'], default: '1wk' },
@@ -1,12 +1,15 @@
 import { useEffect, useState, useRef } from "react";
 import { StreamTrade } from "@/lib/api";
 
-export function useMarketStream(active: boolean = true) {
+export function useMarketStream(active: boolean = true, symbols?: string[]) {
     const [lastTrade, setLastTrade] = useState<StreamTrade | null>(null);
     const [status, setStatus] = useState<"connected" | "disconnected" | "connecting">("disconnected");
 
     const lastUpdateRef = useRef<number>(0);
 
+    // Server-side filter (e.g. ["btcusdt", "ethusdt"]); empty means all symbols
+    const symbolsKey = symbols && symbols.length ? symbols.join(",").toLowerCase() : "";
+
     useEffect(() => {
         if (!active) return;
 
@@ -17,7 +20,10 @@ export function useMarketStream(active: boolean = true) {
         });
 
         // Connect to Python Engine SSE
-        const eventSource = new EventSource("http://localhost:8000/api/v1/stream");
+        // Batched mode: one `trades` frame per 100ms holding the latest trade per symbol
+        let streamUrl = "http://localhost:8000/api/v1/stream?batch_ms=100&latest=true";
+        if (symbolsKey) streamUrl += `&symbols=${encodeURIComponent(symbolsKey)}`;
+        const eventSource = new EventSource(streamUrl);
 
         eventSource.onopen = () => {
             console.log("✅ SSE Connected");
@@ -47,10 +53,30 @@ export function useMarketStream(active: boolean = true) {
             }
         };
 
+        eventSource.addEventListener("trades", (event) => {
+            try {
+                const trades = JSON.parse((event as MessageEvent).data);
+                if (!Array.isArray(trades)) return;
+
+                // Frames already arrive at most every 100ms; keep the newest valid trade
+                for (let i = trades.length - 1; i >= 0; i--) {
+                    const data = trades[i];
+                    if (data && typeof data.price === 'number' && data.symbol) {
+                        lastUpdateRef.current = Date.now();
+                        setLastTrade(data);
+                        return;
+                    }
+                }
+            } catch (err) {
+                console.error("Failed to parse SSE batch", err);
+            }
+        });
+
         eventSource.onerror = (err) => {
             console.error("SSE Error", err);
-            setStatus("disconnected");
-            eventSource.close();
+            // Leave it open: the browser reconnects with Last-Event-ID and the
+            // server replays what was missed instead of us refetching charts
+            setStatus(eventSource.readyState === EventSource.CLOSED ? "disconnected" : "connecting");
         };
 
         return () => {
@@ -58,7 +84,7 @@ export function useMarketStream(active: boolean = true) {
             eventSource.close();
         };
 
-    }, [active]);
+    }, [active, symbolsKey]);
 
     return { lastTrade, status };
 }
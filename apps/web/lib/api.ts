@@ -1,4 +1,5 @@
 import { SignalData } from "@/components/SignalCard";
+import type { IndicatorConfig } from "./indicators";
 
 const API_BASE_URL = "http://localhost:8000/api/v1";
 
@@ -54,6 +55,87 @@ export async function fetchChartData(ticker: string, range: string = "1mo", inte
 }
 
 
+export interface ChartSeries {
+    ticker: string;
+    region: string;
+    interval: string;
+    data: ChartDataPoint[];
+}
+
+// Many charts in one request; onChart fires per ticker as the server streams them (NDJSON)
+export async function fetchChartsData(tickers: string[], range: string = "1mo", interval?: string, onChart?: (chart: ChartSeries) => void, signal?: AbortSignal): Promise<Record<string, ChartDataPoint[]>> {
+    const charts: Record<string, ChartDataPoint[]> = {};
+    if (!tickers.length) return charts;
+    try {
+        let url = `${API_BASE_URL}/charts?tickers=${encodeURIComponent(tickers.join(","))}&range=${range}&stream=true`;
+        if (interval) url += `&interval=${interval}`;
+
+        const response = await fetch(url, { signal });
+        if (!response.ok || !response.body) {
+            console.warn(`Charts API error: ${response.status}`);
+            return charts;
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = "";
+        for (;;) {
+            const { done, value } = await reader.read();
+            buffer += decoder.decode(value, { stream: !done });
+            const lines = buffer.split("\n");
+            buffer = done ? "" : lines.pop() ?? "";
+            for (const line of lines) {
+                if (!line.trim()) continue;
+                const chart: ChartSeries = JSON.parse(line);
+                charts[chart.ticker] = chart.data;
+                onChart?.(chart);
+            }
+            if (done) break;
+        }
+    } catch (error) {
+        console.error("Failed to fetch charts:", error);
+    }
+    return charts;
+}
+
+
+export interface IndicatorOutput {
+    id: string;
+    type: string;
+    name: string;
+    pane: "overlay" | "separate";
+    params: Record<string, number>;
+    values: Record<string, (number | null)[]>; // One value per bar in `time`, null during warm-up
+}
+
+export interface IndicatorsData {
+    ticker: string;
+    interval: string;
+    time: (string | number)[];
+    indicators: IndicatorOutput[];
+}
+
+// Indicators computed (and cached) on the server over the same bars as fetchChartData
+export async function fetchIndicators(ticker: string, configs: IndicatorConfig[], range: string = "1mo", interval?: string, signal?: AbortSignal): Promise<IndicatorsData | null> {
+    if (!configs.length) return null;
+    try {
+        const response = await fetch(`${API_BASE_URL}/indicators/${ticker}`, {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ range, interval, indicators: configs.map(({ id, type, params }) => ({ id, type, params })) }),
+            signal,
+        });
+        if (!response.ok) {
+            console.warn(`Indicators API error: ${response.status}`);
+            return null;
+        }
+        return await response.json();
+    } catch (error) {
+        console.error("Failed to fetch indicators:", error);
+        return null;
+    }
+}
+
 export interface SearchResult {
     symbol: string;
     name: string;